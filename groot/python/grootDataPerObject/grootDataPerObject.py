@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 """Groot Object Report"""
 from pyhesity import *
-import psycopg2
+from groottool import *
 from datetime import datetime
 import codecs
 
@@ -31,59 +31,36 @@ apiauth(vip, username, domain)
 
 print('Connecting to Postgres...')
 
-# get groot connection info from cluster
-reporting = api('get', 'postgres', quiet=True)
-if 'errorCode' in reporting:
-    print('statistics DB not found on %s' % vip)
-    exit()
-
 cluster = api('get', 'cluster')
 # limit query to numdays
 startUsecs = timeAgo(numdays, 'days')
 
 # connect to groot
-conn = psycopg2.connect(host=reporting[0]['nodeIp'], port=reporting[0]['port'], database="postgres", user=reporting[0]['defaultUsername'], password=reporting[0]['defaultPassword'])
-cur = conn.cursor()
+conn = grootConnect()
+if conn is None:
+    print('statistics DB not found on %s' % vip)
+    exit()
 
 print('Gethering parent/child relationships...')
 
-# gather parent relationships
+# gather parent relationships (cached between report runs)
 parent = {}
-sql_query = """
-select
-    source_name,
-    source_id
-from
-    reporting.registered_sources"""
-cur.execute(sql_query)
-rows = cur.fetchall()
-for row in rows:
-    (sourceName, sourceId) = row
-    parent[sourceId] = sourceName
-
-sql_query = """
-select
-    entity_name,
-    entity_id
-from
-    reporting.leaf_entities"""
-cur.execute(sql_query)
-rows = cur.fetchall()
-for row in rows:
-    (sourceName, sourceId) = row
-    parent[sourceId] = sourceName
+for source in grootDimension('registered_sources', conn=conn):
+    parent[source.source_id] = source.source_name
+for entity in grootDimension('leaf_entities', conn=conn):
+    parent[entity.entity_id] = entity.entity_name
 
 print ('gethering job run stats...')
 
-# sql query ----------------------------------------
+# sql query (totals per job and object) ----------------------------------------
 sql_query = """
 select
     pj.job_name,
-    et.env_name,
+    min(et.env_name),
     le.entity_name,
-    le.parent_id,
-    jre.source_delta_size_bytes,
-    jre.data_written_size_bytes
+    min(le.parent_id),
+    sum(jre.source_delta_size_bytes),
+    sum(jre.data_written_size_bytes)
 from
     reporting.protection_job_run_entities jre,
     reporting.protection_jobs pj,
@@ -99,50 +76,29 @@ where
     and le.is_protected = true
     and le.is_deleted = false
     and jre.start_time_usecs > %s
+group by
+    pj.job_name,
+    le.entity_name
 order by
-    jre.start_time_usecs desc;""" % startUsecs
+    pj.job_name,
+    le.entity_name;"""
 
 now = datetime.now()
 date = now.strftime("%m/%d/%Y %H:%M:%S")
 
-csv = 'Job Name,Job Type,Object Name,Parent,Data Read (%s),Data Written (%s)\n' % (units, units)
-
-totals = {}
-
-# get failures
-cur.execute(sql_query)
-rows = cur.fetchall()
-for row in rows:
-    (jobName, jobType, objectName, parentId, dataread, dataWritten) = row
-    mykey = '%s-%s' % (jobName, objectName)
-    if mykey not in totals:
-        totals[mykey] = {
-            "jobName": jobName,
-            "jobType": jobType,
-            "parentId": parentId,
-            "objectName": objectName,
-            "read": 0,
-            "written": 0
-        }
-    totals[mykey]['read'] += dataread
-    totals[mykey]['written'] += dataWritten
-
-cur.close()
-conn.close()
-
-for mykey in sorted(totals):
-    jobName = totals[mykey]['jobName']
-    jobType = totals[mykey]['jobType'][1:]
-    parentId = totals[mykey]['parentId']
-    parentName = parent.get(parentId, parentId)
-    objectName = totals[mykey]['objectName']
-    dataRead = round(totals[mykey]['read'] / multiplier, 2)
-    dataWritten = round(totals[mykey]['written'] / multiplier, 2)
-    csv += '%s,%s,%s,%s,%s,%s\n' % (jobName, jobType, objectName, parentName, dataRead, dataWritten)
-
 outfileName = 'dataPerObject-%s.csv' % cluster['name']
 
 print('saving report as %s' % outfileName)
 f = codecs.open(outfileName, 'w', 'utf-8')
-f.write(csv)
+f.write('Job Name,Job Type,Object Name,Parent,Data Read (%s),Data Written (%s)\n' % (units, units))
+
+# stream totals from the database into the csv
+for row in grootQuery(conn, sql_query, (startUsecs,)):
+    (jobName, jobType, objectName, parentId, dataRead, dataWritten) = row
+    parentName = parent.get(parentId, parentId)
+    dataRead = round(float(dataRead or 0) / multiplier, 2)
+    dataWritten = round(float(dataWritten or 0) / multiplier, 2)
+    f.write('%s,%s,%s,%s,%s,%s\n' % (jobName, jobType[1:], objectName, parentName, dataRead, dataWritten))
+
+grootRelease(conn)
 f.close()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 """Groot Object Report"""
 from pyhesity import *
-import psycopg2
+from groottool import *
 from datetime import datetime
 import codecs
 
@@ -31,27 +31,23 @@ apiauth(vip, username, domain)
 
 print('Collecting report data...')
 
-# get groot connection info from cluster
-reporting = api('get', 'postgres', quiet=True)
-if 'errorCode' in reporting:
-    print('statistics DB not found on %s' % vip)
-    exit()
-
 cluster = api('get', 'cluster')
 # limit query to numdays
 startUsecs = timeAgo(numdays, 'days')
 
 # connect to groot
-conn = psycopg2.connect(host=reporting[0]['nodeIp'], port=reporting[0]['port'], database="postgres", user=reporting[0]['defaultUsername'], password=reporting[0]['defaultPassword'])
-cur = conn.cursor()
+conn = grootConnect()
+if conn is None:
+    print('statistics DB not found on %s' % vip)
+    exit()
 
-# sql query ----------------------------------------
+# sql query (totals per job and object) ----------------------------------------
 sql_query = """
 select
   pj.job_name as "Job Name",
   le.entity_name AS "Object Name",
-  jre.source_delta_size_bytes as "Data Read",
-  jre.data_written_size_bytes as "Data Written"
+  sum(jre.source_delta_size_bytes) as "Data Read",
+  sum(jre.data_written_size_bytes) as "Data Written"
 from
   reporting.protection_job_run_entities jre,
   reporting.protection_jobs pj,
@@ -68,45 +64,28 @@ where
   and et.env_name = 'kVMware'
   and pj.policy_id = ppolicy.id
   and jre.start_time_usecs > %s
+group by
+  pj.job_name,
+  le.entity_name
 order by
-  to_timestamp(jre.start_time_usecs / 1000000) desc;""" % startUsecs
+  pj.job_name,
+  le.entity_name;"""
 
 now = datetime.now()
 date = now.strftime("%m/%d/%Y %H:%M:%S")
 
-csv = 'Job Name,Object Name,Data Read (%s),Data Written (%s)\n' % (units, units)
-
-totals = {}
-
-# get failures
-cur.execute(sql_query)
-rows = cur.fetchall()
-for row in rows:
-    (jobName, objectName, dataread, dataWritten) = row
-    mykey = '%s-%s' % (jobName, objectName)
-    if mykey not in totals:
-        totals[mykey] = {
-            "jobName": jobName,
-            "objectName": objectName,
-            "read": 0,
-            "written": 0
-        }
-    totals[mykey]['read'] += dataread
-    totals[mykey]['written'] += dataWritten
-
-cur.close()
-conn.close()
-
-for mykey in sorted(totals):
-    jobName = totals[mykey]['jobName']
-    objectName = totals[mykey]['objectName']
-    dataRead = round(totals[mykey]['read'] / multiplier, 2)
-    dataWritten = round(totals[mykey]['written'] / multiplier, 2)
-    csv += '%s,%s,%s,%s\n' % (jobName, objectName, dataRead, dataWritten)
-
 outfileName = 'dataPerVM-%s.csv' % cluster['name']
 
 print('saving report as %s' % outfileName)
 f = codecs.open(outfileName, 'w', 'utf-8')
-f.write(csv)
+f.write('Job Name,Object Name,Data Read (%s),Data Written (%s)\n' % (units, units))
+
+# stream totals from the database into the csv
+for row in grootQuery(conn, sql_query, (startUsecs,)):
+    (jobName, objectName, dataRead, dataWritten) = row
+    dataRead = round(float(dataRead or 0) / multiplier, 2)
+    dataWritten = round(float(dataWritten or 0) / multiplier, 2)
+    f.write('%s,%s,%s,%s\n' % (jobName, objectName, dataRead, dataWritten))
+
+grootRelease(conn)
 f.close()
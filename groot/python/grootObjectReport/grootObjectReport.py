@@ -1,12 +1,14 @@
 #!/usr/bin/env python
 """Groot Object Protection Report for python"""
 from pyhesity import *
-import psycopg2
+from groottool import *
 from datetime import datetime
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import codecs
+import json
+import os
 
 # command line arguments
 import argparse
@@ -19,6 +21,8 @@ parser.add_argument('-p', '--mailport', type=int, default=25)
 parser.add_argument('-t', '--sendto', action='append', type=str)
 parser.add_argument('-f', '--sendfrom', type=str, default='')
 parser.add_argument('-n', '--numdays', type=int, default=31)
+parser.add_argument('-inc', '--incremental', action='store_true')  # only query rows newer than the last run
+parser.add_argument('-sf', '--statefile', type=str, default=None)  # state file for incremental mode
 
 args = parser.parse_args()
 
@@ -30,25 +34,23 @@ mailport = args.mailport
 sendto = args.sendto
 sendfrom = args.sendfrom
 numdays = args.numdays
+incremental = args.incremental
+statefile = args.statefile
 
 # authenticate
 apiauth(vip, username, domain)
 
 print('Collecting report data...')
 
-# get groot connection info from cluster
-reporting = api('get', 'postgres', quiet=True)
-if 'errorCode' in reporting:
-    print('statistics DB not found on %s' % vip)
-    exit()
-
 cluster = api('get', 'cluster')
 
 parents = {}
 
 # connect to groot
-conn = psycopg2.connect(host=reporting[0]['nodeIp'], port=reporting[0]['port'], database="postgres", user=reporting[0]['defaultUsername'], password=reporting[0]['defaultPassword'])
-cur = conn.cursor()
+conn = grootConnect()
+if conn is None:
+    print('statistics DB not found on %s' % vip)
+    exit()
 
 # limit query to numdays
 startUsecs = timeAgo(numdays, 'days')
@@ -74,7 +76,7 @@ WHERE
     start_time_usecs > %s
 ORDER BY
     start_time_usecs DESC,
-    entity_name;""" % startUsecs
+    entity_name;"""
 
 title = 'Object Protection Report (%s)' % cluster['name']
 now = datetime.now()
@@ -210,11 +212,15 @@ html += '''</span>
     <th>Status</th>
 </tr>'''
 
-# get failures
-cur.execute(sql_failures, (startUsecs,))
-rows = cur.fetchall()
-for row in rows:
-    (jobName, startTimeUsecs, entityName, entity_id, envType, status) = row
+outfileName = 'objectReport-%s.html' % cluster['name']
+print('saving report as %s' % outfileName)
+f = codecs.open(outfileName, 'w', 'utf-8')
+f.write(html)
+
+# job_run_status names of runs that may still change (status_name has no k prefix)
+runningStates = ['Accepted', 'Running', 'Canceling', 'OnHold', 'Finalizing']
+
+def parentName(entity_id):
     parentname = ''
     if entity_id in parents:
         if parents[entity_id] != 'none':
@@ -233,35 +239,99 @@ for row in rows:
                 parents[entity_id] = 'none'
         else:
             parents[entity_id] = 'none'
+    return parentname
+
 
-    html += '''<tr class="%s">
+def writeRow(row):
+    (jobName, startTimeUsecs, entityName, entity_id, envType, status) = row
+    f.write('''<tr class="%s">
             <td>%s</td>
             <td>%s</td>
             <td>%s</td>
             <td>%s</td>
             <td>%s</td>
             <td>%s</td>
-        </tr>''' % (status, jobName, usecsToDate(startTimeUsecs), entityName, parentname, envType[1:], status)
+        </tr>''' % (status, jobName, usecsToDate(startTimeUsecs), entityName, parentName(entity_id), envType[1:], status))
+
+
+if incremental is True:
+    # state file: one json row per line in report order, then a summary line with the parent names
+    if statefile is None:
+        statefile = 'objectReport-%s-state.json' % cluster['name']
+    state = None
+    if os.path.exists(statefile):
+        try:
+            for line in codecs.open(statefile, 'r', 'utf-8'):
+                state = json.loads(line)
+        except ValueError:
+            state = None
+    if not isinstance(state, dict) or 'sinceUsecs' not in state or state.get('clusterId', None) != cluster['id'] or state['windowStartUsecs'] > startUsecs:
+        print('no usable state in %s, querying the last %s days' % (statefile, numdays))
+        state = None
+        queryAfterUsecs = startUsecs
+    else:
+        parents = dict((int(entity_id), parentname) for (entity_id, parentname) in state['parents'].items())
+        # re-query from the last seen run (or the oldest run that was still in progress)
+        queryAfterUsecs = state['sinceUsecs'] - 1
+
+    tmpfile = '%s.tmp' % statefile
+    sf = codecs.open(tmpfile, 'w', 'utf-8')
+    summary = {'lastStartTimeUsecs': startUsecs, 'sinceUsecs': None}
+
+    def keepRow(row):
+        writeRow(row)
+        sf.write('%s\n' % json.dumps(list(row)))
+        summary['lastStartTimeUsecs'] = max(summary['lastStartTimeUsecs'], row[1])
+        if row[5] in runningStates:
+            summary['sinceUsecs'] = row[1]
 
-cur.close()
+    # new rows are newer than every stored row that is kept, so both are written in report order
+    newRows = 0
+    for row in grootQuery(conn, sql_failures, (queryAfterUsecs,)):
+        keepRow(row)
+        newRows += 1
+    print('%s rows since %s' % (newRows, usecsToDate(queryAfterUsecs + 1)))
+    if state is not None:
+        for line in codecs.open(statefile, 'r', 'utf-8'):
+            row = json.loads(line)
+            if isinstance(row, list) and row[1] <= queryAfterUsecs and row[1] > startUsecs:
+                keepRow(row)
 
-html += '''</table>
+    # save state for the next run
+    if summary['sinceUsecs'] is None:
+        summary['sinceUsecs'] = summary['lastStartTimeUsecs']
+    json.dump({
+        'clusterId': cluster['id'],
+        'windowStartUsecs': startUsecs,
+        'lastStartTimeUsecs': summary['lastStartTimeUsecs'],
+        'sinceUsecs': summary['sinceUsecs'],
+        'parents': dict((str(entity_id), parentname) for (entity_id, parentname) in parents.items())
+    }, sf)
+    sf.write('\n')
+    sf.close()
+    if os.path.exists(statefile):
+        os.remove(statefile)
+    os.rename(tmpfile, statefile)
+else:
+    # get failures (streamed from the database and written as they arrive)
+    for row in grootQuery(conn, sql_failures, (startUsecs,)):
+        writeRow(row)
+
+grootRelease(conn)
+
+f.write('''</table>
 </div>
 </body>
 </html>
-'''
-
-print('saving report as objectReport-%s.html' % cluster['name'])
-outfileName = 'objectReport-%s.html' % cluster['name']
-f = codecs.open(outfileName, 'w', 'utf-8')
-# f = open(outfileName, "w")
-f.write(html)
+''')
 f.close()
 
 # email report
 if mailserver is not None:
     print('Sending report to %s...' % ', '.join(sendto))
-    emailhtml = MIMEText(html, 'html', 'utf-8')
+    f = codecs.open(outfileName, 'r', 'utf-8')
+    emailhtml = MIMEText(f.read(), 'html', 'utf-8')
+    f.close()
     msg = MIMEMultipart('alternative')
     msg['Subject'] = title
     msg['From'] = sendfrom
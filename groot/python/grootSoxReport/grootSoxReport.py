@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 """Groot Object Protection Report for python"""
 from pyhesity import *
+from groottool import *
 from fnmatch import fnmatch
-import psycopg2
 from datetime import datetime
 import codecs
 import smtplib
@@ -39,19 +39,15 @@ apiauth(vip, username, domain)
 
 print('Collecting report data...')
 
-# get groot connection info from cluster
-reporting = api('get', 'postgres', quiet=True)
-if 'errorCode' in reporting:
-    print('statistics DB not found on %s' % vip)
-    exit()
-
 cluster = api('get', 'cluster')
 # limit query to numdays
 startUsecs = timeAgo(numdays, 'days')
 
 # connect to groot
-conn = psycopg2.connect(host=reporting[0]['nodeIp'], port=reporting[0]['port'], database="postgres", user=reporting[0]['defaultUsername'], password=reporting[0]['defaultPassword'])
-cur = conn.cursor()
+conn = grootConnect()
+if conn is None:
+    print('statistics DB not found on %s' % vip)
+    exit()
 
 # sql query ----------------------------------------
 sql_query = """
@@ -103,23 +99,11 @@ where
   and pj.policy_id = ppolicy.id
   and jre.start_time_usecs > %s
 order by
-  to_timestamp(jre.start_time_usecs / 1000000) desc;""" % startUsecs
+  to_timestamp(jre.start_time_usecs / 1000000) desc;"""
 
 now = datetime.now()
 date = now.strftime("%m/%d/%Y %H:%M:%S")
 
-csv = 'Job Name,Object Name,Source Type,Source Name,Job Status,Policy Name,Full/Incremental,Data Read,Duration,Start Time,End Time,Expiry Date,SLA Violation\n'
-
-# get failures
-cur.execute(sql_query)
-rows = cur.fetchall()
-for row in rows:
-    (jobName, objectName, sourceType, sourceName, jobStatus, taskType, policyName, fullincr, dataread, duration, startTime, endTime, expiryDate, slaviolated) = row
-    if namefilter is None or fnmatch(objectName.lower(), namefilter.lower()) or fnmatch(sourceName.lower(), namefilter.lower()) or fnmatch(jobName.lower(), namefilter.lower()):
-        csv += '%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s\n' % (jobName, objectName, sourceType, sourceName, jobStatus, policyName, fullincr, "%s MB" % (dataread / (1024 * 1024)), duration, startTime, endTime, expiryDate, slaviolated)
-
-cur.close()
-
 if namefilter is not None:
     namefilterencoded = namefilter.replace('*', '_').replace('?', '_')
     outfileName = 'soxReport-%s-%s.csv' % (cluster['name'], namefilterencoded)
@@ -130,7 +114,15 @@ else:
 
 print('saving report as %s' % outfileName)
 f = codecs.open(outfileName, 'w', 'utf-8')
-f.write(csv)
+f.write('Job Name,Object Name,Source Type,Source Name,Job Status,Policy Name,Full/Incremental,Data Read,Duration,Start Time,End Time,Expiry Date,SLA Violation\n')
+
+# stream rows from the database into the csv
+for row in grootQuery(conn, sql_query, (startUsecs,)):
+    (jobName, objectName, sourceType, sourceName, jobStatus, taskType, policyName, fullincr, dataread, duration, startTime, endTime, expiryDate, slaviolated) = row
+    if namefilter is None or fnmatch(objectName.lower(), namefilter.lower()) or fnmatch(sourceName.lower(), namefilter.lower()) or fnmatch(jobName.lower(), namefilter.lower()):
+        f.write('%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s\n' % (jobName, objectName, sourceType, sourceName, jobStatus, policyName, fullincr, "%s MB" % (dataread / (1024 * 1024)), duration, startTime, endTime, expiryDate, slaviolated))
+
+grootRelease(conn)
 f.close()
 
 # email report
@@ -1,8 +1,7 @@
 #!/usr/bin/env python
 """Logcal Trends for python"""
 from pyhesity import *
-import psycopg2
-from datetime import datetime
+from groottool import *
 
 # command line arguments
 import argparse
@@ -30,16 +29,12 @@ apiauth(vip, username, domain)
 
 print('Collecting report data...')
 
-# get groot connection info from cluster
-reporting = api('get', 'postgres', quiet=True)
-if 'errorCode' in reporting:
+# connect to groot
+conn = grootConnect()
+if conn is None:
     print('statistics DB not found on %s' % vip)
     exit()
 
-# connect to groot
-conn = psycopg2.connect(host=reporting[0]['nodeIp'], port=reporting[0]['port'], database="postgres", user=reporting[0]['defaultUsername'], password=reporting[0]['defaultPassword'])
-cur = conn.cursor()
-
 # logical trend sql query
 logical_trend = """
 select
@@ -56,43 +51,58 @@ WHERE
 ORDER BY
   start_time_usecs;"""
 
-# get records
-cur.execute(logical_trend)
-rows = cur.fetchall()
-
-# data dictionary
-trend = {}
-trendTypes = []
-
-for row in rows:
-    (startTimeUsecs, logicalBytes, entityId, entityType) = row
-    startDate = datetime.strptime(usecsToDate(startTimeUsecs), '%Y-%m-%d %H:%M:%S').strftime("%Y-%m-%d")
-    if startDate not in trend:
-        trend[startDate] = {}
-    if entityType not in trend[startDate]:
-        trend[startDate][entityType] = {"logicalBytes": 0, "entities": []}
-    if entityType not in trendTypes:
-        trendTypes.append(entityType)
-    if entityId not in trend[startDate][entityType]['entities']:
-        trend[startDate][entityType]['logicalBytes'] += logicalBytes
-        trend[startDate][entityType]['entities'].append(entityId)
+# entity types (csv columns)
+trendTypes = sorted([row[0] for row in grootQuery(conn, """
+select distinct
+  env_name
+from
+  reporting.protection_job_run_entities
+  INNER JOIN reporting.leaf_entities on leaf_entities.entity_id = protection_job_run_entities.entity_id
+  INNER JOIN reporting.environment_types on environment_types.env_id = protection_job_run_entities.entity_env_type
+WHERE
+  start_time_usecs > 0;""")])
 
 # output to csv
 f = open('logicalTrends-%s.csv' % vip, 'w')
 
 # csv header
-f.write('%s,%s,,%s,%s\n' % ('Date', ','.join(sorted(trendTypes)), 'Date', ','.join(sorted(trendTypes))))
+f.write('%s,%s,,%s,%s\n' % ('Date', ','.join(trendTypes), 'Date', ','.join(trendTypes)))
+
 
-for startDate in sorted(trend.keys()):
+def writeDate(startDate, trend):
     print(startDate)
     theseLogical = []
     theseCount = []
-    for entityType in sorted(trendTypes):
-        entityData = trend[startDate].get(entityType, {"logicalBytes": 0, "entities": []})
+    for entityType in trendTypes:
+        entityData = trend.get(entityType, {"logicalBytes": 0, "entities": set()})
         logical = round(entityData['logicalBytes'] / multiplier, 2)
         itemCount = len(entityData['entities'])
         print('  %s (%s)  %s' % (entityType, itemCount, logical))
         theseLogical.append(str(logical))
         theseCount.append(str(itemCount))
     f.write('%s,%s,,%s,%s\n' % (startDate, ','.join(theseLogical), startDate, ','.join(theseCount)))
+
+
+# records are ordered by time, so each date is written out as soon as the next date starts
+trendDate = None
+trend = {}
+
+for row in grootQuery(conn, logical_trend):
+    (startTimeUsecs, logicalBytes, entityId, entityType) = row
+    startDate = usecsToDate(startTimeUsecs)[0:10]
+    if startDate != trendDate:
+        if trendDate is not None:
+            writeDate(trendDate, trend)
+        trendDate = startDate
+        trend = {}
+    if entityType not in trend:
+        trend[entityType] = {"logicalBytes": 0, "entities": set()}
+    if entityId not in trend[entityType]['entities']:
+        trend[entityType]['logicalBytes'] += logicalBytes
+        trend[entityType]['entities'].add(entityId)
+
+if trendDate is not None:
+    writeDate(trendDate, trend)
+
+grootRelease(conn)
 f.close()
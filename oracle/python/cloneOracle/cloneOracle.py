@@ -14,7 +14,6 @@
 
 ### import pyhesity wrapper module
 from pyhesity import *
-from time import sleep
 
 ### command line arguments
 import argparse
@@ -369,16 +368,12 @@ if 'errorCode' in response or 'error' in response:
 
 print("Cloning DB %s as %s..." % (sourcedb, targetdb))
 taskId = response['restoreTask']['performRestoreTaskState']['base']['taskId']
-status = api('get', '/restoretasks/%s' % taskId)
 
 if wait is True:
-    finishedStates = ['kCanceled', 'kSuccess', 'kFailure']
-    while(status[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'] not in finishedStates):
-        sleep(1)
-        status = api('get', '/restoretasks/%s' % taskId)
-    if(status[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'] == 'kSuccess'):
+    status = recoveryStatus(waitRecoveries([taskId], minInterval=1)[taskId])
+    if(status == 'kSuccess'):
         print('Clone Completed Successfully')
         exit(0)
     else:
-        print('Clone ended with state: %s' % status[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'])
+        print('Clone ended with state: %s' % status)
         exit(1)
@@ -15,7 +15,6 @@
 
 # import pyhesity wrapper module
 from pyhesity import *
-from time import sleep
 
 # command line arguments
 import argparse
@@ -420,15 +419,7 @@ if taskId is None:
 # status = api('get', '/restoretasks/%s' % taskId)
 
 if wait is True:
-    status = 'unknown'
-    finishedStates = ['kCanceled', 'kSuccess', 'kFailure']
-    while(status not in finishedStates):
-        sleep(10)
-        try:
-            task = api('get', '/restoretasks/%s' % taskId)
-            status = task[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus']
-        except:
-            pass
+    status = recoveryStatus(waitRecoveries([taskId], minInterval=10, maxInterval=60)[taskId])
     if(status == 'kSuccess'):
         print('Restore Completed Successfully')
         exit(0)
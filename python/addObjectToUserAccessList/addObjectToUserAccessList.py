@@ -34,6 +34,7 @@ apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=
 
 views = api('get', 'views')
 sources = api('get', 'protectionSources')
+sourceTree = None
 users = api('get', 'users')
 user = [u for u in users if u['username'].lower() == aduser.lower() and u['domain'].lower() == addomain.lower()]
 if user is None or len(user) == 0:
@@ -53,30 +54,13 @@ if 'views' in access:
 
 ### get object ID
 def getObjectId(objectName):
-
-    d = {'_object_id': None}
-
-    def get_nodes(node):
-        if 'name' in node:
-            if node['name'].lower() == objectName.lower():
-                d['_object_id'] = node['id']
-                exit
-        if 'protectionSource' in node:
-            if node['protectionSource']['name'].lower() == objectName.lower():
-                d['_object_id'] = node['protectionSource']['id']
-                exit
-        if 'nodes' in node:
-            for node in node['nodes']:
-                if d['_object_id'] is None:
-                    get_nodes(node)
-                else:
-                    exit
-
-    for source in sources:
-        if d['_object_id'] is None:
-            get_nodes(source)
-
-    return d['_object_id']
+    global sourceTree
+    if sourceTree is None:
+        sourceTree = sourceIndex(sources)
+    nodes = findSources(sourceTree, name=objectName)
+    if len(nodes) > 0:
+        return nodes[0].get('protectionSource', nodes[0])['id']
+    return None
 
 
 newAccess = {
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""count connections opened by pyhesity api calls"""
+
+# import pyhesity wrapper module
+from pyhesity import *
+import requests
+import runpy
+import sys
+import time
+import urllib3.connection
+
+# command line arguments
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument('-v', '--vip', type=str, default=None)           # cluster to connect to
+parser.add_argument('-u', '--username', type=str, default='helios')  # username
+parser.add_argument('-d', '--domain', type=str, default='local')     # (optional) domain - defaults to local
+parser.add_argument('-i', '--useApiKey', action='store_true')        # use API key authentication
+parser.add_argument('-pwd', '--password', type=str, default=None)    # optional password
+parser.add_argument('-n', '--numcalls', type=int, default=100)       # number of api calls to make
+parser.add_argument('-uri', '--uri', type=str, default='cluster')    # api call to repeat
+parser.add_argument('-s', '--script', type=str, default=None)        # run a script and count its connections
+parser.add_argument('scriptargs', nargs=argparse.REMAINDER)          # arguments for the script
+
+args = parser.parse_args()
+
+vip = args.vip
+username = args.username
+domain = args.domain
+password = args.password
+useApiKey = args.useApiKey
+numcalls = args.numcalls
+uri = args.uri
+script = args.script
+scriptargs = args.scriptargs
+
+# count every new TCP/TLS connection made through urllib3
+connections = {'count': 0}
+originalConnect = urllib3.connection.HTTPConnection.connect
+
+
+def countingConnect(self):
+    connections['count'] += 1
+    return originalConnect(self)
+
+
+urllib3.connection.HTTPConnection.connect = countingConnect
+
+# run another script and report how many connections it opened
+if script is not None:
+    if len(scriptargs) > 0 and scriptargs[0] == '--':
+        scriptargs = scriptargs[1:]
+    sys.argv = [script] + scriptargs
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit:
+        pass
+    print('\n%s opened %s connections' % (script, connections['count']))
+    exit(0)
+
+if vip is None:
+    print('--vip is required unless --script is used')
+    exit(1)
+
+# authenticate
+apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey)
+if apiconnected() is False:
+    exit(1)
+
+context = getContext()
+if uri[0] != '/':
+    url = context['APIROOT'] + '/public/' + uri
+else:
+    url = context['APIROOT'] + uri
+
+# pooled session (pyhesity api)
+connections['count'] = 0
+start = time.time()
+for i in range(numcalls):
+    api('get', uri)
+pooledSecs = time.time() - start
+pooledConnections = connections['count']
+
+# unpooled (a new connection per call)
+connections['count'] = 0
+start = time.time()
+for i in range(numcalls):
+    requests.get(url, headers=context['HEADER'], verify=False)
+unpooledSecs = time.time() - start
+unpooledConnections = connections['count']
+
+print('\n%s calls to %s\n' % (numcalls, uri))
+print('{0:<12}{1:>14}{2:>12}{3:>14}'.format('Mode', 'Connections', 'Seconds', 'Calls/Sec'))
+print('{0:<12}{1:>14}{2:>12}{3:>14}'.format('----', '-----------', '-------', '---------'))
+print('{0:<12}{1:>14}{2:>12.2f}{3:>14.1f}'.format('pooled', pooledConnections, pooledSecs, numcalls / pooledSecs))
+print('{0:<12}{1:>14}{2:>12.2f}{3:>14.1f}'.format('unpooled', unpooledConnections, unpooledSecs, numcalls / unpooledSecs))
@@ -13,12 +13,7 @@
 # import pyhesity wrapper module
 from pyhesity import *
 import codecs
-import sys
 import argparse
-if sys.version_info.major >= 3 and sys.version_info.minor >= 5:
-    from urllib.parse import quote_plus
-else:
-    from urllib import quote_plus
 
 # command line arguments
 parser = argparse.ArgumentParser()
@@ -71,29 +66,13 @@ apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=
 f = codecs.open('backedUpFiles.txt', 'w', 'utf-8')
 
 
-def listdir(dirPath, instance, f, volumeInfoCookie=None, volumeName=None, cookie=None):
-    thisDirPath = quote_plus(dirPath).replace('%2F%2F', '%2F')
-    if cookie is not None:
-        if volumeName is not None:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=true&dirPath=%s&volumeInfoCookie=%s&volumeName=%s&cookie=%s' % (instance, useLibrarian, thisDirPath, volumeInfoCookie, volumeName, cookie))
-        else:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=true&dirPath=%s&cookie=%s' % (instance, useLibrarian, thisDirPath, cookie))
-    else:
-        if volumeName is not None:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=true&dirPath=%s&volumeInfoCookie=%s&volumeName=%s' % (instance, useLibrarian, thisDirPath, volumeInfoCookie, volumeName))
-        else:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=true&dirPath=%s' % (instance, useLibrarian, thisDirPath))
-    if dirList and 'entries' in dirList:
-        for entry in sorted(dirList['entries'], key=lambda e: e['name']):
-            if entry['type'] == 'kDirectory':
-                listdir('%s/%s' % (dirPath, entry['name']), instance, f, volumeInfoCookie, volumeName)
-            else:
-                filesize = entry['fstatInfo']['size']
-                mtime = usecsToDate(entry['fstatInfo']['mtimeUsecs'])
-                print('%s (%s) [%s bytes]' % (entry['fullPath'], mtime, filesize))
-                f.write('%s (%s) [%s bytes]\n' % (entry['fullPath'], mtime, filesize))
-    if dirList and 'cookie' in dirList:
-        listdir('%s' % dirPath, instance, f, volumeInfoCookie, volumeName, dirList['cookie'])
+def listdir(dirPath, instance, f, volumeInfoCookie=None, volumeName=None):
+    for entry in walkDirectory(instance, dirPath, volumeInfoCookie, volumeName, useLibrarian=useLibrarian, statFileEntries=True):
+        if entry['type'] != 'kDirectory':
+            filesize = entry['fstatInfo']['size']
+            mtime = usecsToDate(entry['fstatInfo']['mtimeUsecs'])
+            print('%s (%s) [%s bytes]' % (entry['fullPath'], mtime, filesize))
+            f.write('%s (%s) [%s bytes]\n' % (entry['fullPath'], mtime, filesize))
 
 
 def showFiles(doc, version):
@@ -114,8 +93,7 @@ def showFiles(doc, version):
         if 'volumeInfos' in volumeList:
             volumeInfoCookie = volumeList['volumeInfoCookie']
             for volume in sorted(volumeList['volumeInfos'], key=lambda v: v['name']):
-                volumeName = quote_plus(volume['name'])
-                listdir(startpath, instance, f, volumeInfoCookie, volumeName)
+                listdir(startpath, instance, f, volumeInfoCookie, volume['name'])
     else:
         listdir(startpath, instance, f)
 
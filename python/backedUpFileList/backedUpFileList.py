@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 """backed up files list for python"""
 
-# version 2022.05.11
+# version 2026.10.18
 
 # usage: ./backedUpFileList.py -v mycluster \
 #                              -u myuser \
@@ -14,12 +14,10 @@
 from pyhesity import *
 from datetime import datetime
 import codecs
-import sys
 import argparse
-if sys.version_info.major >= 3 and sys.version_info.minor >= 5:
-    from urllib.parse import quote_plus
-else:
-    from urllib import quote_plus
+import json
+import os
+import time
 
 # command line arguments
 parser = argparse.ArgumentParser()
@@ -39,6 +37,7 @@ parser.add_argument('-f', '--filedate', type=str, default=None)       # date to
 parser.add_argument('-p', '--startpath', type=str, default='/')       # date to restore from
 parser.add_argument('-n', '--noindex', action='store_true')           # do not use librarian
 parser.add_argument('-ss', '--showstats', action='store_true')           # do not use librarian
+parser.add_argument('-rs', '--resume', action='store_true')           # resume from checkpoint
 
 args = parser.parse_args()
 
@@ -58,6 +57,10 @@ listfiles = args.listfiles
 startpath = args.startpath
 noindex = args.noindex
 showstats = args.showstats
+resume = args.resume
+
+# seconds between checkpoint saves
+checkpointsecs = 30
 
 if showstats is True:
     statfile = True
@@ -73,33 +76,45 @@ else:
 apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey)
 
 
-def listdir(dirPath, instance, f, volumeInfoCookie=None, volumeName=None, cookie=None):
-    thisDirPath = quote_plus(dirPath).replace('%2F%2F', '%2F')
-    if cookie is not None:
-        if volumeName is not None:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=%s&dirPath=%s&volumeInfoCookie=%s&volumeName=%s&cookie=%s' % (instance, useLibrarian, statfile, thisDirPath, volumeInfoCookie, volumeName, cookie))
-        else:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=%s&dirPath=%s&cookie=%s' % (instance, useLibrarian, statfile, thisDirPath, cookie))
-    else:
-        if volumeName is not None:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=%s&dirPath=%s&volumeInfoCookie=%s&volumeName=%s' % (instance, useLibrarian, statfile, thisDirPath, volumeInfoCookie, volumeName))
-        else:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=%s&dirPath=%s' % (instance, useLibrarian, statfile, thisDirPath))
-    if dirList and 'entries' in dirList:
-        for entry in sorted(dirList['entries'], key=lambda e: e['name']):
-            if entry['type'] == 'kDirectory':
-                listdir('%s/%s' % (dirPath, entry['name']), instance, f, volumeInfoCookie, volumeName)
+def saveCheckpoint(checkpointFile, f, checkpoint):
+    f.flush()
+    checkpoint['offset'] = f.tell()
+    tmpFile = '%s.%s.tmp' % (checkpointFile, os.getpid())
+    with open(tmpFile, 'w') as cp:
+        json.dump(checkpoint, cp)
+    try:
+        os.replace(tmpFile, checkpointFile)
+    except AttributeError:
+        os.rename(tmpFile, checkpointFile)
+
+
+def listdir(instance, f, checkpointFile, checkpoint, volumeKey, volumeInfoCookie=None, volumeName=None):
+    # directories (and cookies) still to be listed for this volume
+    pending = set([tuple(item) for item in checkpoint['volumes'][volumeKey]])
+    lastSave = [time.time()]
+
+    def commit(item, children):
+        # failed listings stay pending so they are retried on resume
+        if children is not None:
+            pending.discard(item)
+            pending.update(children)
+        if time.time() - lastSave[0] >= checkpointsecs:
+            checkpoint['volumes'][volumeKey] = list(pending)
+            saveCheckpoint(checkpointFile, f, checkpoint)
+            lastSave[0] = time.time()
+
+    for entry in walkDirectory(instance, volumeInfoCookie=volumeInfoCookie, volumeName=volumeName, useLibrarian=useLibrarian, statFileEntries=statfile, pending=list(pending), checkpoint=commit):
+        if entry['type'] != 'kDirectory':
+            if statfile is True:
+                filesize = entry['fstatInfo']['size']
+                mtime = usecsToDate(entry['fstatInfo']['mtimeUsecs'])
+                print('%s (%s) [%s bytes]' % (entry['fullPath'], mtime, filesize))
+                f.write('%s (%s) [%s bytes]\n' % (entry['fullPath'], mtime, filesize))
             else:
-                if statfile is True:
-                    filesize = entry['fstatInfo']['size']
-                    mtime = usecsToDate(entry['fstatInfo']['mtimeUsecs'])
-                    print('%s (%s) [%s bytes]' % (entry['fullPath'], mtime, filesize))
-                    f.write('%s (%s) [%s bytes]\n' % (entry['fullPath'], mtime, filesize))
-                else:
-                    print('%s' % entry['fullPath'])
-                    f.write('%s\n' % entry['fullPath'])
-    if dirList and 'cookie' in dirList:
-        listdir('%s' % dirPath, instance, f, volumeInfoCookie, volumeName, dirList['cookie'])
+                print('%s' % entry['fullPath'])
+                f.write('%s\n' % entry['fullPath'])
+    checkpoint['volumes'][volumeKey] = list(pending)
+    saveCheckpoint(checkpointFile, f, checkpoint)
 
 
 def showFiles(doc, version):
@@ -115,7 +130,25 @@ def showFiles(doc, version):
 
     fileDateString = datetime.strptime(usecsToDate(version['instanceId']['jobStartTimeUsecs']), '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d_%H-%M-%S')
 
-    f = codecs.open('backedUpFiles-%s-%s-%s.txt' % (sourceserver, version['instanceId']['jobInstanceId'], fileDateString), 'w', 'utf-8')
+    outFile = 'backedUpFiles-%s-%s-%s.txt' % (sourceserver, version['instanceId']['jobInstanceId'], fileDateString)
+    checkpointFile = '%s.checkpoint' % outFile
+
+    # checkpoint holds the output file offset and the pending directories per volume
+    if resume and os.path.exists(checkpointFile):
+        with open(checkpointFile, 'r') as cp:
+            checkpoint = json.load(cp)
+        f = codecs.open(outFile, 'r+', 'utf-8')
+        f.seek(checkpoint['offset'])
+        f.truncate()
+        print('resuming %s' % outFile)
+    elif resume and os.path.exists(outFile):
+        print('%s is already complete' % outFile)
+        return
+    else:
+        checkpoint = {'offset': 0, 'volumes': {}}
+        f = codecs.open(outFile, 'w', 'utf-8')
+        # so that a run that stops early is resumed rather than taken as complete
+        saveCheckpoint(checkpointFile, f, checkpoint)
 
     volumeTypes = [1, 6]
     backupType = doc['backupType']
@@ -124,13 +157,22 @@ def showFiles(doc, version):
         if 'volumeInfos' in volumeList:
             volumeInfoCookie = volumeList['volumeInfoCookie']
             for volume in sorted(volumeList['volumeInfos'], key=lambda v: v['name']):
-                volumeName = quote_plus(volume['name'])
-                listdir(startpath, instance, f, volumeInfoCookie, volumeName)
+                if volume['name'] not in checkpoint['volumes']:
+                    checkpoint['volumes'][volume['name']] = [[startpath, None]]
+                listdir(instance, f, checkpointFile, checkpoint, volume['name'], volumeInfoCookie, volume['name'])
     else:
-        listdir(startpath, instance, f)
+        if '' not in checkpoint['volumes']:
+            checkpoint['volumes'][''] = [[startpath, None]]
+        listdir(instance, f, checkpointFile, checkpoint, '')
 
     f.close()
 
+    failed = sum([len(items) for items in checkpoint['volumes'].values()])
+    if failed > 0:
+        print('\n%s directories could not be listed, use --resume to retry' % failed)
+    elif os.path.exists(checkpointFile):
+        os.remove(checkpointFile)
+
 
 search = api('get', '/searchvms?entityTypes=kView&entityTypes=kAcropolis&entityTypes=kAWS&entityTypes=kAWSNative&entityTypes=kAWSSnapshotManager&entityTypes=kAzure&entityTypes=kAzureNative&entityTypes=kFlashBlade&entityTypes=kGCP&entityTypes=kGenericNas&entityTypes=kHyperV&entityTypes=kHyperVVSS&entityTypes=kIsilon&entityTypes=kKVM&entityTypes=kNetapp&entityTypes=kPhysical&entityTypes=kVMware&vmName=%s' % sourceserver)
 
@@ -159,35 +159,19 @@ if apiconnected() is False:
         bail(1)
 
 sources = {}
+sourceTree = None
 cluster = api('get', 'cluster')
 
 
 ### get object ID
 def getObjectId(objectName):
-
-    d = {'_object_id': None}
-
-    def get_nodes(node):
-        if 'name' in node:
-            if node['name'].lower() == objectName.lower():
-                d['_object_id'] = node['id']
-                exit
-        if 'protectionSource' in node:
-            if node['protectionSource']['name'].lower() == objectName.lower():
-                d['_object_id'] = node['protectionSource']['id']
-                exit
-        if 'nodes' in node:
-            for node in node['nodes']:
-                if d['_object_id'] is None:
-                    get_nodes(node)
-                else:
-                    exit
-
-    for source in sources:
-        if d['_object_id'] is None:
-            get_nodes(source)
-
-    return d['_object_id']
+    global sourceTree
+    if sourceTree is None:
+        sourceTree = sourceIndex(sources)
+    nodes = findSources(sourceTree, name=objectName)
+    if len(nodes) > 0:
+        return nodes[0].get('protectionSource', nodes[0])['id']
+    return None
 
 
 def cancelRunningJob(job, durationMinutes):
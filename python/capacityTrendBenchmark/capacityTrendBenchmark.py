@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""benchmark vectorized capacity trend vs per-cluster python loops"""
+
+from statstool import *
+import numpy as np
+import time
+
+# command line arguments
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument('-c', '--clusters', type=int, default=500)        # number of synthetic clusters
+parser.add_argument('-y', '--years', type=int, default=5)             # years of daily stats per cluster
+parser.add_argument('-l', '--legacyclusters', type=int, default=20)   # clusters for the legacy test (0 to skip)
+parser.add_argument('-w', '--window', type=int, default=30)           # days in rolling growth window
+parser.add_argument('-f', '--fitdays', type=int, default=90)          # days used to project days to full
+parser.add_argument('-s', '--seed', type=int, default=1)
+
+args = parser.parse_args()
+
+numclusters = args.clusters
+numdays = args.years * 365
+legacyclusters = args.legacyclusters
+window = args.window
+fitdays = args.fitdays
+threshold = 4.0
+
+
+def syntheticStats(clusters, days):
+    """daily consumed/capacity GiB with growth, noise, capacity expansions, spikes and gaps"""
+    r = np.random.RandomState(args.seed)
+    x = np.arange(days)
+    consumed = r.uniform(1000, 50000, (clusters, 1)) + r.uniform(0, 200, (clusters, 1)) * x + r.normal(0, 50, (clusters, days))
+    capacity = np.repeat(r.uniform(100000, 400000, (clusters, 1)), days, axis=1)
+    for i in range(clusters):
+        expansion = r.randint(days)
+        capacity[i, expansion:] *= 1.5
+        consumed[i, r.randint(days, size=3)] += r.uniform(2000, 10000, 3)
+        gap = r.randint(days - 10)
+        consumed[i, gap:gap + r.randint(10)] = np.nan
+    return (consumed, capacity)
+
+
+def legacy(consumed, capacity):
+    """the same calculations one cluster and one day at a time"""
+    results = []
+    for (row, caprow) in zip(consumed.tolist(), capacity.tolist()):
+        days = len(row)
+        growth = []
+        for t in range(days):
+            points = [(x, row[x]) for x in range(max(0, t - window + 1), t + 1) if row[x] == row[x]]
+            if len(points) < max(2, window // 2):
+                growth.append(float('nan'))
+                continue
+            mx = sum([p[0] for p in points]) / float(len(points))
+            my = sum([p[1] for p in points]) / float(len(points))
+            growth.append(sum([(p[0] - mx) * (p[1] - my) for p in points]) / sum([(p[0] - mx) ** 2 for p in points]))
+        anomalies = 0
+        peak = max([abs(v) for v in row if v == v])
+        for t in range(2, days):
+            deltas = [row[x] - row[x - 1] for x in range(max(1, t - window - 1), t - 1) if row[x] == row[x] and row[x - 1] == row[x - 1]]
+            if row[t] != row[t] or row[t - 1] != row[t - 1] or len(deltas) == 0 or growth[t - 2] != growth[t - 2]:
+                continue
+            mean = sum(deltas) / float(len(deltas))
+            std = (sum([(d - mean) ** 2 for d in deltas]) / float(len(deltas))) ** 0.5
+            if abs(row[t] - row[t - 1] - growth[t - 2]) > threshold * max(std, 1e-4 * peak):
+                anomalies += 1
+        points = [(x, row[x]) for x in range(max(0, days - fitdays), days) if row[x] == row[x]]
+        mx = sum([p[0] for p in points]) / float(len(points))
+        my = sum([p[1] for p in points]) / float(len(points))
+        slope = sum([(p[0] - mx) * (p[1] - my) for p in points]) / sum([(p[0] - mx) ** 2 for p in points])
+        projected = my + slope * (days - 1 - mx)
+        latestCapacity = [v for v in caprow if v == v][-1]
+        daysToFull = max(latestCapacity - projected, 0.0) / slope if slope > 0 else float('inf')
+        results.append((growth[-1], slope, daysToFull, anomalies))
+    return results
+
+
+print('\ngenerating %s clusters x %s days...' % (numclusters, numdays))
+(consumed, capacity) = syntheticStats(numclusters, numdays)
+
+print('\n{0:<12}{1:>10}{2:>12}{3:>16}'.format('Mode', 'Clusters', 'Seconds', 'Clusters/Sec'))
+print('{0:<12}{1:>10}{2:>12}{3:>16}'.format('----', '--------', '-------', '------------'))
+for (mode, robust) in [('numpy', False), ('robust', True)]:
+    start = time.time()
+    trend = capacityTrend(consumed, capacity, window=window, fitDays=fitdays, robust=robust, threshold=threshold)
+    seconds = time.time() - start
+    print('{0:<12}{1:>10}{2:>12.3f}{3:>16.0f}'.format(mode, numclusters, seconds, numclusters / seconds))
+    if robust is False:
+        linear = trend
+
+if legacyclusters > 0:
+    legacyclusters = min(legacyclusters, numclusters)
+    start = time.time()
+    results = legacy(consumed[:legacyclusters], capacity[:legacyclusters])
+    seconds = time.time() - start
+    print('{0:<12}{1:>10}{2:>12.3f}{3:>16.1f}'.format('legacy', legacyclusters, seconds, legacyclusters / seconds))
+    # check that both implementations agree
+    legacyResults = np.array(results)
+    numpyResults = np.column_stack([linear['growth'][:legacyclusters, -1], linear['slope'][:legacyclusters], linear['daysToFull'][:legacyclusters], linear['anomalies'][:legacyclusters].sum(axis=1)])
+    print('\nmax relative difference (growth, slope, days to full): %s' % np.nanmax(np.abs(numpyResults[:, :3] - legacyResults[:, :3]) / np.maximum(np.abs(legacyResults[:, :3]), 1e-9), axis=0))
+    print('anomalies flagged (numpy / legacy): %s / %s' % (int(numpyResults[:, 3].sum()), int(legacyResults[:, 3].sum())))
+print('')
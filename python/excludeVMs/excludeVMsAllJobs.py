@@ -82,7 +82,11 @@ for job in api('get', 'protectionJobs'):
         parentId = job['parentSourceId']
 
         # get source info (vCenter)
-        parentSource = api('get', 'protectionSources?allUnderHierarchy=true&excludeTypes=kResourcePool&id=%s&includeEntityPermissionInfo=true&includeVMFolders=true' % parentId)[0]
+        parentSource = api('get', 'protectionSources?allUnderHierarchy=true&excludeTypes=kResourcePool&id=%s&includeEntityPermissionInfo=true&includeVMFolders=true' % parentId)
+        if not isinstance(parentSource, list) or len(parentSource) == 0:
+            print("    failed to get source info, skipping job")
+            continue
+        parentSource = parentSource[0]
 
         if excludePoweredOff is True:
             vcentername = parentSource['protectionSource']['vmWareProtectionSource']['name']
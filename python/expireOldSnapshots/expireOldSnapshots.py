@@ -79,64 +79,60 @@ print("Searching for old snapshots...")
 for job in sorted(jobs, key=lambda job: job['name'].lower()):
     if len(jobnames) == 0 or job['name'].lower() in [j.lower() for j in jobnames]:
         print('\n%s' % job['name'])
-        endUsecs = nowUsecs
-        while(1):
-            runs = api('get', 'protectionRuns?jobId=%s&numRuns=%s&endTimeUsecs=%s&excludeTasks=true' % (job['id'], numruns, endUsecs))
-            if len(runs) > 0:
-                endUsecs = runs[-1]['backupRun']['stats']['startTimeUsecs'] - 1
-            else:
-                break
-            for run in runs:
-                startdate = usecsToDate(run['copyRun'][0]['runStartTimeUsecs'])
-                startdateusecs = run['copyRun'][0]['runStartTimeUsecs']
-
-                # check for replication
-                replicated = False
-                for copyRun in run['copyRun']:
-                    if copyRun['target']['type'] == 'kRemote':
-                        if copyRun['status'] == 'kSuccess':
-                            replicated = True
-
-                # check for archive
-                archived = False
-                for copyRun in run['copyRun']:
-                    if copyRun['target']['type'] == 'kArchival':
-                        if copyRun['status'] == 'kSuccess':
-                            archived = True
-
-                if startdateusecs < timeAgo(daystokeep, 'days') and run['backupRun']['snapshotsDeleted'] is False:
-                    skip = False
-                    if replicated is False and confirmreplication is True:
-                        skip = True
-                        print("    Skipping %s (not replicated)" % startdate)
-                    elif archived is False and confirmarchive is True:
-                        skip = True
-                        print("    Skipping %s (not archived)" % startdate)
-                    if skip is False:
-                        if expire:
-                            exactRun = api('get', '/backupjobruns?exactMatchStartTimeUsecs=%s&id=%s' % (startdateusecs, job['id']))
-                            jobUid = exactRun[0]['backupJobRuns']['protectionRuns'][0]['backupRun']['base']['jobUid']
-                            expireRun = {
-                                "jobRuns":
-                                    [
-                                        {
-                                            "expiryTimeUsecs": 0,
-                                            "jobUid": {
-                                                "clusterId": jobUid['clusterId'],
-                                                "clusterIncarnationId": jobUid['clusterIncarnationId'],
-                                                "id": jobUid['objectId'],
-                                            },
-                                            "runStartTimeUsecs": startdateusecs,
-                                            "copyRunTargets": [
-                                                {
-                                                    "daysToKeep": 0,
-                                                    "type": "kLocal",
-                                                }
-                                            ]
-                                        }
-                                    ]
-                            }
-                            print("    Expiring %s" % startdate)
-                            api('put', 'protectionRuns', expireRun)
-                        else:
-                            print("    %s" % startdate)
+        for run in getRuns(job['id'], numRuns=numruns, endTimeUsecs=nowUsecs, query='&excludeTasks=true'):
+            startdate = usecsToDate(run['copyRun'][0]['runStartTimeUsecs'])
+            startdateusecs = run['copyRun'][0]['runStartTimeUsecs']
+
+            # check for replication
+            replicated = False
+            for copyRun in run['copyRun']:
+                if copyRun['target']['type'] == 'kRemote':
+                    if copyRun['status'] == 'kSuccess':
+                        replicated = True
+
+            # check for archive
+            archived = False
+            for copyRun in run['copyRun']:
+                if copyRun['target']['type'] == 'kArchival':
+                    if copyRun['status'] == 'kSuccess':
+                        archived = True
+
+            if startdateusecs < timeAgo(daystokeep, 'days') and run['backupRun']['snapshotsDeleted'] is False:
+                skip = False
+                if replicated is False and confirmreplication is True:
+                    skip = True
+                    print("    Skipping %s (not replicated)" % startdate)
+                elif archived is False and confirmarchive is True:
+                    skip = True
+                    print("    Skipping %s (not archived)" % startdate)
+                if skip is False:
+                    if expire:
+                        exactRun = api('get', '/backupjobruns?exactMatchStartTimeUsecs=%s&id=%s' % (startdateusecs, job['id']))
+                        if not isinstance(exactRun, list) or len(exactRun) == 0 or 'backupJobRuns' not in exactRun[0]:
+                            print("    Skipping %s (failed to get run details)" % startdate)
+                            continue
+                        jobUid = exactRun[0]['backupJobRuns']['protectionRuns'][0]['backupRun']['base']['jobUid']
+                        expireRun = {
+                            "jobRuns":
+                                [
+                                    {
+                                        "expiryTimeUsecs": 0,
+                                        "jobUid": {
+                                            "clusterId": jobUid['clusterId'],
+                                            "clusterIncarnationId": jobUid['clusterIncarnationId'],
+                                            "id": jobUid['objectId'],
+                                        },
+                                        "runStartTimeUsecs": startdateusecs,
+                                        "copyRunTargets": [
+                                            {
+                                                "daysToKeep": 0,
+                                                "type": "kLocal",
+                                            }
+                                        ]
+                                    }
+                                ]
+                        }
+                        print("    Expiring %s" % startdate)
+                        api('put', 'protectionRuns', expireRun)
+                    else:
+                        print("    %s" % startdate)
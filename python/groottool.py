@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""Groot (Cluster Reporting Database) Query Helper"""
+
+# from groottool import *
+# conn = grootConnect()
+# for row in grootQuery(conn, 'select job_name, start_time_usecs from reporting.protection_job_runs where start_time_usecs > %s', (startUsecs,)):
+#     print(row.job_name)
+# jobNames = dict((job.job_id, job.job_name) for job in grootDimension('protection_jobs'))
+# grootRelease(conn)
+
+import psycopg2
+import psycopg2.pool
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import itertools
+import threading
+from collections import namedtuple
+import pyhesity
+from pyhesity import api, CACHEDIR
+
+__all__ = ['grootConnect', 'grootRelease', 'grootDisconnect', 'grootQuery', 'grootDimension', 'GROOTFETCHSIZE', 'GROOTPOOLSIZE', 'GROOTCACHETTL', 'GROOTCACHEDIR']
+
+GROOTFETCHSIZE = 5000
+GROOTPOOLSIZE = 4
+GROOTCACHETTL = 3600
+GROOTCACHEDIR = os.path.join(CACHEDIR, 'groot')
+
+_cursorIds = itertools.count(1)
+_pools = {}
+_poolOwners = {}
+_poolLock = threading.Lock()
+
+
+def _clusterKey(context):
+    """cache key for the cluster (and helios access cluster) of an api context"""
+    if context is None:
+        context = pyhesity.COHESITY_API
+    keystring = json.dumps([context['APIROOT'], str(context['HEADER'].get('accessClusterId', ''))])
+    return hashlib.sha1(keystring.encode('utf-8')).hexdigest()[0:16]
+
+
+def _cacheRead(cacheFile, ttl):
+    """cached json if not older than ttl seconds, else None"""
+    try:
+        if time.time() - os.path.getmtime(cacheFile) > ttl:
+            return None
+        with open(cacheFile, 'r') as f:
+            return json.load(f)
+    except (OSError, IOError, ValueError):
+        return None
+
+
+def _cacheWrite(cacheFile, data):
+    """write json to a cache file readable only by the current user (skipped if data is not plain json)"""
+    try:
+        content = json.dumps(data)
+    except (TypeError, ValueError):
+        # e.g. Decimal or datetime columns, which would come back from the cache as different types
+        return
+    try:
+        if os.path.isdir(GROOTCACHEDIR) is False:
+            os.makedirs(GROOTCACHEDIR)
+        tmpFile = '%s.%s.tmp' % (cacheFile, os.getpid())
+        f = os.fdopen(os.open(tmpFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w')
+        f.write(content)
+        f.close()
+        try:
+            os.replace(tmpFile, cacheFile)
+        except AttributeError:
+            if os.path.exists(cacheFile):
+                os.remove(cacheFile)
+            os.rename(tmpFile, cacheFile)
+    except (OSError, IOError):
+        pass
+
+
+def _discover(context):
+    """reporting database connection info (not cached, since it includes the database password)"""
+    reporting = api('get', 'postgres', quiet=True, context=context)
+    if not isinstance(reporting, list) or len(reporting) == 0:
+        return None
+    return reporting[0]
+
+
+def _pool(context):
+    """connection pool for the cluster of an api context (created on first use)"""
+    clusterKey = _clusterKey(context)
+    with _poolLock:
+        if clusterKey in _pools:
+            return _pools[clusterKey]
+        reporting = _discover(context)
+        if reporting is None:
+            return None
+        pool = psycopg2.pool.ThreadedConnectionPool(1, GROOTPOOLSIZE, host=reporting['nodeIp'], port=reporting['port'], database="postgres", user=reporting['defaultUsername'], password=reporting['defaultPassword'])
+        _pools[clusterKey] = pool
+        return pool
+
+
+def grootConnect(context=None):
+    """borrow a connection to the cluster's reporting database from its pool (None if not found)"""
+    pool = _pool(context)
+    if pool is None:
+        return None
+    conn = pool.getconn()
+    _poolOwners[id(conn)] = pool
+    return conn
+
+
+def grootRelease(conn):
+    """return a connection to its pool"""
+    pool = _poolOwners.pop(id(conn), None)
+    if pool is not None:
+        pool.putconn(conn)
+    else:
+        conn.close()
+
+
+def grootDisconnect():
+    """close all pooled connections"""
+    with _poolLock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+        _poolOwners.clear()
+
+
+atexit.register(grootDisconnect)
+
+
+def _rowType(description):
+    """named tuple type for the columns of a query (column names made into valid identifiers)"""
+    names = [re.sub(r'\W+', '_', column[0]).strip('_').lower() or 'column' for column in description]
+    return namedtuple('GrootRow', names, rename=True)
+
+
+def grootQuery(conn, sql, params=None, fetchSize=None):
+    """yield query results as named tuples, streamed through a server side cursor fetchSize rows at a time"""
+    if fetchSize is None:
+        fetchSize = GROOTFETCHSIZE
+    cur = conn.cursor(name='groot_%s' % next(_cursorIds))
+    cur.itersize = fetchSize
+    try:
+        cur.execute(sql, params)
+        rowType = None
+        while True:
+            rows = cur.fetchmany(fetchSize)
+            if not rows:
+                break
+            if rowType is None:
+                rowType = _rowType(cur.description)
+            for row in rows:
+                yield rowType._make(row)
+    finally:
+        cur.close()
+
+
+def grootDimension(tableName, cacheTTL=None, conn=None, context=None):
+    """rows of a reporting table (e.g. protection_jobs, leaf_entities, environment_types), cached on disk for cacheTTL seconds"""
+    if cacheTTL is None:
+        cacheTTL = GROOTCACHETTL
+    if re.match(r'^\w+$', tableName) is None:
+        return None
+    cacheFile = os.path.join(GROOTCACHEDIR, '%s-%s' % (_clusterKey(context), tableName))
+    cached = None
+    if cacheTTL > 0:
+        cached = _cacheRead(cacheFile, cacheTTL)
+    if cached is None:
+        release = False
+        if conn is None:
+            conn = grootConnect(context=context)
+            if conn is None:
+                return None
+            release = True
+        try:
+            cur = conn.cursor()
+            cur.execute('select * from reporting.%s' % tableName)
+            cached = {'columns': [column[0] for column in cur.description], 'rows': [list(row) for row in cur.fetchall()]}
+            cur.close()
+        finally:
+            if release is True:
+                grootRelease(conn)
+        _cacheWrite(cacheFile, cached)
+    rowType = _rowType([(column,) for column in cached['columns']])
+    return [rowType._make(row) for row in cached['rows']]
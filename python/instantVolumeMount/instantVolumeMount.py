@@ -11,7 +11,6 @@
 
 # import pyhesity wrapper module
 from pyhesity import *
-from time import sleep
 
 # command line arguments
 import argparse
@@ -107,15 +106,11 @@ result = api('post', '/restore', mountTask)
 
 # wait for completion
 taskid = result['restoreTask']['performRestoreTaskState']['base']['taskId']
-finishedStates = ['kCanceled', 'kSuccess', 'kFailure']
-status = 'unknown'
-while status not in finishedStates:
-    sleep(3)
-    restoreTask = api('get', '/restoretasks/%s' % taskid)
-    status = restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus']
+restoreTask = waitRecoveries([taskid])[taskid]
+status = recoveryStatus(restoreTask)
 print("Volume mount ended with status %s" % status)
 if status == 'kSuccess':
-    print('Task ID for tearDown is: %s' % restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['taskId'])
-    mountPoints = restoreTask[0]['restoreTask']['performRestoreTaskState']['mountVolumesTaskState']['mountInfo']['mountVolumeResultVec']
+    print('Task ID for tearDown is: %s' % restoreTask['restoreTask']['performRestoreTaskState']['base']['taskId'])
+    mountPoints = restoreTask['restoreTask']['performRestoreTaskState']['mountVolumesTaskState']['mountInfo']['mountVolumeResultVec']
     for mountPoint in mountPoints:
         print('%s mounted to %s' % (mountPoint['originalVolumeName'], mountPoint['mountPoint']))
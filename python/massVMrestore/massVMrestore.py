@@ -6,7 +6,10 @@
 
 ### import pyhesity wrapper module
 from pyhesity import *
+from vcentertool import *
 from datetime import datetime
+from time import sleep
+import time
 import json
 
 ### command line arguments
@@ -23,6 +26,11 @@ parser.add_argument('-n', '--networkname', type=str, required=True)  # vm networ
 parser.add_argument('-s', '--suffix', type=str, default='')  # vm name suffix
 parser.add_argument('-p', '--poweron', action='store_true')  # power on VMs (default is false)
 parser.add_argument('-mf', '--maxfull', type=int, default=85)  # max full percentage of datastores
+parser.add_argument('-hc', '--hostconcurrency', type=int, default=4)  # max in-flight restores per ESX host
+parser.add_argument('-dc', '--datastoreconcurrency', type=int, default=4)  # max in-flight restores per datastore
+parser.add_argument('-i', '--pollinterval', type=int, default=15)  # seconds between task status polls
+parser.add_argument('-to', '--tasktimeout', type=int, default=240)  # minutes before giving up on a restore task (0 for no timeout)
+parser.add_argument('-ct', '--cachettl', type=int, default=None)  # seconds to reuse cached vCenter info (0 to refresh)
 
 args = parser.parse_args()
 
@@ -37,39 +45,42 @@ suffix = args.suffix
 poweron = args.poweron
 targetfile = args.targets
 maxfull = args.maxfull
+hostconcurrency = args.hostconcurrency
+datastoreconcurrency = args.datastoreconcurrency
+pollinterval = args.pollinterval
+tasktimeout = args.tasktimeout
+cachettl = args.cachettl
 
 ### authenticate
 apiauth(vip, username, domain)
 
 
-# function to map resourcepools to hosts
-def get_resourcepool(obj, parent, hostname):
-    global respoolid
-    if 'nodes' in obj:
-        if obj['protectionSource']['name'] == hostname:
-            for node in obj['nodes']:
-                if node['protectionSource']['vmWareProtectionSource']['type'] == 'kResourcePool':
-                    respoolid = node['protectionSource']['id']
-                    break
-        for node in obj['nodes']:
-            get_resourcepool(node, obj['protectionSource']['name'], hostname)
+# function to find the latest local snapshot of a vm
+def get_localversion(vm):
+    for version in vm['objectInfo']['versions']:
+        for replicaVec in version['replicaInfo']['replicaVec']:
+            if replicaVec['target']['type'] == 1:
+                return version
+    return None
+
+
+# function to get the size of a vm
+def get_vmbytes(vm):
+    return vm['objectInfo']['versions'][0]['primaryPhysicalSizeBytes']
+
+
+# function to format seconds as h:mm:ss
+def duration(seconds):
+    seconds = int(seconds)
+    return '%d:%02d:%02d' % (seconds / 3600, (seconds % 3600) / 60, seconds % 60)
 
 
 # get vcenter info
-vcentersource = None
-vcenterid = None
-sources = api('get', 'protectionSources')
-for source in sources:
-    if source['protectionSource']['name'].lower() == vcentername.lower():
-        vcentersource = source
-        vcenterid = source['protectionSource']['id']
-
-vcenter = [vcenter for vcenter in api('get', '/entitiesOfType?environmentTypes=kVMware&vmwareEntityTypes=kVCenter') if vcenter['displayName'].lower() == vcentername.lower()]
-if vcenter:
-    vcenterentity = vcenter[0]
-else:
+catalog = vcenterCatalog(vcentername, cacheTTL=cachettl)
+if catalog is None:
     print("vcenter %s not found!" % vcentername)
     exit(1)
+vcenterentity = catalog.entity
 
 # find vms for recovery
 vms = api('get', "/searchvms?entityTypes=kAcropolis&entityTypes=kAWS&entityTypes=kAzure&entityTypes=kGenericNas&entityTypes=kHyperV&entityTypes=kIsilon&entityTypes=kKVM&entityTypes=kNetapp&entityTypes=kPhysical&entityTypes=kView&entityTypes=kVMware&vmName=%s" % jobname)
@@ -91,9 +102,6 @@ else:
 # sort vms by size
 vmlistsorted = sorted(vmlist, key=lambda vm: vm['objectInfo']['versions'][0]['primaryPhysicalSizeBytes'], reverse=True)
 
-# get resource pools
-resourcepools = api('get', '/resourcePools?vCenterId=%s' % vcenterid)
-
 # get target locations
 targets = json.load(open(targetfile, 'r'))['targets']
 
@@ -102,128 +110,229 @@ targetdatastores = {}
 for target in targets:
 
     # get resource pool for the host
-    respoolid = None
-    get_resourcepool(vcentersource, '', target['hostname'])
-    resourcepoolid = respoolid
-    for resourcepool in resourcepools:
-        if resourcepool['resourcePool']['id'] == resourcepoolid:
-            target['resourcepool'] = resourcepool['resourcePool']
-    if 'resourcepool' not in target:
+    host = catalog.host(target['hostname'])
+    if host is not None:
+        resourcepoolid = catalog.resourcePoolId(host)
+        target['resourcepool'] = catalog.resourcePool(resourcepoolid)
+    if target.get('resourcepool', None) is None:
         print('could not find resource pool for host %s' % target['hostname'])
         exit(1)
 
     # get datastore
     target['datastorename'] = target['datastorename'].lower()
-    datastores = api('get', '/datastores?vCenterId=%s&resourcePoolId=%s' % (vcenterid, resourcepoolid))
-    for datastore in datastores:
-        if datastore['displayName'].lower() == target['datastorename']:
-            target['datastore'] = datastore
-            target['queuedbytes'] = 0
-            target['vmqueue'] = []
-            if target['datastorename'] not in targetdatastores:
-                targetdatastores[target['datastorename']] = {}
-            targetdatastores[target['datastorename']]['capacity'] = datastore['vmwareEntity']['datastoreInfo']['capacity']
-            targetdatastores[target['datastorename']]['freeSpace'] = datastore['vmwareEntity']['datastoreInfo']['freeSpace']
-            targetdatastores[target['datastorename']]['queuedbytes'] = 0
-
-    if 'datastore' not in target:
+    datastore = catalog.datastore(resourcepoolid, target['datastorename'])
+    if datastore is None:
         print('could not find datastore %s' % target['datastorename'])
         exit(1)
+    target['datastore'] = datastore
+    target['queuedbytes'] = 0
+    target['vmqueue'] = []
+    if target['datastorename'] not in targetdatastores:
+        targetdatastores[target['datastorename']] = {}
+    targetdatastores[target['datastorename']]['capacity'] = datastore['vmwareEntity']['datastoreInfo']['capacity']
+    targetdatastores[target['datastorename']]['freeSpace'] = datastore['vmwareEntity']['datastoreInfo']['freeSpace']
+    targetdatastores[target['datastorename']]['queuedbytes'] = 0
 
 ### find VM network
-networkentity = None
-networks = api('get', '/networkEntities?vCenterId=%s&resourcePoolId=%s' % (vcenterid, resourcepoolid))
-for network in networks:
-    if network['displayName'].lower() == networkname.lower():
-        networkentity = network
+networkentity = catalog.network(resourcepoolid, networkname)
 if networkentity is None:
     print("VM network %s not found!" % networkname)
     exit(1)
 
 ### find folder
-folderentity = None
-folders = api('get', '/vmwareFolders?vCenterId=%s&resourcePoolId=%s' % (vcenterid, resourcepoolid))
-for folder in folders['vmFolders']:
-    if folder['displayName'].lower() == foldername.lower():
-        folderentity = folder
+folderentity = catalog.folder(resourcepoolid, foldername)
 if folderentity is None:
     print("VM folder %s not found!" % foldername)
     exit(1)
 
 ### distribute vms into target queues
 for vm in vmlistsorted:
+    if get_localversion(vm) is None:
+        # skip this vm if there's no local snapshot
+        print('vm %s has no local snapshot. not restoring' % vm['objectName'])
+        continue
     targetlistsorted = sorted(targets, key=lambda target: target['queuedbytes'])
     foundtarget = False
     for target in targetlistsorted:
         if foundtarget is False:
             minimumfreespace = targetdatastores[target['datastorename']]['capacity'] * (100 - maxfull) / 100
-            estimatedfree = targetdatastores[target['datastorename']]['freeSpace'] - targetdatastores[target['datastorename']]['queuedbytes'] - vm['objectInfo']['versions'][0]['primaryPhysicalSizeBytes']
+            estimatedfree = targetdatastores[target['datastorename']]['freeSpace'] - targetdatastores[target['datastorename']]['queuedbytes'] - get_vmbytes(vm)
             if estimatedfree > minimumfreespace:
                 target['vmqueue'].append(vm)
-                target['queuedbytes'] += vm['objectInfo']['versions'][0]['primaryPhysicalSizeBytes']
-                targetdatastores[target['datastorename']]['queuedbytes'] += vm['objectInfo']['versions'][0]['primaryPhysicalSizeBytes']
-                targetdatastores[target['datastorename']]['freeSpace'] -= vm['objectInfo']['versions'][0]['primaryPhysicalSizeBytes']
+                target['queuedbytes'] += get_vmbytes(vm)
+                targetdatastores[target['datastorename']]['queuedbytes'] += get_vmbytes(vm)
+                targetdatastores[target['datastorename']]['freeSpace'] -= get_vmbytes(vm)
                 foundtarget = True
     if foundtarget is False:
         print('Not enough datastore capacity! Please add more targets and try again.')
 
-### launch recovery tasks
+### recovery scheduler
+hostinflight = dict((target['hostname'], 0) for target in targets)
+datastoreinflight = dict((target['datastorename'], 0) for target in targets)
+inflight = {}
+finishedvms = []
 for target in targets:
-    if target['queuedbytes'] > 0:
-
-        taskName = '%s-%s-%s-%s' % (jobname.replace(' ', '-'),
-                                    target['hostname'].replace('.', '-'),
-                                    target['datastorename'],
-                                    datetime.now().strftime("%Y-%m-%d-%H-%M-%S"))
-
-        restoreParams = {
-            "name": taskName,
-            "objects": [],
-            "powerStateConfig": {
-                "powerOn": poweron
-            },
-            "continueRestoreOnError": True,
-            "restoreParentSource": vcenterentity,
-            "restoredObjectsNetworkConfig": {
-                "networkEntity": networkentity,
-                "disableNetwork": False
-            },
-            "resourcePoolEntity": target['resourcepool'],
-            "datastoreEntity": target['datastore'],
-            "vmwareParams": {
-                "targetVmFolder": folderentity
+    target['recoveredbytes'] = 0
+    target['recoveredseconds'] = 0
+    target['recoveredvms'] = 0
+    target['failedvms'] = 0
+
+
+# function to check for a free restore slot on a target host and datastore
+def has_slot(target):
+    return hostinflight[target['hostname']] < hostconcurrency and datastoreinflight[target['datastorename']] < datastoreconcurrency
+
+
+# function to estimate the seconds needed to recover the queue of a target at its observed rate
+def get_remainingseconds(target):
+    if target['recoveredseconds'] > 0 and target['recoveredbytes'] > 0:
+        rate = float(target['recoveredbytes']) / target['recoveredseconds']
+    else:
+        recoveredbytes = sum([t['recoveredbytes'] for t in targets])
+        recoveredseconds = sum([t['recoveredseconds'] for t in targets])
+        if recoveredseconds > 0 and recoveredbytes > 0:
+            rate = float(recoveredbytes) / recoveredseconds
+        else:
+            rate = 1.0
+    return target['queuedbytes'] / rate
+
+
+# function to move a queued vm from the slowest busy target to an idle target
+def rebalance(target):
+    donors = [t for t in targets if t is not target and len(t['vmqueue']) > 0 and has_slot(t) is False]
+    if len(donors) == 0:
+        return False
+    donor = max(donors, key=get_remainingseconds)
+    # take the smallest vm from the donor queue (queues are sorted largest first)
+    vm = donor['vmqueue'][-1]
+    if donor['datastorename'] != target['datastorename']:
+        minimumfreespace = targetdatastores[target['datastorename']]['capacity'] * (100 - maxfull) / 100
+        estimatedfree = targetdatastores[target['datastorename']]['freeSpace'] - targetdatastores[target['datastorename']]['queuedbytes'] - get_vmbytes(vm)
+        if estimatedfree <= minimumfreespace:
+            return False
+        targetdatastores[donor['datastorename']]['queuedbytes'] -= get_vmbytes(vm)
+        targetdatastores[donor['datastorename']]['freeSpace'] += get_vmbytes(vm)
+        targetdatastores[target['datastorename']]['queuedbytes'] += get_vmbytes(vm)
+        targetdatastores[target['datastorename']]['freeSpace'] -= get_vmbytes(vm)
+    donor['vmqueue'].pop()
+    donor['queuedbytes'] -= get_vmbytes(vm)
+    target['vmqueue'].append(vm)
+    target['queuedbytes'] += get_vmbytes(vm)
+    print('moving %s from %s/%s to %s/%s' % (vm['objectName'], donor['hostname'], donor['datastorename'], target['hostname'], target['datastorename']))
+    return True
+
+
+# function to start a recovery task for one vm
+def launch(target, vm):
+    version = get_localversion(vm)
+    taskName = '%s-%s-%s-%s' % (jobname.replace(' ', '-'),
+                                vm['objectName'].replace(' ', '-'),
+                                target['datastorename'],
+                                datetime.now().strftime("%Y-%m-%d-%H-%M-%S"))
+
+    restoreParams = {
+        "name": taskName,
+        "objects": [
+            {
+                "jobId": vm['objectInfo']['objectId']['jobId'],
+                "jobUid": vm['objectInfo']['objectId']['jobUid'],
+                "entity": vm['objectInfo']['objectId']['entity'],
+                "jobInstanceId": version['instanceId']['jobInstanceId'],
+                "startTimeUsecs": version['instanceId']['jobStartTimeUsecs'],
             }
+        ],
+        "powerStateConfig": {
+            "powerOn": poweron
+        },
+        "continueRestoreOnError": True,
+        "restoreParentSource": vcenterentity,
+        "restoredObjectsNetworkConfig": {
+            "networkEntity": networkentity,
+            "disableNetwork": False
+        },
+        "resourcePoolEntity": target['resourcepool'],
+        "datastoreEntity": target['datastore'],
+        "vmwareParams": {
+            "targetVmFolder": folderentity
         }
-        # add vms to this recovery task
-        for vm in target['vmqueue']:
-            versionid = 0
-            versionNum = 0
-            foundLocalSnapshot = False
-            # find latest local snapshot for this vm
-            for version in vm['objectInfo']['versions']:
-                for replicaVec in version['replicaInfo']['replicaVec']:
-                    if replicaVec['target']['type'] == 1 and foundLocalSnapshot is False:
-                        foundLocalSnapshot = True
-                        versionid = versionNum
-                versionNum += 1
-            if foundLocalSnapshot:
-                restoreParams['objects'].append(
-                    {
-                        "jobId": vm['objectInfo']['objectId']['jobId'],
-                        "jobUid": vm['objectInfo']['objectId']['jobUid'],
-                        "entity": vm['objectInfo']['objectId']['entity'],
-                        "jobInstanceId": vm['objectInfo']['versions'][versionid]['instanceId']['jobInstanceId'],
-                        "startTimeUsecs": vm['objectInfo']['versions'][versionid]['instanceId']['jobStartTimeUsecs'],
-                    }
-                )
-            else:
-                # skip this vm if there's no local snapshot
-                print('vm %s has no local snapshot. not restoring' % vm['objectName'])
-
-        if suffix:
-            # add the suffix if specified
-            restoreParams['renameRestoredObjectParam'] = {"suffix": '-' + suffix}
-
-        # start this recovery task
-        print("Starting recovery %s..." % (taskName))
-        recoveryStatus = api('post', '/restore', restoreParams)
+    }
+
+    if suffix:
+        # add the suffix if specified
+        restoreParams['renameRestoredObjectParam'] = {"suffix": '-' + suffix}
+
+    # start this recovery task
+    target['queuedbytes'] -= get_vmbytes(vm)
+    targetdatastores[target['datastorename']]['queuedbytes'] -= get_vmbytes(vm)
+    print("Starting recovery %s..." % (taskName))
+    restoreTask = api('post', '/restore', restoreParams)
+    try:
+        taskId = restoreTask['restoreTask']['performRestoreTaskState']['base']['taskId']
+    except (KeyError, TypeError):
+        print('failed to start recovery of %s' % vm['objectName'])
+        target['failedvms'] += 1
+        finishedvms.append({'vm': vm, 'status': 'failed to start', 'started': time.time(), 'finished': time.time()})
+        return
+    hostinflight[target['hostname']] += 1
+    datastoreinflight[target['datastorename']] += 1
+    inflight[taskId] = {'vm': vm, 'target': target, 'started': time.time()}
+
+
+# function to free the slot of a finished recovery task
+def finished(taskId, status, restoreTask):
+    task = inflight.pop(taskId)
+    target = task['target']
+    task['status'] = status
+    task['finished'] = time.time()
+    hostinflight[target['hostname']] -= 1
+    datastoreinflight[target['datastorename']] -= 1
+    if status in ['kSuccess', 'kWarning']:
+        target['recoveredvms'] += 1
+        target['recoveredbytes'] += get_vmbytes(task['vm'])
+        target['recoveredseconds'] += task['finished'] - task['started']
+    else:
+        target['failedvms'] += 1
+    finishedvms.append(task)
+    print('%s finished with status %s (%s)' % (task['vm']['objectName'], status, duration(task['finished'] - task['started'])))
+
+
+# function to give up on recovery tasks that have not finished in time
+def timedout():
+    if tasktimeout <= 0:
+        return
+    for taskId in list(inflight.keys()):
+        if time.time() - inflight[taskId]['started'] > tasktimeout * 60:
+            finished(taskId, 'kTimedOut', None)
+
+
+starttime = time.time()
+while True:
+    # start the next vms as soon as slots free up
+    for target in targets:
+        while has_slot(target):
+            if len(target['vmqueue']) == 0 and rebalance(target) is False:
+                break
+            launch(target, target['vmqueue'].pop(0))
+    if len(inflight) == 0:
+        break
+    sleep(pollinterval)
+    waitRecoveries(list(inflight.keys()), callback=finished, timeout=0)
+    timedout()
+
+### summary
+elapsed = max(time.time() - starttime, 1)
+recovered = [task for task in finishedvms if task['status'] in ['kSuccess', 'kWarning']]
+recoveredbytes = sum([get_vmbytes(task['vm']) for task in recovered])
+print('\nRecovered %s of %s VMs (%s failed) in %s' % (len(recovered), len(finishedvms), len(finishedvms) - len(recovered), duration(elapsed)))
+print('Throughput: %.1f VMs/hour, %.1f GiB/hour' % (len(recovered) * 3600.0 / elapsed, recoveredbytes * 3600.0 / elapsed / (1024 * 1024 * 1024)))
+if len(recovered) > 0:
+    timetorecover = sorted([task['finished'] - starttime for task in recovered])
+    taskseconds = sorted([task['finished'] - task['started'] for task in recovered])
+    print('Time to recover: first %s, median %s, 90th percentile %s, last %s' % (duration(timetorecover[0]), duration(timetorecover[int(len(timetorecover) * 0.5)]), duration(timetorecover[int(len(timetorecover) * 0.9)]), duration(timetorecover[-1])))
+    print('Recovery task duration: median %s, max %s' % (duration(taskseconds[int(len(taskseconds) * 0.5)]), duration(taskseconds[-1])))
+print('\n%-30s %-20s %10s %8s %10s %12s' % ('Host', 'Datastore', 'Recovered', 'Failed', 'GiB', 'Avg Minutes'))
+for target in targets:
+    avgminutes = 0
+    if target['recoveredvms'] > 0:
+        avgminutes = target['recoveredseconds'] / target['recoveredvms'] / 60
+    print('%-30s %-20s %10s %8s %10.1f %12.1f' % (target['hostname'], target['datastorename'], target['recoveredvms'], target['failedvms'], target['recoveredbytes'] / (1024.0 * 1024 * 1024), avgminutes))
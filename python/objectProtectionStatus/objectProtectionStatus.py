@@ -78,28 +78,10 @@ for rootNode in sources['rootNodes']:
 
 ### get object ID
 def getObjectId(objectname):
-
-    d = {'_object_id': None}
-
-    def get_nodes(node):
-        if 'name' in node:
-            if node['name'].lower() == objectname.lower():
-                d['_object_id'] = node['id']
-        if 'protectionSource' in node:
-            if node['protectionSource']['name'].lower() == objectname.lower():
-                d['_object_id'] = node['protectionSource']['id']
-        if 'nodes' in node:
-            for node in node['nodes']:
-                if d['_object_id'] is None:
-                    get_nodes(node)
-                else:
-                    break
-
-    for source in sources:
-        if d['_object_id'] is None:
-            get_nodes(source)
-
-    return d['_object_id']
+    objects = findSources(sourceIndex(api('get', 'protectionSources')), name=objectname)
+    if len(objects) == 0:
+        return None
+    return objects[0].get('protectionSource', objects[0])['id']
 
 
 # jobs = [job for job in api('get', 'protectionJobs') if 'isDeleted' not in job and ('isActive' not in job or job['isActive'] is not False)]
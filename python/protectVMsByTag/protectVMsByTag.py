@@ -60,36 +60,23 @@ else:
     vcenter = vcenters[0]
 
 
-# get object ID function
-def getObjectId(objectName, source):
-
-    d = {'_object_id': None}
+# index the vCenter source tree for tag lookups
+vcenterTree = sourceIndex(vcenter)
 
-    def get_nodes(node):
-        if 'name' in node:
-            if node['name'].lower() == objectName.lower():
-                d['_object_id'] = node['id']
-                exit
-        if 'protectionSource' in node:
-            if node['protectionSource']['name'].lower() == objectName.lower():
-                d['_object_id'] = node['protectionSource']['id']
-                exit
-        if 'nodes' in node:
-            for node in node['nodes']:
-                if d['_object_id'] is None:
-                    get_nodes(node)
-                else:
-                    exit
 
-    get_nodes(source)
-    return d['_object_id']
+# get object ID function
+def getObjectId(objectName):
+    nodes = findSources(vcenterTree, name=objectName)
+    if len(nodes) > 0:
+        return nodes[0]['protectionSource']['id']
+    return None
 
 
 # gather include tag IDs
 includeTagIds = []
 if includetags is not None:
     for tag in includetags:
-        tagId = getObjectId(tag, vcenter)
+        tagId = getObjectId(tag)
         if tagId is not None:
             includeTagIds.append(tagId)
         else:
@@ -100,7 +87,7 @@ if includetags is not None:
 excludeTagIds = []
 if excludetags is not None:
     for tag in excludetags:
-        tagId = getObjectId(tag, vcenter)
+        tagId = getObjectId(tag)
         if tagId is not None:
             excludeTagIds.append(tagId)
         else:
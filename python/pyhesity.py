@@ -1,5 +1,5 @@
 #!/usr/bin/env python
-"""Cohesity Python REST API Wrapper Module - 2022.08.03"""
+"""Cohesity Python REST API Wrapper Module - 2026.10.18"""
 
 ##########################################################################################
 # Change Log
@@ -31,6 +31,23 @@
 # 2022.03.07 - Hide bad password in auth error
 # 2022.05.19 - Fix MFA for session auth
 # 2022.08.02 - Fixed password prompt=False processing
+# 2026.10.18 - added pooled keep-alive session per api context
+# 2026.10.18 - added apimany for concurrent batch api calls
+# 2026.10.18 - added getRuns paging generator for v1/v2 protection runs
+# 2026.10.18 - added reportPreview streaming fetcher for Helios reporting v2
+# 2026.10.18 - added walkDirectory parallel /vm/directoryList walker
+# 2026.10.18 - added pending/checkpoint hooks to walkDirectory for resumable walks
+# 2026.10.18 - added opt-in on-disk TTL cache for inventory api calls
+# 2026.10.18 - added sourceIndex for indexed protection source tree lookups
+# 2026.10.18 - added heliosContext and clusterMap for parallel multi-cluster work
+# 2026.10.18 - added persistent access token cache with proactive refresh
+# 2026.10.18 - added retry/backoff, Retry-After and per context rate/concurrency limits
+# 2026.10.18 - added apitrace instrumentation (summary, JSONL and Prometheus textfile sinks)
+# 2026.10.18 - added consumerStats batched stats/consumers fetcher
+# 2026.10.18 - added waitRecoveries batched multi-task recovery waiter
+# 2026.10.18 - cache only exact inventory endpoints, evict cached endpoints on post/put/delete
+# 2026.10.18 - token lifetime from the token response, drop cached token on unrefreshable 401
+# 2026.10.18 - getContext and heliosCluster copies keep apilimit settings
 #
 ##########################################################################################
 # Install Notes
@@ -46,12 +63,27 @@
 from datetime import datetime
 import time
 import json
+import threading
 import requests
 import getpass
 import base64
+import hashlib
 import os
+import re
+import sys
+import atexit
+import random
 import urllib3
 from os.path import expanduser
+from multiprocessing.pool import ThreadPool
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+try:
+    from urllib.parse import quote_plus
+except ImportError:
+    from urllib import quote_plus
 
 ### ignore unsigned certificates
 import requests.packages.urllib3
@@ -82,7 +114,24 @@ __all__ = ['api_version',
            'heliosClusters',
            'getContext',
            'setContext',
-           'getDate']
+           'getDate',
+           'apisession',
+           'apimany',
+           'getRuns',
+           'reportPreview',
+           'walkDirectory',
+           'apicache',
+           'sourceIndex',
+           'findSources',
+           'sourceAncestors',
+           'heliosContext',
+           'heliosContexts',
+           'clusterMap',
+           'apilimit',
+           'apitrace',
+           'consumerStats',
+           'waitRecoveries',
+           'recoveryStatus']
 
 COHESITY_API = {
     'APIROOT': '',
@@ -96,11 +145,41 @@ CONFIGDIR = expanduser("~") + '/.pyhesity'
 SCRIPTDIR = os.path.dirname(os.path.realpath(__file__))
 PWFILE = os.path.join(SCRIPTDIR, 'YWRtaW4')
 LOGFILE = os.path.join(SCRIPTDIR, 'pyhesity-debug.log')
-api_version = '2022.08.02'
+api_version = '2026.10.18'
+POOLSIZE = 10
+CACHEDIR = os.path.join(CONFIGDIR, 'cache')
+CACHEMAXSIZE = 512 * 1024 * 1024
+CACHEENABLED = os.environ.get('PYHESITY_CACHE', '0') not in ['', '0']
+CACHETTLS = {
+    'protectionSources': 3600,
+    'protectionJobs': 3600,
+    'protectionPolicies': 3600,
+    'entitiesOfType': 3600,
+    'data-protect/policies': 3600,
+    'data-protect/protection-groups': 3600,
+    'data-protect/sources': 3600
+}
+TOKENLIFETIME = 86400
+TOKENREFRESH = 900
+TOKENLOCK = threading.Lock()
+RETRIES = 4
+RETRYDELAY = 1
+RETRYMAXDELAY = 60
+RETRYSTATUS = [429, 500, 502, 503, 504]
+MAXCONCURRENCY = 16
+LIMITSLOCK = threading.Lock()
+TRACESINKS = []
+TRACESTATS = {}
+TRACELOCK = threading.Lock()
+TRACEREGISTERED = {'summary': False, 'jsonl': [], 'prometheus': []}
+RECOVERYFINISHEDSTATES = {
+    1: ['kCanceled', 'kSuccess', 'kFailure', 'kWarning'],
+    2: ['Canceled', 'Succeeded', 'SucceededWithWarning', 'Failed', 'Missed', 'Skipped']
+}
 
 
 ### authentication
-def apiauth(vip='helios.cohesity.com', username='helios', domain='local', password=None, updatepw=None, prompt=None, quiet=None, helios=False, useApiKey=False, tenantId=None, noretry=False, regionid=None, mfaType='Totp', mfaCode=None, emailMfaCode=False):
+def apiauth(vip='helios.cohesity.com', username='helios', domain='local', password=None, updatepw=None, prompt=None, quiet=None, helios=False, useApiKey=False, tenantId=None, noretry=False, regionid=None, mfaType='Totp', mfaCode=None, emailMfaCode=False, poolSize=None, tokenCache=True):
     """authentication function"""
     global COHESITY_API
     global HELIOSCLUSTERS
@@ -109,11 +188,16 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
     COHESITY_API['APIROOTMCM'] = 'https://%s/mcm/' % vip
     COHESITY_API['APIROOTMCMv2'] = 'https://%s/v2/mcm/' % vip
     COHESITY_API['APIROOTREPORTINGv2'] = 'https://%s/heliosreporting/api/v1/public/' % vip
+    COHESITY_API['SESSION'] = apisession(poolSize=poolSize)
+    COHESITY_API['AUTH'] = None
+    COHESITY_API['LIMITS'] = None
+    session = COHESITY_API['SESSION']
 
     if '\\' in username:
         (domain, username) = username.split('\\')
     if '/' in username:
         (domain, username) = username.split('/')
+    COHESITY_API['USER'] = '%s/%s' % (domain, username)
 
     pwd = password
     if password is None:
@@ -130,7 +214,7 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
             COHESITY_API['HEADER']['regionid'] = regionid
         URL = COHESITY_API['APIROOTMCM'] + 'clusters/connectionStatus'
         try:
-            HELIOSCLUSTERS = (requests.get(URL, headers=COHESITY_API['HEADER'], verify=False)).json()
+            HELIOSCLUSTERS = (session.get(URL, headers=COHESITY_API['HEADER'], verify=False)).json()
             if HELIOSCLUSTERS is not None and 'message' in HELIOSCLUSTERS:
                 print(HELIOSCLUSTERS['message'])
                 if 'Authentication failed' in HELIOSCLUSTERS['message'] and noretry is False:
@@ -145,7 +229,7 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
                     print("Connected!")
             else:
                 URL = COHESITY_API['APIROOTMCMv2'] + 'dms/regions'
-                REGIONS = (requests.get(URL, headers=COHESITY_API['HEADER'], verify=False)).json()
+                REGIONS = (session.get(URL, headers=COHESITY_API['HEADER'], verify=False)).json()
                 if REGIONS is not None and 'message' in REGIONS:
                     print(REGIONS['message'])
                     COHESITY_API['AUTHENTICATED'] = False
@@ -179,23 +263,34 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
         emailcreds = json.dumps({"domain": domain, "password": pwd, "username": username})
 
         url = COHESITY_API['APIROOT'] + '/public/accessTokens'
+        tokenFile = os.path.join(CONFIGDIR, 'token-%s-%s-%s' % (vip, domain, username))
+        if tenantId is not None:
+            tokenFile += '-%s' % tenantId
+        COHESITY_API['AUTH'] = {'url': url, 'creds': creds, 'tenantId': tenantId, 'tokenFile': None, 'expires': None,
+                                'refresh': mfaCode is None and emailMfaCode is False}
+        if tokenCache is True:
+            COHESITY_API['AUTH']['tokenFile'] = tokenFile
+            COHESITY_API['AUTH']['pwhash'] = hashlib.sha256(('%s%s%s' % (vip, username, pwd)).encode('utf-8')).hexdigest()
+            # reuse a cached access token if it is not about to expire
+            if updatepw is None and __usetoken(COHESITY_API, __gettoken(COHESITY_API['AUTH'])) is True:
+                COHESITY_API['AUTHENTICATED'] = True
+                if(quiet is None):
+                    print("Connected!")
+                return None
         try:
             if emailMfaCode is True:
                 emailurl = COHESITY_API['APIROOTv2'] + 'email-otp'
-                response = requests.post(emailurl, data=emailcreds, headers=COHESITY_API['HEADER'], verify=False)
+                response = session.post(emailurl, data=emailcreds, headers=COHESITY_API['HEADER'], verify=False)
                 mfaCode = getpass.getpass("Enter emailed MFA code: ")
                 creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": 'Email', "otpCode": mfaCode})
 
-            response = requests.post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False)
+            startTime = time.time()
+            response = session.post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False)
+            if TRACESINKS:
+                __trace('post', url, response, startTime)
             if response != '':
                 if response.status_code == 201:
-                    accessToken = response.json()['accessToken']
-                    tokenType = response.json()['tokenType']
-                    COHESITY_API['HEADER'] = {'accept': 'application/json',
-                                              'content-type': 'application/json',
-                                              'authorization': tokenType + ' ' + accessToken}
-                    if tenantId is not None:
-                        COHESITY_API['HEADER']['x-impersonate-tenant-id'] = '%s/' % tenantId
+                    __usetoken(COHESITY_API, __savetoken(COHESITY_API['AUTH'], response.json()))
                     COHESITY_API['AUTHENTICATED'] = True
                     if(quiet is None):
                         print("Connected!")
@@ -208,9 +303,10 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
                             if emailMfaCode is True:
                                 creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": 'email', "otpCode": mfaCode})
                             # creds = json.dumps({"domain": domain, "password": pwd, "username": username})
-                            response = requests.post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False)
+                            response = session.post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False)
                             if response != '':
                                 if response.status_code == 201:
+                                    COHESITY_API['AUTH'] = None
                                     sessionId = response.json()['sessionId']
                                     COHESITY_API['HEADER'] = {'accept': 'application/json',
                                                               'content-type': 'application/json',
@@ -256,6 +352,8 @@ def apiconnected():
 def apidrop():
     global COHESITY_API
     COHESITY_API['AUTHENTICATED'] = False
+    if COHESITY_API.get('SESSION', None) is not None:
+        COHESITY_API['SESSION'].close()
 
 
 def heliosCluster(clusterName=None, verbose=False):
@@ -281,9 +379,67 @@ def heliosClusters():
     return sorted(CONNECTEDHELIOSCLUSTERS, key=lambda cluster: cluster['name'].lower())
 
 
+def heliosContext(clusterName):
+    """return a copy of the helios api context that accesses the named cluster"""
+    if isinstance(clusterName, dict) is True:
+        clusterName = clusterName['name']
+    accessCluster = [cluster for cluster in CONNECTEDHELIOSCLUSTERS if cluster['name'].lower() == clusterName.lower()]
+    if not accessCluster:
+        print('Cluster %s not connected to Helios' % clusterName)
+        return None
+    context = COHESITY_API.copy()
+    context['HEADER'] = COHESITY_API['HEADER'].copy()
+    context['HEADER']['accessClusterId'] = str(accessCluster[0]['clusterId'])
+    # each context gets its own rate/concurrency limits, starting with the same settings
+    context['LIMITS'] = __copylimits(COHESITY_API)
+    return context
+
+
+def heliosContexts(clusterNames=None):
+    """return (clusterName, context) for each (or every connected) helios cluster"""
+    if clusterNames is None:
+        clusterNames = [cluster['name'] for cluster in heliosClusters()]
+    contexts = []
+    for clusterName in clusterNames:
+        context = heliosContext(clusterName)
+        if context is not None:
+            contexts.append((clusterName, context))
+    return contexts
+
+
+### parallel multi-cluster work
+def clusterMap(func, contexts, workers=None):
+    """run func(clusterName, context) for each (clusterName, context) concurrently, returns (clusterName, result) in input order"""
+    if workers is None:
+        workers = POOLSIZE
+    contexts = list(contexts)
+    if len(contexts) == 0:
+        return []
+
+    def __clusterwork(item):
+        (clusterName, context) = item
+        try:
+            return (clusterName, func(clusterName, context))
+        except Exception as e:
+            __writelog(e)
+            return (clusterName, {'error': '%s: %s' % (clusterName, e)})
+
+    pool = ThreadPool(min(workers, len(contexts)))
+    try:
+        results = pool.map(__clusterwork, contexts)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
 ### api call function
-def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None):
-    """api call function"""
+def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None, cache=None):
+    """api call function
+
+    cache: None = use the on-disk cache for known inventory endpoints if enabled (see apicache),
+           False = bypass the cache, True or seconds = cache this call (default or given TTL)
+    """
     if context is not None:
         THISCONTEXT = context
     else:
@@ -307,15 +463,28 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
             url = THISCONTEXT['APIROOT'] + uri
 
     if method in APIMETHODS:
+        cachekey = None
+        if method == 'get':
+            cachettl = __cachettl(uri, cache)
+            if cachettl is not None:
+                cachekey = __cachekey(THISCONTEXT, uri, url)
+                cached = __cacheget(cachekey, cachettl)
+                if cached is not None:
+                    return cached
+        session = __getsession(THISCONTEXT)
         try:
-            if method == 'get':
-                response = requests.get(url, headers=THISCONTEXT['HEADER'], verify=False)
-            if method == 'post':
-                response = requests.post(url, headers=THISCONTEXT['HEADER'], json=data, verify=False)
-            if method == 'put':
-                response = requests.put(url, headers=THISCONTEXT['HEADER'], json=data, verify=False)
-            if method == 'delete':
-                response = requests.delete(url, headers=THISCONTEXT['HEADER'], json=data, verify=False)
+            # refresh the access token ahead of expiry, or once if it was rejected
+            auth = THISCONTEXT.get('AUTH', None)
+            if auth is not None and auth['expires'] is not None and time.time() > auth['expires'] - TOKENREFRESH:
+                __refreshtoken(THISCONTEXT, THISCONTEXT['HEADER'].get('authorization', None))
+            authorization = THISCONTEXT['HEADER'].get('authorization', None)
+            response = __apisend(THISCONTEXT, session, method, url, data)
+            if response.status_code == 401 and auth is not None:
+                if __refreshtoken(THISCONTEXT, authorization) is True:
+                    response = __apisend(THISCONTEXT, session, method, url, data)
+                if response.status_code == 401:
+                    # the token was revoked or expired and could not be refreshed
+                    __droptoken(auth)
         except requests.exceptions.RequestException as e:
             __writelog(e)
             if quiet is None:
@@ -324,6 +493,8 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
         if isinstance(response, bool):
             return ''
         if response != '':
+            if method != 'get' and response.status_code < 400:
+                __cacheevict(THISCONTEXT, uri)
             if response.status_code == 204:
                 return ''
             if response.status_code == 404:
@@ -347,12 +518,1024 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
                             return('error')
                     return None
                 else:
+                    if cachekey is not None:
+                        __cacheput(cachekey, responsejson)
                     return responsejson
     else:
         if quiet is None:
             print("invalid api method")
 
 
+def __apirequest(session, method, url, data, header):
+    if method == 'get':
+        return session.get(url, headers=header, verify=False)
+    if method == 'post':
+        return session.post(url, headers=header, json=data, verify=False)
+    if method == 'put':
+        return session.put(url, headers=header, json=data, verify=False)
+    if method == 'delete':
+        return session.delete(url, headers=header, json=data, verify=False)
+
+
+### retries and rate/concurrency limits
+def apilimit(rate=None, burst=None, concurrency=None, context=None):
+    """limit api calls for a context to rate calls per second (token bucket) and concurrency simultaneous calls
+       contexts copied later (getContext, heliosCluster) start with the same limits but have their own token bucket and semaphore"""
+    if context is None:
+        context = COHESITY_API
+    limits = __getlimits(context)
+    with limits['lock']:
+        limits['rate'] = rate
+        limits['burst'] = burst or rate or 1
+        limits['tokens'] = limits['burst']
+        limits['last'] = time.time()
+        if concurrency is not None:
+            limits['concurrency'] = concurrency
+            limits['semaphore'] = threading.BoundedSemaphore(concurrency)
+
+
+def __getlimits(context):
+    """get (or create) the rate/concurrency limits for an api context"""
+    with LIMITSLOCK:
+        if context.get('LIMITS', None) is None:
+            context['LIMITS'] = {'lock': threading.Lock(), 'rate': None, 'burst': 1, 'tokens': 1, 'last': time.time(),
+                                 'until': 0, 'concurrency': MAXCONCURRENCY, 'semaphore': threading.BoundedSemaphore(MAXCONCURRENCY)}
+        return context['LIMITS']
+
+
+def __copylimits(context):
+    """new limits with the same rate and concurrency settings as those of an api context"""
+    limits = context.get('LIMITS', None)
+    if limits is None:
+        return None
+    with limits['lock']:
+        return {'lock': threading.Lock(), 'rate': limits['rate'], 'burst': limits['burst'], 'tokens': limits['burst'], 'last': time.time(),
+                'until': 0, 'concurrency': limits['concurrency'], 'semaphore': threading.BoundedSemaphore(limits['concurrency'])}
+
+
+def __throttle(limits):
+    """wait for any Retry-After pause and for a rate limit token"""
+    while True:
+        with limits['lock']:
+            now = time.time()
+            wait = limits['until'] - now
+            if wait <= 0 and limits['rate'] is not None:
+                limits['tokens'] = min(limits['burst'], limits['tokens'] + (now - limits['last']) * limits['rate'])
+                limits['last'] = now
+                if limits['tokens'] >= 1:
+                    limits['tokens'] -= 1
+                else:
+                    wait = (1 - limits['tokens']) / limits['rate']
+            if wait <= 0:
+                return
+        time.sleep(wait)
+
+
+def __apisend(context, session, method, url, data):
+    """send request with jittered exponential backoff for throttling, server errors and connection errors"""
+    limits = __getlimits(context)
+    attempt = 0
+    startTime = time.time()
+    while True:
+        __throttle(limits)
+        response = None
+        error = None
+        semaphore = limits['semaphore']
+        semaphore.acquire()
+        try:
+            response = __apirequest(session, method, url, data, context['HEADER'])
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+        finally:
+            semaphore.release()
+        # post is not idempotent, so only retry when the cluster refused the request
+        if method == 'post':
+            retry = response is not None and response.status_code in [429, 503]
+        else:
+            retry = error is not None or response.status_code in RETRYSTATUS
+        if retry is False or attempt >= RETRIES:
+            if TRACESINKS:
+                __trace(method, url, response, startTime, attempt)
+            if error is not None:
+                raise error
+            return response
+        delay = random.uniform(0, min(RETRYMAXDELAY, RETRYDELAY * 2 ** attempt))
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            # pause all calls in this context
+            delay = min(RETRYMAXDELAY, int(response.headers['Retry-After']))
+            with limits['lock']:
+                limits['until'] = max(limits['until'], time.time() + delay)
+        __writelog('retrying %s %s in %.1f seconds (%s)' % (method, url, delay, error or response.status_code))
+        if response is not None:
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+### api call instrumentation
+def apitrace(summary=True, jsonl=None, prometheus=None, sink=None):
+    """record method, uri template, status, latency, bytes and retries of api calls
+
+    summary: print a per-endpoint summary at exit
+    jsonl: append one JSON record per call to this file
+    prometheus: write a Prometheus textfile (node_exporter textfile collector) at exit
+    sink: function called with each record (dict)
+    """
+    # calling apitrace again only adds outputs that are not already registered
+    if summary is True and TRACEREGISTERED['summary'] is False:
+        TRACEREGISTERED['summary'] = True
+        atexit.register(__printtracesummary)
+    if summary is True or prometheus is not None:
+        if __tracesummary not in TRACESINKS:
+            TRACESINKS.append(__tracesummary)
+    if jsonl is not None and os.path.abspath(jsonl) not in TRACEREGISTERED['jsonl']:
+        TRACEREGISTERED['jsonl'].append(os.path.abspath(jsonl))
+        TRACESINKS.append(__tracejsonl(jsonl))
+    if prometheus is not None and os.path.abspath(prometheus) not in TRACEREGISTERED['prometheus']:
+        TRACEREGISTERED['prometheus'].append(os.path.abspath(prometheus))
+        atexit.register(__writetraceprometheus, prometheus)
+    if sink is not None and sink not in TRACESINKS:
+        TRACESINKS.append(sink)
+
+
+def __uritemplate(url):
+    """reduce a url to an endpoint template (ids replaced, query values removed)"""
+    path = url.split('://', 1)[-1]
+    path = path[path.find('/'):].replace('/irisservices/api/v1', '')
+    if '?' in path:
+        (path, query) = path.split('?', 1)
+        params = sorted(set([param.split('=')[0] for param in query.split('&') if param != '']))
+    else:
+        params = []
+    path = '/'.join([re.sub(r'^[0-9:]+$|^[0-9a-fA-F-]{32,36}$', '{id}', part) for part in path.split('/')])
+    if len(params) > 0:
+        path += '?' + '&'.join(params)
+    return path
+
+
+def __trace(method, url, response, startTime, retries=0, responseBytes=None):
+    """send an api call record to the trace sinks"""
+    try:
+        record = {
+            'time': startTime,
+            'method': method,
+            'uri': __uritemplate(url),
+            'status': None,
+            'latency': round(time.time() - startTime, 6),
+            'requestBytes': 0,
+            'responseBytes': 0,
+            'retries': retries
+        }
+        if response is not None:
+            record['status'] = response.status_code
+            if response.request is not None and response.request.body is not None:
+                record['requestBytes'] = len(response.request.body)
+            if responseBytes is None:
+                responseBytes = len(response.content)
+            record['responseBytes'] = responseBytes
+        for sink in TRACESINKS:
+            sink(record)
+    except Exception as e:
+        __writelog(e)
+
+
+def __tracesummary(record):
+    key = (record['method'], record['uri'])
+    with TRACELOCK:
+        if key not in TRACESTATS:
+            TRACESTATS[key] = {'calls': 0, 'errors': 0, 'latency': 0.0, 'maxLatency': 0.0, 'bytes': 0, 'retries': 0, 'status': {}}
+        stats = TRACESTATS[key]
+        stats['calls'] += 1
+        if record['status'] is None or record['status'] >= 400:
+            stats['errors'] += 1
+        stats['latency'] += record['latency']
+        stats['maxLatency'] = max(stats['maxLatency'], record['latency'])
+        stats['bytes'] += record['requestBytes'] + record['responseBytes']
+        stats['retries'] += record['retries']
+        stats['status'][record['status']] = stats['status'].get(record['status'], 0) + 1
+
+
+def __tracejsonl(fileName):
+    tracefile = open(fileName, 'a')
+    atexit.register(tracefile.close)
+
+    def __sink(record):
+        with TRACELOCK:
+            tracefile.write(json.dumps(record) + '\n')
+            tracefile.flush()
+    return __sink
+
+
+def __printtracesummary():
+    if len(TRACESTATS) == 0:
+        return
+    print('\n{0:>7} {1:>6} {2:>7} {3:>10} {4:>9} {5:>9} {6:>12}  {7}'.format('calls', 'errors', 'retries', 'total(s)', 'avg(ms)', 'max(ms)', 'bytes', 'endpoint'))
+    for ((method, uri), stats) in sorted(TRACESTATS.items(), key=lambda item: item[1]['latency'], reverse=True):
+        print('{0:>7} {1:>6} {2:>7} {3:>10.2f} {4:>9.1f} {5:>9.1f} {6:>12}  {7} {8}'.format(
+            stats['calls'], stats['errors'], stats['retries'], stats['latency'], 1000 * stats['latency'] / stats['calls'],
+            1000 * stats['maxLatency'], stats['bytes'], method.upper(), uri))
+
+
+def __writetraceprometheus(fileName):
+    script = os.path.basename(sys.argv[0]).replace('\\', '\\\\').replace('"', '\\"')
+    lines = []
+    metrics = [
+        ('pyhesity_api_calls_total', 'counter', 'api calls by status'),
+        ('pyhesity_api_latency_seconds_total', 'counter', 'total api call latency'),
+        ('pyhesity_api_latency_seconds_max', 'gauge', 'maximum api call latency'),
+        ('pyhesity_api_bytes_total', 'counter', 'request and response bytes'),
+        ('pyhesity_api_retries_total', 'counter', 'api call retries')
+    ]
+    for (metric, metricType, metricHelp) in metrics:
+        lines.append('# HELP %s %s' % (metric, metricHelp))
+        lines.append('# TYPE %s %s' % (metric, metricType))
+        for ((method, uri), stats) in sorted(TRACESTATS.items()):
+            labels = 'script="%s",method="%s",uri="%s"' % (script, method, uri.replace('\\', '\\\\').replace('"', '\\"'))
+            if metric == 'pyhesity_api_calls_total':
+                for status in sorted(stats['status'], key=lambda s: str(s)):
+                    lines.append('%s{%s,status="%s"} %s' % (metric, labels, status, stats['status'][status]))
+            elif metric == 'pyhesity_api_latency_seconds_total':
+                lines.append('%s{%s} %s' % (metric, labels, stats['latency']))
+            elif metric == 'pyhesity_api_latency_seconds_max':
+                lines.append('%s{%s} %s' % (metric, labels, stats['maxLatency']))
+            elif metric == 'pyhesity_api_bytes_total':
+                lines.append('%s{%s} %s' % (metric, labels, stats['bytes']))
+            else:
+                lines.append('%s{%s} %s' % (metric, labels, stats['retries']))
+    try:
+        tmpFile = '%s.%s.tmp' % (fileName, os.getpid())
+        f = open(tmpFile, 'w')
+        f.write('\n'.join(lines) + '\n')
+        f.close()
+        try:
+            os.replace(tmpFile, fileName)
+        except AttributeError:
+            if os.path.exists(fileName):
+                os.remove(fileName)
+            os.rename(tmpFile, fileName)
+    except Exception as e:
+        __writelog(e)
+
+
+### access token cache
+def __gettoken(auth):
+    """return cached access token for these credentials if not about to expire"""
+    if auth['tokenFile'] is None or os.path.isfile(auth['tokenFile']) is False:
+        return None
+    try:
+        with open(auth['tokenFile'], 'r') as f:
+            token = json.load(f)
+        if token['pwhash'] == auth['pwhash'] and time.time() < token['expires'] - TOKENREFRESH:
+            return token
+    except Exception as e:
+        __writelog(e)
+    return None
+
+
+def __savetoken(auth, response):
+    """record a newly issued access token (and cache it if enabled)"""
+    lifetime = TOKENLIFETIME
+    # use the token lifetime from the response if the server provides one
+    for key in ['expiresIn', 'expires_in']:
+        if isinstance(response.get(key, None), (int, float)) and response[key] > 0:
+            lifetime = response[key]
+            break
+    token = {'tokenType': response['tokenType'], 'accessToken': response['accessToken'], 'expires': time.time() + lifetime}
+    if auth['tokenFile'] is not None:
+        token['pwhash'] = auth['pwhash']
+        try:
+            tmpFile = '%s.%s.tmp' % (auth['tokenFile'], os.getpid())
+            f = os.fdopen(os.open(tmpFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w')
+            json.dump(token, f)
+            f.close()
+            try:
+                os.replace(tmpFile, auth['tokenFile'])
+            except AttributeError:
+                if os.path.exists(auth['tokenFile']):
+                    os.remove(auth['tokenFile'])
+                os.rename(tmpFile, auth['tokenFile'])
+        except Exception as e:
+            __writelog(e)
+    return token
+
+
+def __droptoken(auth):
+    """remove a cached access token that the cluster no longer accepts"""
+    if auth['tokenFile'] is not None and os.path.isfile(auth['tokenFile']):
+        try:
+            os.remove(auth['tokenFile'])
+        except OSError as e:
+            __writelog(e)
+
+
+def __usetoken(context, token):
+    """set the authorization header of an api context from an access token"""
+    if token is None:
+        return False
+    context['HEADER'] = {'accept': 'application/json',
+                         'content-type': 'application/json',
+                         'authorization': token['tokenType'] + ' ' + token['accessToken']}
+    if context['AUTH']['tenantId'] is not None:
+        context['HEADER']['x-impersonate-tenant-id'] = '%s/' % context['AUTH']['tenantId']
+    context['AUTH']['expires'] = token['expires']
+    return True
+
+
+def __refreshtoken(context, authorization):
+    """get a new access token unless another thread already has (header updated in place)"""
+    auth = context['AUTH']
+    if auth['refresh'] is False:
+        return False
+    with TOKENLOCK:
+        if context['HEADER'].get('authorization', None) != authorization:
+            return True
+        try:
+            startTime = time.time()
+            response = __getsession(context).post(auth['url'], data=auth['creds'], headers={'accept': 'application/json', 'content-type': 'application/json'}, verify=False)
+            if TRACESINKS:
+                __trace('post', auth['url'], response, startTime)
+            if response.status_code != 201:
+                __writelog('token refresh failed: %s' % response.text)
+                return False
+            token = __savetoken(auth, response.json())
+        except requests.exceptions.RequestException as e:
+            __writelog(e)
+            return False
+        context['HEADER']['authorization'] = token['tokenType'] + ' ' + token['accessToken']
+        auth['expires'] = token['expires']
+        return True
+
+
+### on-disk api response cache
+def apicache(enable=True, ttls=None, maxSizeMB=None, clear=False):
+    """enable/disable the on-disk cache for inventory api calls (ttls: {'endpoint': seconds})"""
+    global CACHEENABLED
+    global CACHEMAXSIZE
+    CACHEENABLED = enable
+    if ttls is not None:
+        CACHETTLS.update(ttls)
+    if maxSizeMB is not None:
+        CACHEMAXSIZE = maxSizeMB * 1024 * 1024
+    if clear is True and os.path.isdir(CACHEDIR):
+        for cachefile in os.listdir(CACHEDIR):
+            try:
+                os.remove(os.path.join(CACHEDIR, cachefile))
+            except OSError:
+                pass
+
+
+def __cachepath(uri):
+    """endpoint path of a uri (query string and /public/ prefix removed)"""
+    path = uri.split('?')[0].strip('/')
+    if path.startswith('public/'):
+        path = path[7:]
+    return path
+
+
+def __cacheendpoint(path):
+    """CACHETTLS endpoint for a path (the endpoint itself or endpoint/{id}), else None"""
+    for endpoint in CACHETTLS:
+        if re.match(r'^%s(/[\w:-]*\d[\w:-]*)?$' % re.escape(endpoint), path) is not None:
+            return endpoint
+    return None
+
+
+def __cachettl(uri, cache):
+    """return the TTL for a cacheable get call, else None"""
+    if cache is False or (cache is None and CACHEENABLED is False):
+        return None
+    if cache is not None and cache is not True:
+        return cache
+    endpoint = __cacheendpoint(__cachepath(uri))
+    if endpoint is not None:
+        return CACHETTLS[endpoint]
+    if cache is True:
+        return 3600
+    return None
+
+
+def __cachegroup(context, uri):
+    """cache file prefix for the endpoint of a uri in a cluster/user/access context"""
+    path = __cachepath(uri)
+    endpoint = __cacheendpoint(path)
+    if endpoint is None:
+        endpoint = path
+    header = sorted([(k, str(v)) for (k, v) in context['HEADER'].items() if k.lower() not in ['authorization', 'accept', 'content-type']])
+    keystring = json.dumps([context.get('USER', ''), context.get('APIROOT', ''), endpoint, header])
+    return hashlib.sha1(keystring.encode('utf-8')).hexdigest()[0:16]
+
+
+def __cachekey(context, uri, url):
+    """cache key for a cluster/user/access context and url (auth token excluded)"""
+    header = sorted([(k, str(v)) for (k, v) in context['HEADER'].items() if k.lower() not in ['authorization', 'accept', 'content-type']])
+    keystring = json.dumps([context.get('USER', ''), url, header])
+    return '%s-%s' % (__cachegroup(context, uri), hashlib.sha1(keystring.encode('utf-8')).hexdigest())
+
+
+def __cacheevict(context, uri):
+    """remove cached responses of the endpoints a post/put/delete may have changed"""
+    if os.path.isdir(CACHEDIR) is False:
+        return
+    path = __cachepath(uri)
+    groups = [__cachegroup(context, uri)]
+    for endpoint in CACHETTLS:
+        if path == endpoint or path.startswith(endpoint + '/'):
+            groups.append(__cachegroup(context, endpoint))
+    try:
+        for cachefile in os.listdir(CACHEDIR):
+            if cachefile.split('-')[0] in groups:
+                try:
+                    os.remove(os.path.join(CACHEDIR, cachefile))
+                except OSError:
+                    pass
+    except OSError as e:
+        __writelog(e)
+
+
+def __cacheget(cachekey, cachettl):
+    """return cached response if not older than TTL"""
+    cachefile = os.path.join(CACHEDIR, cachekey)
+    try:
+        if time.time() - os.path.getmtime(cachefile) > cachettl:
+            return None
+        with open(cachefile, 'r') as f:
+            return json.load(f)
+    except (OSError, IOError, ValueError):
+        return None
+
+
+def __cacheput(cachekey, responsejson):
+    """store response in the cache then evict oldest entries above CACHEMAXSIZE"""
+    try:
+        if os.path.isdir(CACHEDIR) is False:
+            os.mkdir(CACHEDIR)
+        cachefile = os.path.join(CACHEDIR, cachekey)
+        tmpfile = '%s.%s.tmp' % (cachefile, os.getpid())
+        with open(tmpfile, 'w') as f:
+            json.dump(responsejson, f)
+        try:
+            os.replace(tmpfile, cachefile)
+        except AttributeError:
+            if os.path.exists(cachefile):
+                os.remove(cachefile)
+            os.rename(tmpfile, cachefile)
+        cachefiles = []
+        for name in os.listdir(CACHEDIR):
+            try:
+                stat = os.stat(os.path.join(CACHEDIR, name))
+                cachefiles.append((stat.st_mtime, stat.st_size, name))
+            except OSError:
+                pass
+        cachesize = sum([c[1] for c in cachefiles])
+        for (mtime, size, name) in sorted(cachefiles):
+            if cachesize <= CACHEMAXSIZE:
+                break
+            try:
+                os.remove(os.path.join(CACHEDIR, name))
+            except OSError:
+                pass
+            cachesize -= size
+    except Exception as e:
+        __writelog(e)
+
+
+### concurrent batch api calls
+def apimany(calls, workers=None, quiet=None, context=None):
+    """run a list of (method, uri, params) api calls concurrently, results returned in input order"""
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+    if THISCONTEXT['AUTHENTICATED'] is False:
+        print('Not Connected')
+        return None
+    if workers is None:
+        workers = POOLSIZE
+    __getsession(THISCONTEXT)
+
+    def __apicall(call):
+        method = call[0]
+        uri = call[1]
+        params = {}
+        if len(call) > 2 and call[2] is not None:
+            params = call[2]
+        try:
+            return api(method, uri, quiet=quiet, context=THISCONTEXT, **params)
+        except Exception as e:
+            __writelog(e)
+            return {'error': '%s %s: %s' % (method, uri, e)}
+
+    calls = list(calls)
+    if len(calls) == 0:
+        return []
+    pool = ThreadPool(min(workers, len(calls)))
+    try:
+        results = pool.map(__apicall, calls)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+### page through protection runs
+def getRuns(jobId, numRuns=100, endTimeUsecs=None, startTimeUsecs=None, query='', v=1, pages=False, quiet=None, context=None):
+    """yield protection runs newest first, one page at a time, prefetching the next page in the background
+
+    pages: yield each page (a list of runs) rather than each run
+    """
+    if v == 2:
+        baseuri = 'data-protect/protection-groups/%s/runs?numRuns=%s' % (jobId, numRuns)
+    else:
+        baseuri = 'protectionRuns?jobId=%s&numRuns=%s' % (jobId, numRuns)
+    if startTimeUsecs is not None:
+        baseuri += '&startTimeUsecs=%s' % startTimeUsecs
+    baseuri += query
+
+    def __getpage(endUsecs):
+        uri = baseuri
+        if endUsecs is not None:
+            uri += '&endTimeUsecs=%s' % endUsecs
+        page = api('get', uri, quiet=quiet, v=v, context=context)
+        if v == 2:
+            if page is None or 'runs' not in page:
+                return []
+            return page['runs']
+        if not isinstance(page, list):
+            return []
+        return page
+
+    def __runstart(run):
+        if v == 2:
+            for info in ['localBackupInfo', 'originalBackupInfo', 'archivalInfo']:
+                if info in run and 'startTimeUsecs' in run[info]:
+                    return run[info]['startTimeUsecs']
+            return int(run['id'].split(':')[1])
+        return run['backupRun']['stats']['startTimeUsecs']
+
+    pool = ThreadPool(1)
+    try:
+        nextpage = pool.apply_async(__getpage, (endTimeUsecs,))
+        while True:
+            runs = nextpage.get()
+            if len(runs) == 0:
+                break
+            lastStart = __runstart(runs[-1])
+            if startTimeUsecs is not None and lastStart < startTimeUsecs:
+                nextpage = None
+            else:
+                nextpage = pool.apply_async(__getpage, (lastStart - 1,))
+            if startTimeUsecs is not None and lastStart < startTimeUsecs:
+                runs = [run for run in runs if __runstart(run) >= startTimeUsecs]
+            if pages is True:
+                if len(runs) > 0:
+                    yield runs
+            else:
+                for run in runs:
+                    yield run
+            runs = None
+            if nextpage is None:
+                break
+    finally:
+        pool.terminate()
+
+
+### stream rows from Helios reporting v2 component previews
+def reportPreview(reportNumber, startUsecs, endUsecs, rangeDays=7, pageSize=10000, maxPageSize=50000, sortAttribute=None, filters=None, timezone='America/New_York', workers=4, failedRanges=None, pages=False, quiet=None, context=None):
+    """yield report rows (newest time range first), fetching time ranges concurrently with adaptive page size
+
+    each worker runs at most two pages ahead of the rows being yielded, so memory use stays bounded
+    failedRanges: list to append (lowerBound, upperBound) to for time ranges that could not be fetched
+    pages: yield each page (a list of rows) rather than each row
+    """
+    minPageSize = 500
+    targetSecs = 15
+    maxRetries = 3
+
+    # build time ranges (newest first)
+    rangeUsecs = rangeDays * 86400000000
+    ranges = []
+    thisEnd = endUsecs
+    while (thisEnd - startUsecs) > rangeUsecs:
+        ranges.append((thisEnd - rangeUsecs, thisEnd))
+        thisEnd = thisEnd - rangeUsecs - 1
+    ranges.append((startUsecs, thisEnd))
+
+    rangeQueue = queue.Queue()
+    for (index, r) in enumerate(ranges):
+        rangeQueue.put((index, r))
+    pageQueues = [queue.Queue(maxsize=2) for r in ranges]
+    stop = threading.Event()
+    size = {'pageSize': pageSize}
+
+    def __putpage(index, page):
+        while not stop.is_set():
+            try:
+                pageQueues[index].put(page, timeout=1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __fetchrange(index, lowerBound, upperBound):
+        startfrom = 0
+        retries = 0
+        while not stop.is_set():
+            thisPageSize = size['pageSize']
+            reportParams = {
+                "filters": [
+                    {
+                        "attribute": "date",
+                        "filterType": "TimeRange",
+                        "timeRangeFilterParams": {
+                            "lowerBound": lowerBound,
+                            "upperBound": upperBound
+                        }
+                    }
+                ],
+                "timezone": timezone,
+                "limit": {
+                    "size": thisPageSize,
+                    "from": startfrom
+                }
+            }
+            if filters is not None:
+                reportParams['filters'] += filters
+            if sortAttribute is not None:
+                reportParams['sort'] = [{"attribute": sortAttribute}]
+            callStart = time.time()
+            preview = api('post', 'components/%s/preview' % reportNumber, reportParams, quiet=quiet, reportingv2=True, context=context)
+            callSecs = time.time() - callStart
+            if preview is None or 'component' not in preview:
+                # shrink the page and try again
+                if retries >= maxRetries:
+                    __writelog('reportPreview: giving up on range %s - %s' % (lowerBound, upperBound))
+                    if quiet is None:
+                        print('Warning: failed to retrieve report data from %s to %s' % (usecsToDate(lowerBound), usecsToDate(upperBound)))
+                    if failedRanges is not None:
+                        failedRanges.append((lowerBound, upperBound))
+                    return
+                retries += 1
+                size['pageSize'] = max(minPageSize, int(thisPageSize / 2))
+                continue
+            retries = 0
+            data = preview['component'].get('data', None)
+            if data is None or len(data) == 0:
+                return
+            if __putpage(index, data) is False:
+                return
+            # only an empty page ends the range (the server may return less than the page size asked for)
+            startfrom += len(data)
+            # adapt page size to response time
+            if callSecs < targetSecs / 2:
+                size['pageSize'] = min(maxPageSize, thisPageSize * 2)
+            elif callSecs > targetSecs:
+                size['pageSize'] = max(minPageSize, int(thisPageSize / 2))
+
+    def __worker():
+        # ranges are taken in order, so the range being yielded always has a worker
+        while not stop.is_set():
+            try:
+                (index, (lowerBound, upperBound)) = rangeQueue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                __fetchrange(index, lowerBound, upperBound)
+            finally:
+                __putpage(index, None)
+
+    numWorkers = max(1, min(workers, len(ranges)))
+    threads = [threading.Thread(target=__worker) for i in range(numWorkers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    try:
+        # pages are yielded in time range order, workers on later ranges block until their range is reached
+        for pageQueue in pageQueues:
+            while True:
+                page = pageQueue.get()
+                if page is None:
+                    break
+                if pages is True:
+                    yield page
+                else:
+                    for row in page:
+                        yield row
+            page = None
+    finally:
+        stop.set()
+
+
+### walk a snapshot directory tree
+def walkDirectory(instance, startPath='/', volumeInfoCookie=None, volumeName=None, useLibrarian=True, statFileEntries=False, workers=8, descend=None, pending=None, checkpoint=None, quiet=None, context=None):
+    """yield /vm/directoryList entries, listing directories concurrently from a work queue
+
+    pending: list of (dirPath, cookie) work items to start from (instead of startPath)
+    checkpoint: called as checkpoint(item, children) once the entries of an item have been
+                consumed (children is None if the listing failed)
+    """
+    baseuri = '/vm/directoryList?%s&useLibrarian=%s&statFileEntries=%s' % (instance, str(useLibrarian).lower(), str(statFileEntries).lower())
+    if volumeName is not None:
+        baseuri += '&volumeInfoCookie=%s&volumeName=%s' % (volumeInfoCookie, quote_plus(volumeName))
+
+    # work items are (dirPath, cookie)
+    if pending is None:
+        pending = [(startPath, None)]
+    if len(pending) == 0:
+        return
+    workQueue = queue.Queue()
+    for item in pending:
+        workQueue.put(tuple(item))
+    resultQueue = queue.Queue(maxsize=workers * 4)
+    stop = threading.Event()
+    state = {'outstanding': len(pending)}
+    lock = threading.Lock()
+
+    def __listdir(dirPath, cookie):
+        uri = '%s&dirPath=%s' % (baseuri, quote_plus(dirPath).replace('%2F%2F', '%2F'))
+        if cookie is not None:
+            uri += '&cookie=%s' % cookie
+        return api('get', uri, quiet=quiet, context=context)
+
+    def __worker():
+        while not stop.is_set():
+            try:
+                (dirPath, cookie) = workQueue.get(timeout=1)
+            except queue.Empty:
+                continue
+            if dirPath is None:
+                break
+            try:
+                dirList = __listdir(dirPath, cookie)
+            except Exception as e:
+                __writelog(e)
+                dirList = None
+            entries = []
+            children = []
+            if not isinstance(dirList, dict) or 'error' in dirList:
+                children = None
+            elif 'entries' in dirList:
+                entries = sorted(dirList['entries'], key=lambda e: e['name'])
+                for entry in entries:
+                    if entry['type'] == 'kDirectory' and (descend is None or descend(entry) is True):
+                        children.append(('%s/%s' % (dirPath, entry['name']), None))
+            if children is not None and 'cookie' in dirList:
+                children.append((dirPath, dirList['cookie']))
+            # the result is queued before its children so results always arrive parent first
+            while not stop.is_set():
+                try:
+                    resultQueue.put(((dirPath, cookie), entries, children), timeout=1)
+                    break
+                except queue.Full:
+                    pass
+            with lock:
+                state['outstanding'] += len(children or []) - 1
+                for child in children or []:
+                    workQueue.put(child)
+                finished = (state['outstanding'] == 0)
+            if finished is True:
+                resultQueue.put(None)
+
+    threads = [threading.Thread(target=__worker) for i in range(workers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    try:
+        while True:
+            result = resultQueue.get()
+            if result is None:
+                break
+            (item, entries, children) = result
+            for entry in entries:
+                yield entry
+            if checkpoint is not None:
+                checkpoint(item, children)
+    finally:
+        stop.set()
+        for thread in threads:
+            workQueue.put((None, None))
+
+
+### batched storage consumer stats
+def consumerStats(consumerType, consumerIds, chunkSize=100, workers=None, quiet=None, context=None):
+    """get stats/consumers for many consumer ids (batched by consumerIdList), returns {consumerId: statsList entry}"""
+    if workers is None:
+        workers = POOLSIZE
+    consumerIds = list(dict.fromkeys(consumerIds))
+    if len(consumerIds) == 0:
+        return {}
+    chunks = [consumerIds[i:i + chunkSize] for i in range(0, len(consumerIds), chunkSize)]
+
+    def __getchunk(chunk):
+        uri = 'stats/consumers?consumerType=%s&maxCount=%s&%s' % (consumerType, chunkSize, '&'.join(['consumerIdList=%s' % consumerId for consumerId in chunk]))
+        statsList = []
+        cookie = None
+        while True:
+            if cookie is not None:
+                stats = api('get', '%s&cookie=%s' % (uri, cookie), quiet=quiet, context=context)
+            else:
+                stats = api('get', uri, quiet=quiet, context=context)
+            if not isinstance(stats, dict) or 'error' in stats:
+                break
+            statsList += stats.get('statsList', None) or []
+            cookie = stats.get('cookie', None)
+            if not cookie:
+                break
+        return statsList
+
+    pool = ThreadPool(min(workers, len(chunks)))
+    try:
+        results = pool.map(__getchunk, chunks)
+    finally:
+        pool.close()
+        pool.join()
+    consumers = {}
+    for statsList in results:
+        for consumer in statsList:
+            if 'id' in consumer:
+                consumers[consumer['id']] = consumer
+    return consumers
+
+
+### wait for many recovery tasks
+def recoveryStatus(task):
+    """status of a v1 restore task (publicStatus) or v2 recovery (status)"""
+    try:
+        if 'restoreTask' in task:
+            return task['restoreTask']['performRestoreTaskState']['base']['publicStatus']
+        return task['status']
+    except (KeyError, TypeError):
+        return None
+
+
+def waitRecoveries(taskIds, callback=None, v=1, minInterval=3, maxInterval=30, timeout=None, chunkSize=100, workers=None, quiet=None, context=None):
+    """wait for many v1 restore tasks (v=1) or v2 recoveries (v=2) to finish, returns {taskId: task}
+
+    all tasks are polled together with one list call per chunkSize tasks (falling back to concurrent
+    per task calls), polling every minInterval seconds, backing off to maxInterval while nothing changes.
+    callback: called as callback(taskId, status, task) as each task finishes
+    timeout: give up after this many seconds (unfinished tasks are returned with their last known state)
+    """
+    if workers is None:
+        workers = POOLSIZE
+    finishedStates = RECOVERYFINISHEDSTATES[v]
+    taskIds = list(dict.fromkeys(taskIds))
+    tasks = dict((taskId, None) for taskId in taskIds)
+    pending = list(taskIds)
+    state = {'batch': True}
+    startTime = time.time()
+
+    def __taskid(task):
+        if v == 1:
+            return task['restoreTask']['performRestoreTaskState']['base']['taskId']
+        return task['id']
+
+    def __poll(ids):
+        results = {}
+        if state['batch'] is True:
+            for i in range(0, len(ids), chunkSize):
+                chunk = ids[i:i + chunkSize]
+                if v == 1:
+                    response = api('get', '/restoretasks?%s' % '&'.join(['taskIds=%s' % taskId for taskId in chunk]), quiet=True, context=context)
+                else:
+                    response = api('get', 'data-protect/recoveries?includeTenants=true&%s' % '&'.join(['ids=%s' % taskId for taskId in chunk]), v=2, quiet=True, context=context)
+                    if isinstance(response, dict):
+                        response = response.get('recoveries', None)
+                if not isinstance(response, list):
+                    state['batch'] = False
+                    break
+                for task in response:
+                    try:
+                        results[__taskid(task)] = task
+                    except (KeyError, TypeError):
+                        pass
+        missing = [taskId for taskId in ids if taskId not in results]
+        if len(missing) > 0:
+            if v == 1:
+                calls = [('get', '/restoretasks/%s' % taskId) for taskId in missing]
+            else:
+                calls = [('get', 'data-protect/recoveries/%s?includeTenants=true' % taskId, {'v': 2}) for taskId in missing]
+            for (taskId, task) in zip(missing, apimany(calls, workers=workers, quiet=quiet, context=context) or []):
+                if v == 1 and isinstance(task, list) and len(task) > 0:
+                    task = task[0]
+                if isinstance(task, dict) and 'error' not in task and 'errorCode' not in task:
+                    results[taskId] = task
+        return results
+
+    interval = minInterval
+    while len(pending) > 0:
+        changed = False
+        results = __poll(pending)
+        for taskId in pending:
+            if taskId in results:
+                if recoveryStatus(results[taskId]) != recoveryStatus(tasks[taskId]):
+                    changed = True
+                tasks[taskId] = results[taskId]
+        stillPending = []
+        for taskId in pending:
+            status = recoveryStatus(tasks[taskId])
+            if status in finishedStates:
+                if callback is not None:
+                    callback(taskId, status, tasks[taskId])
+            else:
+                stillPending.append(taskId)
+        pending = stillPending
+        if len(pending) == 0:
+            break
+        if changed is True:
+            interval = minInterval
+        else:
+            interval = min(interval * 1.5, maxInterval)
+        if timeout is not None and time.time() - startTime + interval > timeout:
+            break
+        time.sleep(interval)
+    return tasks
+
+
+### protection source tree index
+def sourceIndex(sources):
+    """index a protectionSources tree by id, name, type and path (with parent links)"""
+    if isinstance(sources, dict):
+        sources = [sources]
+    index = {'nodes': {}, 'parents': {}, 'names': {}, 'types': {}, 'paths': {}}
+    # iterative pre-order walk so the first name match is the same as a recursive search
+    stack = [(node, None, '') for node in reversed(sources or [])]
+    while len(stack) > 0:
+        (node, parentId, parentPath) = stack.pop()
+        source = node.get('protectionSource', node)
+        sourceId = source.get('id', None)
+        path = '%s/%s' % (parentPath, source.get('name', ''))
+        if sourceId is not None and sourceId not in index['nodes']:
+            index['nodes'][sourceId] = node
+            index['parents'][sourceId] = parentId
+            index['names'].setdefault(source.get('name', '').lower(), []).append(sourceId)
+            index['types'].setdefault(__sourcetype(source), []).append(sourceId)
+            index['paths'][path.lower()] = sourceId
+        for child in reversed(node.get('nodes', [])):
+            stack.append((child, sourceId, path))
+    return index
+
+
+def __sourcetype(source):
+    """type of a protection source (e.g. kVirtualMachine), else its environment"""
+    for key in source:
+        if key.endswith('ProtectionSource') and isinstance(source[key], dict) and 'type' in source[key]:
+            return source[key]['type']
+    return source.get('environment', None)
+
+
+def findSources(index, name=None, type=None, ancestorId=None):
+    """return indexed source nodes matching name (case insensitive), type and ancestor id"""
+    if name is not None:
+        ids = index['names'].get(name.lower(), [])
+    elif type is not None:
+        ids = index['types'].get(type, [])
+    else:
+        ids = list(index['nodes'].keys())
+    nodes = []
+    for sourceId in ids:
+        node = index['nodes'][sourceId]
+        if type is not None and name is not None and __sourcetype(node.get('protectionSource', node)) != type:
+            continue
+        if ancestorId is not None and ancestorId not in __sourceancestorids(index, sourceId):
+            continue
+        nodes.append(node)
+    return nodes
+
+
+def __sourceancestorids(index, sourceId):
+    ancestorIds = []
+    parentId = index['parents'].get(sourceId, None)
+    while parentId is not None:
+        ancestorIds.append(parentId)
+        parentId = index['parents'].get(parentId, None)
+    return ancestorIds
+
+
+def sourceAncestors(index, sourceId):
+    """return the ancestor nodes of a source, nearest first"""
+    return [index['nodes'][parentId] for parentId in __sourceancestorids(index, sourceId)]
+
+
+### keep-alive session with connection pool
+def apisession(poolSize=None):
+    """create a keep-alive http session with a connection pool"""
+    if poolSize is None:
+        poolSize = POOLSIZE
+    session = requests.Session()
+    session.verify = False
+    adapter = requests.adapters.HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def __getsession(context):
+    """get (or create) the session for an api context"""
+    if context.get('SESSION', None) is None:
+        context['SESSION'] = apisession()
+    return context['SESSION']
+
+
 def oldapi(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None):
     """api call function"""
     if COHESITY_API['AUTHENTICATED'] is False:
@@ -613,12 +1796,19 @@ def fileDownload(uri, fileName):
         return "Not Connected"
     if uri[0] != '/':
         uri = '/public/' + uri
-    response = requests.get(COHESITY_API['APIROOT'] + uri, headers=COHESITY_API['HEADER'], verify=False, stream=True)
+    session = __getsession(COHESITY_API)
+    startTime = time.time()
+    response = session.get(COHESITY_API['APIROOT'] + uri, headers=COHESITY_API['HEADER'], verify=False, stream=True)
+    downloaded = 0
     f = open(fileName, 'wb')
     for chunk in response.iter_content(chunk_size=1048576):
         if chunk:
             f.write(chunk)
+            downloaded += len(chunk)
     f.close()
+    response.close()
+    if TRACESINKS:
+        __trace('get', COHESITY_API['APIROOT'] + uri, response, startTime, responseBytes=downloaded)
 
 
 def showProps(obj, parent='myobject', search=None):
@@ -639,7 +1829,9 @@ def showProps(obj, parent='myobject', search=None):
 
 
 def getContext():
-    return COHESITY_API.copy()
+    context = COHESITY_API.copy()
+    context['LIMITS'] = __copylimits(COHESITY_API)
+    return context
 
 
 def setContext(context):
@@ -657,6 +1849,11 @@ if os.path.isdir(CONFIGDIR) is False:
     except Exception:
         pass
 
+### enable instrumentation from the environment, e.g. PYHESITY_TRACE=summary,jsonl=trace.jsonl,prometheus=pyhesity.prom
+if os.environ.get('PYHESITY_TRACE', '') != '':
+    TRACEOPTIONS = dict([(option.split('=', 1) + [None])[:2] for option in os.environ['PYHESITY_TRACE'].split(',')])
+    apitrace(summary='summary' in TRACEOPTIONS, jsonl=TRACEOPTIONS.get('jsonl', None), prometheus=TRACEOPTIONS.get('prometheus', None))
+
 ##########################################################################################
 # Old Change Log
 # ==============
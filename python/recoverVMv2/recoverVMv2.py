@@ -5,6 +5,7 @@
 
 ### import pyhesity wrapper module
 from pyhesity import *
+from vcentertool import *
 from datetime import datetime
 
 ### command line arguments
@@ -132,50 +133,43 @@ restoreParams = {
 
 if vcentername:
     # select vCenter
-    vCenterSource = [v for v in api('get', 'protectionSources?environments=kVMware') if v['protectionSource']['name'].lower() == vcentername.lower()]
-    vCenterList = api('get', '/entitiesOfType?environmentTypes=kVMware&vmwareEntityTypes=kVCenter&vmwareEntityTypes=kStandaloneHost')
-    vCenter = [v for v in vCenterList if v['displayName'].lower() == vcentername.lower()]
-    if len(vCenterSource) == 0 or len(vCenter) == 0:
+    catalog = vcenterCatalog(vcentername)
+    if catalog is None:
         print('vcenter %s not found' % vcentername)
         exit()
-    vCenterId = vCenter[0]['id']
+    vCenterId = catalog.id
 
     # select data center
-    dataCenterSource = [d for d in vCenterSource[0]['nodes'][0]['nodes'] if d['protectionSource']['name'].lower() == datacentername.lower()]
-    if len(dataCenterSource) == 0:
+    if catalog.datacenter(datacentername) is None:
         print('Datacenter %s not found' % datacentername)
         exit()
 
     # select host
-    hostSource = [h for h in dataCenterSource[0]['nodes'][0]['nodes'] if h['protectionSource']['name'].lower() == vhost.lower()]
-    if len(hostSource) == 0:
+    hostSource = catalog.host(vhost, datacenterName=datacentername)
+    if hostSource is None:
         print('Host %s not found' % vhost)
         exit()
 
     # select resource pool
-    resourcePoolSource = [r for r in hostSource[0]['nodes'] if r['protectionSource']['vmWareProtectionSource']['type'] == 'kResourcePool']
-    resourcePoolId = resourcePoolSource[0]['protectionSource']['id']
-    resourcePool = [r for r in api('get', '/resourcePools?vCenterId=%s' % vCenterId) if r['resourcePool']['id'] == resourcePoolId]
-    resourcePool = resourcePool[0]
+    resourcePoolId = catalog.resourcePoolId(hostSource)
 
     # select datastore
-    datastores = [d for d in api('get', '/datastores?resourcePoolId=%s&vCenterId=%s' % (resourcePoolId, vCenterId)) if d['vmwareEntity']['name'].lower() == datastorename.lower()]
-    if len(datastores) == 0:
+    datastore = catalog.datastore(resourcePoolId, datastorename)
+    if datastore is None:
         print('Datastore %s not found' % datastorename)
         exit()
 
     # select VM folder
-    vmFolders = api('get', '/vmwareFolders?resourcePoolId=%s&vCenterId=%s' % (resourcePoolId, vCenterId))
-    vmFolder = [v for v in vmFolders['vmFolders'] if v['displayName'].lower() == foldername]
-    if len(vmFolder) == 0:
+    vmFolder = catalog.folder(resourcePoolId, foldername)
+    if vmFolder is None:
         print('folder %s not found' % foldername)
         exit()
 
     # select network
     network = None
     if networkname is not None:
-        network = [n for n in api('get', '/networkEntities?resourcePoolId=%s&vCenterId=%s' % (resourcePoolId, vCenterId)) if n['displayName'].lower() == networkname.lower()]
-        if len(network) == 0:
+        network = catalog.network(resourcePoolId, networkname)
+        if network is None:
             print('network %s not found' % networkname)
             exit()
 
@@ -194,13 +188,13 @@ if vcentername:
                 }
             },
             "datastores": [
-                datastores[0]
+                datastore
             ],
             "resourcePool": {
                 "id": resourcePoolId
             },
             "vmFolder": {
-                "id": vmFolder[0]['id']
+                "id": vmFolder['id']
             }
         }
     }
@@ -213,7 +207,7 @@ if vcentername:
 
     if network is not None:
         restoreParams['vmwareParams']['recoverVmParams']['vmwareTargetParams']['recoveryTargetConfig']['newSourceConfig']['vCenterParams']['networkConfig']['newNetworkConfig']['networkPortGroup'] = {
-            "id": network[0]['id']
+            "id": network['id']
         }
 else:
     restoreParams['vmwareParams']['recoverVmParams']['vmwareTargetParams']['recoveryTargetConfig']['originalSourceConfig'] = {
@@ -36,11 +36,14 @@ if 'rootNodes' not in sources:
     exit()
 
 
+rootNodes = sourceIndex([source['rootNode'] for source in sources['rootNodes']])
+
+
 def getObjectId(sourcename):
-    for source in sources['rootNodes']:
-        if source['rootNode']['name'].lower() == sourcename.lower():
-            return source['rootNode']['id']
-    return None
+    roots = findSources(rootNodes, name=sourcename)
+    if len(roots) == 0:
+        return None
+    return roots[0]['id']
 
 
 for sourcename in sourceNames:
@@ -30,13 +30,16 @@ runningTasks = {}
 
 # for each active job
 jobs = api('get', 'protectionJobs')
-for job in sorted(jobs, key=lambda job: job['name'].lower()):
-    if 'isDeleted' not in job and ('isActive' not in job or job['isActive'] is not False):
+activeJobs = [job for job in sorted(jobs, key=lambda job: job['name'].lower()) if 'isDeleted' not in job and ('isActive' not in job or job['isActive'] is not False)]
+
+# find runs with unfinished replication tasks (all jobs concurrently)
+print("Getting tasks for %s jobs" % len(activeJobs))
+jobRuns = apimany([('get', 'protectionRuns?jobId=%s&numRuns=%s&excludeTasks=true' % (job['id'], numruns)) for job in activeJobs])
+
+for job, runs in zip(activeJobs, jobRuns):
+    if isinstance(runs, list):
         jobId = job['id']
         jobName = job['name']
-        print("Getting tasks for %s" % jobName)
-        # find runs with unfinished replication tasks
-        runs = api('get', 'protectionRuns?jobId=%s&numRuns=%s&excludeTasks=true' % (jobId, numruns))
         for run in runs:
             runStartTimeUsecs = run['backupRun']['stats']['startTimeUsecs']
             if 'copyRun' in run:
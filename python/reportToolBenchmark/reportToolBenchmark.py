@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""benchmark streaming report output vs in-memory html concatenation"""
+
+from reporttool import *
+import codecs
+import os
+import time
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# command line arguments
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument('-r', '--rows', type=int, default=1000000)        # number of synthetic rows
+parser.add_argument('-nl', '--nolegacy', action='store_true')         # skip the legacy test
+parser.add_argument('-of', '--outfolder', type=str, default='.')      # where to write the test files
+parser.add_argument('-k', '--keep', action='store_true')              # keep the output files
+
+args = parser.parse_args()
+
+numrows = args.rows
+nolegacy = args.nolegacy
+folder = args.outfolder
+keep = args.keep
+
+headings = ['Cluster', 'Job Name', 'Object Name', 'Status', 'Start Time', 'Logical MiB', 'Read MiB', 'Written MiB']
+
+
+def syntheticRow(i):
+    return ['CLUSTER-%s' % (i % 40), 'Job %s' % (i % 500), 'vm-%08d' % i, 'Succeeded', '2022-08-03 %02d:%02d' % (i % 24, i % 60), i % 97 * 10.5, i % 13 * 1.5, i % 7 * 0.5]
+
+
+def streaming(rows):
+    htmlFileName = os.path.join(folder, 'reportToolBenchmark-stream.html')
+    csvFileName = os.path.join(folder, 'reportToolBenchmark-stream.csv')
+    report = ReportWriter('Report Tool Benchmark', headings, htmlFileName, csvFileName, subtitle='%s rows' % rows)
+    for i in range(rows):
+        report.row(syntheticRow(i))
+    report.close()
+    return [htmlFileName, csvFileName]
+
+
+def legacy(rows):
+    htmlFileName = os.path.join(folder, 'reportToolBenchmark-legacy.html')
+    csvFileName = os.path.join(folder, 'reportToolBenchmark-legacy.csv')
+    csv = codecs.open(csvFileName, 'w', 'utf-8')
+    csv.write('%s\n' % ','.join(headings))
+    html = '<html><head><style>%s</style></head><body><table><tr>%s</tr>' % (REPORTCSS, ''.join(['<th>%s</th>' % h for h in headings]))
+    for i in range(rows):
+        row = syntheticRow(i)
+        csv.write('"%s","%s","%s","%s","%s","%s","%s","%s"\n' % tuple(row))
+        html += '''<tr>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            </tr>''' % tuple(row)
+    html += '</table></body></html>'
+    csv.close()
+    f = codecs.open(htmlFileName, 'w', 'utf-8')
+    f.write(html)
+    f.close()
+    return [htmlFileName, csvFileName]
+
+
+def measure(name, fn, rows):
+    start = time.time()
+    files = fn(rows)
+    seconds = time.time() - start
+    # peak resident memory of the process so far (KiB on Linux)
+    peak = 0
+    if resource is not None:
+        peak = float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) / 1024
+    size = sum([os.path.getsize(f) for f in files])
+    print('{0:<12}{1:>12}{2:>12.2f}{3:>14.1f}{4:>14.1f}'.format(name, rows, seconds, peak, float(size) / (1024 * 1024)))
+    if keep is False:
+        for f in files:
+            os.remove(f)
+
+
+print('\n{0:<12}{1:>12}{2:>12}{3:>14}{4:>14}'.format('Mode', 'Rows', 'Seconds', 'Peak RSS MiB', 'Output MiB'))
+print('{0:<12}{1:>12}{2:>12}{3:>14}{4:>14}'.format('----', '----', '-------', '------------', '----------'))
+measure('streaming', streaming, numrows)
+if nolegacy is False:
+    measure('legacy', legacy, numrows)
+print('')
@@ -74,73 +74,92 @@ successStates = ['Succeeded', 'SucceededWithWarning', 'Running', 'Canceled']
 if restartCanceled:
     successStates = ['Succeeded', 'SucceededWithWarning', 'Running']
 
+# authenticate to each cluster (one api context per cluster)
+contexts = []
 for clustername in clusternames:
-
     apiauth(vip=clustername, username=username, domain=domain, password=password, useApiKey=useApiKey, noretry=True, quiet=True)
     if apiconnected() is True:
-        out(clustername)
-        policies = api('get', 'protectionPolicies')
-        jobs = api('get', 'data-protect/protection-groups?isDeleted=false&isActive=true&includeLastRunInfo=true', v=2)
-
-        for job in sorted(jobs['protectionGroups'], key=lambda job: job['name'].lower()):
-            if job['isPaused'] is not True:
-                jobtype = job['environment'][1:]
-                if jobtypefilter is None or jobtypefilter.lower() == jobtype.lower():
-                    if 'lastRun' in job:
-                        status = job['lastRun']['localBackupInfo']['status']
-                        runDate = job['lastRun']['localBackupInfo']['startTimeUsecs']
-                        runType = job['lastRun']['localBackupInfo']['runType']
+        contexts.append((clustername, getContext()))
+    else:
+        contexts.append((clustername, None))
+
+
+def restartFailed(clustername, context):
+    """find (and restart) failed jobs on one cluster (runs concurrently for all clusters)"""
+    if context is None:
+        return ['%s - unable to connect' % clustername]
+    lines = [clustername]
+    policies = api('get', 'protectionPolicies', context=context)
+    jobs = api('get', 'data-protect/protection-groups?isDeleted=false&isActive=true&includeLastRunInfo=true', v=2, context=context)
+
+    for job in sorted(jobs['protectionGroups'], key=lambda job: job['name'].lower()):
+        if job['isPaused'] is not True:
+            jobtype = job['environment'][1:]
+            if jobtypefilter is None or jobtypefilter.lower() == jobtype.lower():
+                if 'lastRun' in job:
+                    status = job['lastRun']['localBackupInfo']['status']
+                    runDate = job['lastRun']['localBackupInfo']['startTimeUsecs']
+                    runType = job['lastRun']['localBackupInfo']['runType']
+                else:
+                    runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=1&includeTenants=true' % job['id'], v=2, context=context)
+                    if runs is not None and 'runs' in runs and len(runs['runs']) > 0:
+                        run = runs['runs'][0]
+                        status = run['localBackupInfo']['status']
+                        runDate = run['localBackupInfo']['startTimeUsecs']
+                        runType = run['localBackupInfo']['runType']
+                if status not in successStates and runDate > hoursAgoUsecs:
+                    if restart:
+                        lines.append('    %s (%s) %s, restarting...' % (job['name'], jobtype, status))
+                        policy = [p for p in policies if p['id'] == job['policyId']][0]
+
+                        # job parameters (base)
+                        jobData = {
+                            "copyRunTargets": [
+                                {
+                                    "type": "kLocal",
+                                    "daysToKeep": policy['daysToKeep']
+                                }
+                            ],
+                            "sourceIds": [],
+                            "runType": runType
+                        }
+
+                        # replication
+                        if 'snapshotReplicationCopyPolicies' in policy:
+                            for replica in policy['snapshotReplicationCopyPolicies']:
+                                if replica['target'] not in [p.get('replicationTarget', None) for p in jobData['copyRunTargets']]:
+                                    jobData['copyRunTargets'].append({
+                                        "daysToKeep": replica['daysToKeep'],
+                                        "replicationTarget": replica['target'],
+                                        "type": "kRemote"
+                                    })
+
+                        # archival
+                        if 'snapshotArchivalCopyPolicies' in policy:
+                            for archive in policy['snapshotArchivalCopyPolicies']:
+                                if archive['target'] not in [p.get('archivalTarget', None) for p in jobData['copyRunTargets']]:
+                                    jobData['copyRunTargets'].append({
+                                        "archivalTarget": archive['target'],
+                                        "daysToKeep": archive['daysToKeep'],
+                                        "type": "kArchival"
+                                    })
+
+                        # run job
+                        jobId = job['id'].split(':')[2]
+                        runNow = api('post', "protectionJobs/run/%s" % jobId, jobData, quiet=True, context=context)
+                        if runNow is None:
+                            lines.append('    %s (%s) restart failed' % (job['name'], jobtype))
                     else:
-                        runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=1&includeTenants=true' % job['id'], v=2)
-                        if runs is not None and 'runs' in runs and len(runs['runs']) > 0:
-                            run = runs['runs'][0]
-                            status = run['localBackupInfo']['status']
-                            runDate = run['localBackupInfo']['startTimeUsecs']
-                            runType = run['localBackupInfo']['runType']
-                    if status not in successStates and runDate > hoursAgoUsecs:
-                        if restart:
-                            out('    %s (%s) %s, restarting...' % (job['name'], jobtype, status))
-                            policy = [p for p in policies if p['id'] == job['policyId']][0]
-
-                            # job parameters (base)
-                            jobData = {
-                                "copyRunTargets": [
-                                    {
-                                        "type": "kLocal",
-                                        "daysToKeep": policy['daysToKeep']
-                                    }
-                                ],
-                                "sourceIds": [],
-                                "runType": runType
-                            }
-
-                            # replication
-                            if 'snapshotReplicationCopyPolicies' in policy:
-                                for replica in policy['snapshotReplicationCopyPolicies']:
-                                    if replica['target'] not in [p.get('replicationTarget', None) for p in jobData['copyRunTargets']]:
-                                        jobData['copyRunTargets'].append({
-                                            "daysToKeep": replica['daysToKeep'],
-                                            "replicationTarget": replica['target'],
-                                            "type": "kRemote"
-                                        })
-
-                            # archival
-                            if 'snapshotArchivalCopyPolicies' in policy:
-                                for archive in policy['snapshotArchivalCopyPolicies']:
-                                    if archive['target'] not in [p.get('archivalTarget', None) for p in jobData['copyRunTargets']]:
-                                        jobData['copyRunTargets'].append({
-                                            "archivalTarget": archive['target'],
-                                            "daysToKeep": archive['daysToKeep'],
-                                            "type": "kArchival"
-                                        })
-
-                            # run job
-                            jobId = job['id'].split(':')[2]
-                            runNow = api('post', "protectionJobs/run/%s" % jobId, jobData)
-                        else:
-                            out('    %s (%s) %s' % (job['name'], jobtype, status))
+                        lines.append('    %s (%s) %s' % (job['name'], jobtype, status))
+    return lines
+
+
+for (clustername, result) in clusterMap(restartFailed, contexts):
+    if isinstance(result, list):
+        for line in result:
+            out(line)
     else:
-        out('%s - unable to connect' % clustername)
+        out('%s - %s' % (clustername, result['error']))
 
 log.close()
 print('\nOutput saved to %s\n' % outfile)
@@ -17,7 +17,6 @@
 # import pyhesity wrapper module
 from pyhesity import *
 from datetime import datetime
-from time import sleep
 import sys
 import argparse
 if sys.version_info.major >= 3 and sys.version_info.minor >= 5:
@@ -178,6 +177,9 @@ if newonly:
         exit(1)
 
 
+restoreTasks = {}
+
+
 def restore(thesefiles, doc, version, targetEntity, singleFile):
     if taskname is not None:
         restoreTaskName = taskname
@@ -228,7 +230,7 @@ def restore(thesefiles, doc, version, targetEntity, singleFile):
 
     # perform restore
     if singleFile is True:
-        print('Restoring %s' % file)
+        print('Restoring %s' % thesefiles[0])
     else:
         print("Restoring Files...")
     restoreTask = api('post', '/restoreFiles', restoreParams)
@@ -236,62 +238,50 @@ def restore(thesefiles, doc, version, targetEntity, singleFile):
     if restoreTask:
         taskId = restoreTask['restoreTask']['performRestoreTaskState']['base']['taskId']
         if wait:
-            finishedStates = ['kCanceled', 'kSuccess', 'kFailure', 'kWarning']
-            restoreTask = api('get', '/restoretasks/%s' % taskId)
-            while restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'] not in finishedStates:
-                sleep(3)
-                restoreTask = api('get', '/restoretasks/%s' % taskId)
-            if restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'] == 'kSuccess':
-                print("Restore finished with status %s" % restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'])
-                if newonly:
-                    f = open('lastrestorepoint', 'w')
-                    f.write('%s' % version['instanceId']['jobStartTimeUsecs'])
-                    f.close()
-                if singleFile is False:
-                    exit(0)
-            else:
-                if 'error' in restoreTask[0]['restoreTask']['performRestoreTaskState']['base']:
-                    errorMsg = restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['error']['errorMsg']
-                else:
-                    errorMsg = ''
-                print("Restore finished with status %s" % restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'])
-                print(errorMsg)
-                if singleFile is False:
-                    exit(1)
-        else:
-            if newonly:
-                f = open('lastrestorepoint', 'w')
-                f.write('%s' % version['instanceId']['jobStartTimeUsecs'])
-                f.close()
-            if singleFile is False:
-                exit(0)
+            # launch now, wait for all restores at the end
+            restoreTasks[taskId] = (thesefiles[0] if singleFile is True else None, version)
+            return
+        if newonly:
+            f = open('lastrestorepoint', 'w')
+            f.write('%s' % version['instanceId']['jobStartTimeUsecs'])
+            f.close()
+        if singleFile is False:
+            exit(0)
     else:
         if singleFile is False:
             exit(1)
 
 
-def listdir(searchPath, dirPath, instance, volumeInfoCookie=None, volumeName=None, cookie=None):
-    global foundFile
-    thisDirPath = quote_plus(dirPath).replace('%2F%2F', '%2F')
-    if cookie is not None:
-        if volumeName is not None:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=false&statFileEntries=false&dirPath=%s&volumeInfoCookie=%s&volumeName=%s&cookie=%s' % (instance, thisDirPath, volumeInfoCookie, volumeName, cookie))
-        else:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=false&statFileEntries=false&dirPath=%s&cookie=%s' % (instance, thisDirPath, cookie))
+def restoreFinished(taskId, status, restoreTask):
+    (thisFile, version) = restoreTasks[taskId]
+    if thisFile is not None:
+        print("Restore of %s finished with status %s" % (thisFile, status))
     else:
-        if volumeName is not None:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=false&statFileEntries=false&dirPath=%s&volumeInfoCookie=%s&volumeName=%s' % (instance, thisDirPath, volumeInfoCookie, volumeName))
+        print("Restore finished with status %s" % status)
+    if status != 'kSuccess':
+        if 'error' in restoreTask['restoreTask']['performRestoreTaskState']['base']:
+            print(restoreTask['restoreTask']['performRestoreTaskState']['base']['error']['errorMsg'])
         else:
-            dirList = api('get', '/vm/directoryList?%s&useLibrarian=false&statFileEntries=false&dirPath=%s' % (instance, thisDirPath))
-    if dirList and 'entries' in dirList:
-        for entry in sorted(dirList['entries'], key=lambda e: e['name']):
-            if entry['fullPath'].lower() == searchPath.lower():
-                foundFile = entry['fullPath']
+            print('')
+
+
+def findFiles(searchPaths, instance, volumeInfoCookie=None, volumeName=None):
+    """walk the snapshot once, only descending into directories on the way to a requested file, returns {file: fullPath}"""
+    wanted = {}
+    prefixes = set()
+    for searchPath in searchPaths:
+        lowerPath = searchPath.lower()
+        wanted.setdefault(lowerPath, []).append(searchPath)
+        prefixes.update([lowerPath[0:i] for i in range(1, len(lowerPath)) if lowerPath[i] == '/'])
+    found = {}
+    for entry in walkDirectory(instance, '/', volumeInfoCookie, volumeName, useLibrarian=False, descend=lambda e: e['fullPath'].lower() in prefixes):
+        lowerPath = entry['fullPath'].lower()
+        if lowerPath in wanted:
+            for searchPath in wanted.pop(lowerPath):
+                found[searchPath] = entry['fullPath']
+            if len(wanted) == 0:
                 break
-            if entry['type'] == 'kDirectory' and entry['fullPath'].lower() in searchPath.lower():
-                listdir(searchPath, '%s/%s' % (dirPath, entry['name']), instance, volumeInfoCookie, volumeName)
-    if dirList and 'cookie' in dirList:
-        listdir(searchPath, '%s' % dirPath, instance, volumeInfoCookie, volumeName, dirList['cookie'])
+    return found
 
 
 if independentRestores is False:
@@ -300,45 +290,48 @@ else:
     unindexedSnapshots = [s for s in doc['versions'] if 'numEntriesIndexed' not in s or s['numEntriesIndexed'] == 0]
     if unindexedSnapshots is not None and len(unindexedSnapshots) > 0:
         print('Crawling for files...')
-    for file in files:
-        encodedFile = quote_plus(file)
-        fileRestored = False
-        if unindexedSnapshots is not None and len(unindexedSnapshots) > 0:
-            foundFile = None
-            for version in doc['versions']:
-                if foundFile is None:
-                    instance = ("attemptNum=%s&clusterId=%s&clusterIncarnationId=%s&entityId=%s&jobId=%s&jobInstanceId=%s&jobStartTimeUsecs=%s&jobUidObjectId=%s" %
-                                (version['instanceId']['attemptNum'],
-                                    doc['objectId']['jobUid']['clusterId'],
-                                    doc['objectId']['jobUid']['clusterIncarnationId'],
-                                    doc['objectId']['entity']['id'],
-                                    doc['objectId']['jobId'],
-                                    version['instanceId']['jobInstanceId'],
-                                    version['instanceId']['jobStartTimeUsecs'],
-                                    doc['objectId']['jobUid']['objectId']))
-                    # perform quick case sensitive exact match
-                    thisFile = api('get', '/vm/directoryList?%s&statFileEntries=false&dirPath=%s' % (instance, encodedFile), quiet=True)
-                    if thisFile is not None and thisFile != "error":
-                        foundFile = file
-                    if foundFile is None:
-                        # perform recursive directory walk (deep search)
-                        backupType = doc['backupType']
-                        if backupType in volumeTypes:
-                            volumeList = api('get', '/vm/volumeInfo?%s&statFileEntries=false' % instance)
-                            if 'volumeInfos' in volumeList:
-                                volumeInfoCookie = volumeList['volumeInfoCookie']
-                                for volume in sorted(volumeList['volumeInfos'], key=lambda v: v['name']):
-                                    volumeName = quote_plus(volume['name'])
-                                    listdir(file, '/', instance, volumeInfoCookie, volumeName)
-                        else:
-                            listdir(file, '/', instance)
-                if foundFile is not None:
-                    restore(foundFile, doc, version, targetEntity, True)
-                    fileRestored = True
-                    break
-            if foundFile is None:
-                print('%s not found on sourceservers (or not available in the specified versions)' % file)
-        else:
+        remainingFiles = list(files)
+        for version in doc['versions']:
+            if len(remainingFiles) == 0:
+                break
+            instance = ("attemptNum=%s&clusterId=%s&clusterIncarnationId=%s&entityId=%s&jobId=%s&jobInstanceId=%s&jobStartTimeUsecs=%s&jobUidObjectId=%s" %
+                        (version['instanceId']['attemptNum'],
+                            doc['objectId']['jobUid']['clusterId'],
+                            doc['objectId']['jobUid']['clusterIncarnationId'],
+                            doc['objectId']['entity']['id'],
+                            doc['objectId']['jobId'],
+                            version['instanceId']['jobInstanceId'],
+                            version['instanceId']['jobStartTimeUsecs'],
+                            doc['objectId']['jobUid']['objectId']))
+            # perform quick case sensitive exact matches
+            foundFiles = {}
+            exactMatches = apimany([('get', '/vm/directoryList?%s&statFileEntries=false&dirPath=%s' % (instance, quote_plus(file))) for file in remainingFiles], quiet=True)
+            for (file, thisFile) in zip(remainingFiles, exactMatches):
+                if thisFile is not None and thisFile != "error" and not (isinstance(thisFile, dict) and 'error' in thisFile):
+                    foundFiles[file] = file
+            searchFiles = [file for file in remainingFiles if file not in foundFiles]
+            if len(searchFiles) > 0:
+                # perform one directory walk for all remaining files (deep search)
+                backupType = doc['backupType']
+                if backupType in volumeTypes:
+                    volumeList = api('get', '/vm/volumeInfo?%s&statFileEntries=false' % instance)
+                    if 'volumeInfos' in volumeList:
+                        volumeInfoCookie = volumeList['volumeInfoCookie']
+                        for volume in sorted(volumeList['volumeInfos'], key=lambda v: v['name']):
+                            searchFiles = [file for file in searchFiles if file not in foundFiles]
+                            if len(searchFiles) > 0:
+                                foundFiles.update(findFiles(searchFiles, instance, volumeInfoCookie, volume['name']))
+                else:
+                    foundFiles.update(findFiles(searchFiles, instance))
+            for file in remainingFiles:
+                if file in foundFiles:
+                    restore(foundFiles[file], doc, version, targetEntity, True)
+            remainingFiles = [file for file in remainingFiles if file not in foundFiles]
+        for file in remainingFiles:
+            print('%s not found on sourceservers (or not available in the specified versions)' % file)
+    else:
+        for file in files:
+            encodedFile = quote_plus(file)
             fileSearch = api('get', '/searchfiles?filename=%s' % encodedFile)
             if 'files' not in fileSearch:
                 print("file %s not found" % file)
@@ -366,3 +359,15 @@ else:
                         else:
                             version = versions['versions'][0]
                             restore(file, doc, version, targetEntity, True)
+
+# wait for all restores to finish
+if len(restoreTasks) > 0:
+    results = waitRecoveries(list(restoreTasks.keys()), callback=restoreFinished)
+    # restores finish in any order, so record the newest restored version once
+    restoredPoints = [restoreTasks[taskId][1]['instanceId']['jobStartTimeUsecs'] for (taskId, t) in results.items() if recoveryStatus(t) == 'kSuccess']
+    if newonly and len(restoredPoints) > 0:
+        f = open('lastrestorepoint', 'w')
+        f.write('%s' % max(restoredPoints))
+        f.close()
+    if len([t for t in results.values() if recoveryStatus(t) != 'kSuccess']) > 0:
+        exit(1)
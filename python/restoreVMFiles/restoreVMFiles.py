@@ -4,7 +4,6 @@
 # import pyhesity wrapper module
 from pyhesity import *
 from datetime import datetime, timedelta
-from time import sleep
 import sys
 import getpass
 import argparse
@@ -34,6 +33,7 @@ parser.add_argument('-vu', '--vmuser', type=str, default=None)    # destination
 parser.add_argument('-vp', '--vmpwd', type=str, default=None)    # destination path
 parser.add_argument('-x', '--noindex', action='store_true')
 parser.add_argument('-k', '--taskname', type=str, default=None)       # recoverytask name
+parser.add_argument('-cs', '--concurrency', type=int, default=8)      # number of concurrent index searches
 args = parser.parse_args()
 
 vip = args.vip
@@ -57,6 +57,7 @@ daysago = args.daysago
 restoremethod = args.restoremethod
 noindex = args.noindex
 taskname = args.taskname
+concurrency = args.concurrency
 
 if sys.version_info > (3,):
     long = int
@@ -218,8 +219,8 @@ else:
         restoreParams['vmwareParams']['recoverFileAndFolderParams']['vmwareTargetParams']["originalTargetConfig"]["targetVmCredentials"] = vmCredentials
 
 # find files for restore
-for file in files:
-    if noindex:
+if noindex:
+    for file in files:
         if file[-1] == '/':
             isDirectory = True
         else:
@@ -228,39 +229,48 @@ for file in files:
             "absolutePath": file,
             "isDirectory": isDirectory
         })
-    else:
-        # encodedFile = quote_plus(file)
-        searchParams = {
-            "fileParams": {
-                "searchString": file,
-                "sourceEnvironments": [
-                    "kVMware"
-                ],
-                "objectIds": [
-                    objectId
-                ]
-            },
-            "objectType": "Files"
-        }
-        search = api('post', "data-protect/search/indexed-objects", searchParams, v=2)
-        if search['files']:
-            thisFile = [t for t in search['files'] if "%s/%s" % (t['path'].lower(), t['name'].lower()) == file.lower() or "%s/%s/" % (t['path'].lower(), t['name'].lower()) == file.lower()]
+else:
+    # search the index for each unique path concurrently
+    searchStrings = list(dict((file.lower(), file) for file in files).values())
+    print('Searching index for %s files...' % len(searchStrings))
+    searchStart = datetime.now()
+    searches = apimany([('post', 'data-protect/search/indexed-objects', {'data': {
+        "fileParams": {
+            "searchString": file,
+            "sourceEnvironments": [
+                "kVMware"
+            ],
+            "objectIds": [
+                objectId
+            ]
+        },
+        "objectType": "Files"
+    }, 'v': 2}) for file in searchStrings], workers=concurrency)
 
-            if len(thisFile) == 0:
-                print("file %s not found" % file)
-            else:
-                if file[-1] == '/':
-                    isDirectory = True
-                    absolutePath = "%s/%s/" % (thisFile[0]['path'], thisFile[0]['name'])
-                else:
-                    isDirectory = False
-                    absolutePath = "%s/%s" % (thisFile[0]['path'], thisFile[0]['name'])
-                restoreParams['vmwareParams']['recoverFileAndFolderParams']['filesAndFolders'].append({
-                    "absolutePath": absolutePath,
-                    "isDirectory": isDirectory
-                })
-        else:
+    # index search results by path
+    indexedFiles = {}
+    for search in searches:
+        if isinstance(search, dict) and search.get('files', None):
+            for t in search['files']:
+                indexedFiles.setdefault("%s/%s" % (t['path'].lower(), t['name'].lower()), t)
+    searchSeconds = (datetime.now() - searchStart).total_seconds()
+    print('Searched %s files in %.1f seconds (%.1f files/sec)' % (len(searchStrings), searchSeconds, len(searchStrings) / max(searchSeconds, 0.001)))
+
+    for file in files:
+        thisFile = indexedFiles.get(file.lower().rstrip('/'), None)
+        if thisFile is None:
             print("file %s not found" % file)
+        else:
+            if file[-1] == '/':
+                isDirectory = True
+                absolutePath = "%s/%s/" % (thisFile['path'], thisFile['name'])
+            else:
+                isDirectory = False
+                absolutePath = "%s/%s" % (thisFile['path'], thisFile['name'])
+            restoreParams['vmwareParams']['recoverFileAndFolderParams']['filesAndFolders'].append({
+                "absolutePath": absolutePath,
+                "isDirectory": isDirectory
+            })
 
 # perform restore
 if len(restoreParams['vmwareParams']['recoverFileAndFolderParams']['filesAndFolders']) > 0:
@@ -269,9 +279,7 @@ if len(restoreParams['vmwareParams']['recoverFileAndFolderParams']['filesAndFold
         restoreTaskId = restoreTask['id']
         print("Restoring Files...")
         if wait:
-            while restoreTask['status'] == "Running":
-                sleep(5)
-                restoreTask = api('get', "data-protect/recoveries/%s?includeTenants=true" % restoreTaskId, v=2)
+            restoreTask = waitRecoveries([restoreTaskId], v=2, minInterval=5)[restoreTaskId]
             if restoreTask['status'] == 'Succeeded':
                 print("Restore %s" % restoreTask['status'])
             else:
@@ -50,13 +50,17 @@ message = ''
 
 # for each active job
 jobs = api('get', 'protectionJobs')
-for job in jobs:
-    if 'isDeleted' not in job and ('isActive' not in job or job['isActive'] is not False):
+activeJobs = [job for job in jobs if 'isDeleted' not in job and ('isActive' not in job or job['isActive'] is not False)]
+
+# get recent runs for all active jobs concurrently
+jobRuns = apimany([('get', 'protectionRuns?jobId=%s&numRuns=2' % job['id']) for job in activeJobs])
+
+for job, runs in zip(activeJobs, jobRuns):
+    if isinstance(runs, list):
         jobId = job['id']
         jobName = job['name']
         sla = job['incrementalProtectionSlaTimeMins']
         slaUsecs = sla * 60000000
-        runs = api('get', 'protectionRuns?jobId=%s&numRuns=2' % jobId)
         for run in runs:
             # get backup run time
             startTimeUsecs = run['backupRun']['stats']['startTimeUsecs']
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""Batched Time Series Stats Fetcher"""
+
+# from statstool import *
+# stats = timeSeries([(entityId, 'BookKeeperStats', 'NumFiles'), (entityId, 'BookKeeperStats', 'NumDirectories')], startMsecs, endMsecs, rollupIntervalSecs=21600)
+# numFiles = stats.last('NumFiles')  # one value per entity, in stats.entities order
+# trend = capacityTrend(consumed, capacity)  # clusters x days arrays
+
+import numpy as np
+import warnings
+from pyhesity import apimany
+
+__all__ = ['timeSeries', 'TimeSeries', 'capacityTrend']
+
+
+class TimeSeries:
+    """time series stats aligned to rollup intervals, values[entity, timestamp, metric] (nan where missing)"""
+
+    def __init__(self, entities, timestamps, metrics, values):
+        self.entities = entities
+        self.timestamps = timestamps
+        self.metrics = metrics
+        self.values = values
+        self.entityIndex = dict((entityId, i) for (i, entityId) in enumerate(entities))
+
+    def metric(self, metricName):
+        """entity x timestamp array for one metric"""
+        return self.values[:, :, self.metrics.index(metricName)]
+
+    def entity(self, entityId):
+        """timestamp x metric array for one entity"""
+        return self.values[self.entityIndex[entityId]]
+
+    def first(self, metricName):
+        """earliest data point of a metric for each entity (nan if none)"""
+        return self._pick(metricName, 0)
+
+    def last(self, metricName):
+        """latest data point of a metric for each entity (nan if none)"""
+        return self._pick(metricName, -1)
+
+    def _pick(self, metricName, end):
+        return _pick(self.metric(metricName), end)
+
+
+def _pick(data, end):
+    """first (end=0) or last (end=-1) non-nan value of each row"""
+    if data.shape[1] == 0:
+        return np.full(data.shape[0], np.nan)
+    present = ~np.isnan(data)
+    if end == 0:
+        index = present.argmax(axis=1)
+    else:
+        index = data.shape[1] - 1 - present[:, ::-1].argmax(axis=1)
+    return data[np.arange(data.shape[0]), index]
+
+
+def timeSeries(series, startTimeMsecs, endTimeMsecs, rollupIntervalSecs=3600, rollupFunction='latest', workers=None, quiet=None, context=None):
+    """fetch statistics/timeSeriesStats for many (entityId, schemaName, metricName) series concurrently, returns a TimeSeries (all nan if not connected)"""
+    series = list(dict.fromkeys(series))
+    entities = list(dict.fromkeys([s[0] for s in series]))
+    metrics = list(dict.fromkeys([s[2] for s in series]))
+    intervalMsecs = rollupIntervalSecs * 1000
+    firstBucket = int(startTimeMsecs) // intervalMsecs
+    timestamps = np.arange(firstBucket, int(endTimeMsecs) // intervalMsecs + 1, dtype=np.int64) * intervalMsecs
+    values = np.full((len(entities), len(timestamps), len(metrics)), np.nan)
+    if len(series) == 0:
+        return TimeSeries(entities, timestamps, metrics, values)
+
+    results = apimany([('get', 'statistics/timeSeriesStats?schemaName=%s&metricName=%s&rollupFunction=%s&rollupIntervalSecs=%s&entityId=%s&startTimeMsecs=%s&endTimeMsecs=%s' % (schemaName, metricName, rollupFunction, rollupIntervalSecs, entityId, startTimeMsecs, endTimeMsecs)) for (entityId, schemaName, metricName) in series], workers=workers, quiet=quiet, context=context)
+    if results is None:
+        # not connected (apimany prints the error), return the series with no data points
+        return TimeSeries(entities, timestamps, metrics, values)
+
+    entityIndex = dict((entityId, i) for (i, entityId) in enumerate(entities))
+    metricIndex = dict((metricName, i) for (i, metricName) in enumerate(metrics))
+    for ((entityId, schemaName, metricName), result) in zip(series, results):
+        if not isinstance(result, dict) or not result.get('dataPointVec', None):
+            continue
+        points = [(point['timestampMsecs'], point['data'].get('int64Value', point['data'].get('doubleValue', None))) for point in result['dataPointVec'] if 'data' in point]
+        points = [(t, v) for (t, v) in points if v is not None]
+        if len(points) == 0:
+            continue
+        pointTimes = np.array([t for (t, v) in points], dtype=np.int64)
+        pointValues = np.array([v for (t, v) in points], dtype=np.float64)
+        buckets = pointTimes // intervalMsecs - firstBucket
+        inRange = (buckets >= 0) & (buckets < len(timestamps))
+        # points are returned oldest first, so later points in the same bucket win
+        values[entityIndex[entityId], buckets[inRange], metricIndex[metricName]] = pointValues[inRange]
+    return TimeSeries(entities, timestamps, metrics, values)
+
+
+def _rolling(data, window):
+    """trailing window sums along each row"""
+    sums = np.cumsum(data, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window].copy()
+    return sums
+
+
+def _linearFit(x, y, weights):
+    """weighted least squares line for each row, returns (slope, intercept)"""
+    sw = weights.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mx = (weights * x).sum(axis=1) / sw
+        my = (weights * y).sum(axis=1) / sw
+        dx = x - mx[:, np.newaxis]
+        slope = (weights * dx * (y - my[:, np.newaxis])).sum(axis=1) / (weights * dx * dx).sum(axis=1)
+    return (slope, my - slope * mx)
+
+
+def capacityTrend(consumed, capacity, window=30, fitDays=90, robust=False, threshold=4.0):
+    """growth rates, days to full and anomaly flags for clusters x days arrays of daily consumed and capacity (nan where missing)"""
+    consumed = np.atleast_2d(np.asarray(consumed, dtype=np.float64))
+    capacity = np.atleast_2d(np.asarray(capacity, dtype=np.float64))
+    (rows, days) = consumed.shape
+    x = np.arange(days, dtype=np.float64)
+
+    # work in units of each row's peak so the running sums keep their precision
+    with np.errstate(invalid='ignore'):
+        scale = np.nanmax(np.abs(consumed), axis=1, initial=0.0)
+    scale[~(scale > 0)] = 1.0
+    present = ~np.isnan(consumed)
+    w = present.astype(np.float64)
+    y = np.where(present, consumed, 0.0) / scale[:, np.newaxis]
+
+    # rolling growth rate: slope of the least squares line over the trailing window
+    n = _rolling(w, window)
+    sx = _rolling(w * x, window)
+    sy = _rolling(y, window)
+    sxy = _rolling(y * x, window)
+    sxx = _rolling(w * x * x, window)
+    denom = n * sxx - sx * sx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (n * sxy - sx * sy) / denom
+    growth[(n < max(2, window // 2)) | ~(denom > 0)] = np.nan
+
+    # anomalies: daily change far from the trailing growth rate, in units of the trailing spread of daily changes
+    delta = np.full((rows, days), np.nan)
+    delta[:, 1:] = (y[:, 1:] - y[:, :-1])
+    delta[:, 1:][~(present[:, 1:] & present[:, :-1])] = np.nan
+    deltaPresent = ~np.isnan(delta)
+    d = np.where(deltaPresent, delta, 0.0)
+    dn = _rolling(deltaPresent.astype(np.float64), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dmean = _rolling(d, window) / dn
+        dstd = np.sqrt(np.maximum(_rolling(d * d, window) / dn - dmean * dmean, 0.0))
+    anomalies = np.zeros((rows, days), dtype=bool)
+    expected = growth[:, :-2]
+    spread = np.maximum(dstd[:, :-2], 1e-4)
+    with np.errstate(invalid='ignore'):
+        anomalies[:, 2:] = np.abs(delta[:, 2:] - expected) > threshold * spread
+
+    # days to full: linear (or huber-weighted robust) fit over the last fitDays
+    first = max(0, days - fitDays)
+    fx = x[first:]
+    fy = y[:, first:]
+    fw = w[:, first:]
+    weights = fw
+    (slope, intercept) = _linearFit(fx, fy, weights)
+    if robust is True:
+        for i in range(5):
+            residuals = np.abs(fy - (intercept[:, np.newaxis] + slope[:, np.newaxis] * fx))
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # rows without data
+                sigma = 1.4826 * np.nanmedian(np.where(fw > 0, residuals, np.nan), axis=1)
+            k = 1.345 * np.maximum(np.nan_to_num(sigma), 1e-9)[:, np.newaxis]
+            with np.errstate(divide='ignore'):
+                weights = fw * np.where(residuals <= k, 1.0, k / residuals)
+            (slope, intercept) = _linearFit(fx, fy, weights)
+
+    latestConsumed = _pick(consumed, -1)
+    latestCapacity = _pick(capacity, -1)
+    projected = (intercept + slope * (days - 1)) * scale
+    slope = slope * scale
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daysToFull = np.where(slope > 0, np.maximum(latestCapacity - projected, 0.0) / slope, np.inf)
+        pctFull = 100 * latestConsumed / latestCapacity
+    daysToFull[np.isnan(slope) | np.isnan(latestCapacity)] = np.nan
+
+    return {
+        'consumed': latestConsumed,
+        'capacity': latestCapacity,
+        'pctFull': pctFull,
+        'growth': growth * scale[:, np.newaxis],
+        'slope': slope,
+        'daysToFull': daysToFull,
+        'anomalies': anomalies
+    }
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""vCenter Recovery Target Catalog"""
+
+# from vcentertool import *
+# catalog = vcenterCatalog('vcenter.mydomain.net')
+# host = catalog.host('esxi1.mydomain.net', datacenterName='Datacenter1')
+# resourcePoolId = catalog.resourcePoolId(host)
+# datastore = catalog.datastore(resourcePoolId, 'datastore1')
+# network = catalog.network(resourcePoolId, 'VM Network')
+# folder = catalog.folder(resourcePoolId, 'vm')
+
+import threading
+import pyhesity
+from pyhesity import api, sourceIndex, findSources
+
+__all__ = ['vcenterCatalog', 'VCenterCatalog', 'VCENTERCACHETTL']
+
+VCENTERCACHETTL = 300
+
+_catalogs = {}
+_catalogLock = threading.Lock()
+
+
+def _entityIndex(entities, nameKeys):
+    """index a list of entities by id and lowercased name"""
+    index = {'ids': {}, 'names': {}}
+    for entity in entities or []:
+        if 'id' in entity:
+            index['ids'][entity['id']] = entity
+        for nameKey in nameKeys:
+            name = entity
+            for key in nameKey:
+                name = name.get(key, None) if isinstance(name, dict) else None
+            if name is not None:
+                index['names'].setdefault(name.lower(), entity)
+    return index
+
+
+def _lookup(index, nameOrId):
+    """entity by name (case insensitive) or id, None if not found"""
+    if index is None or nameOrId is None:
+        return None
+    if isinstance(nameOrId, int):
+        return index['ids'].get(nameOrId, None)
+    return index['names'].get(nameOrId.lower(), None)
+
+
+class VCenterCatalog:
+    """vCenter source tree, resource pools, datastores, networks and folders indexed by name and id
+
+    per resource pool lists are fetched on first use, and when the on-disk api cache is enabled
+    (PYHESITY_CACHE or apicache()) or cacheTTL is set, calls are cached for cacheTTL seconds
+    (default VCENTERCACHETTL), so repeated runs skip most of the vCenter proxied calls.
+    datastores are never cached since their free space changes with every recovery
+    """
+
+    def __init__(self, vcenterName, cacheTTL=None, context=None):
+        if cacheTTL is None and pyhesity.CACHEENABLED is not False:
+            cacheTTL = VCENTERCACHETTL
+        self.name = vcenterName
+        self.cacheTTL = cacheTTL
+        self.context = context
+        self.source = None
+        self.entity = None
+        self.id = None
+        self.index = None
+        self._resourcePools = None
+        self._lists = {}
+        self._lock = threading.Lock()
+        sources = self._get('protectionSources?environments=kVMware')
+        for source in sources if isinstance(sources, list) else []:
+            if source['protectionSource']['name'].lower() == vcenterName.lower():
+                self.source = source
+        entities = self._get('/entitiesOfType?environmentTypes=kVMware&vmwareEntityTypes=kVCenter&vmwareEntityTypes=kStandaloneHost')
+        for entity in entities if isinstance(entities, list) else []:
+            if entity['displayName'].lower() == vcenterName.lower():
+                self.entity = entity
+                self.id = entity['id']
+        if self.source is not None:
+            self.index = sourceIndex(self.source)
+
+    def _get(self, uri, cache=True):
+        return api('get', uri, cache=self.cacheTTL if cache is True else False, context=self.context)
+
+    def found(self):
+        """True if the vCenter was found"""
+        return self.source is not None and self.entity is not None
+
+    def datacenter(self, name):
+        """datacenter source node by name"""
+        datacenters = findSources(self.index, name=name, type='kDatacenter') if self.index else []
+        if len(datacenters) == 0:
+            return None
+        return datacenters[0]
+
+    def host(self, name, datacenterName=None):
+        """host (or cluster) source node with a resource pool, by name (within a datacenter)"""
+        if self.index is None:
+            return None
+        ancestorId = None
+        if datacenterName is not None:
+            datacenter = self.datacenter(datacenterName)
+            if datacenter is None:
+                return None
+            ancestorId = datacenter['protectionSource']['id']
+        for host in findSources(self.index, name=name, ancestorId=ancestorId):
+            if self.resourcePoolId(host) is not None:
+                return host
+        return None
+
+    def resourcePoolId(self, host):
+        """id of the resource pool of a host source node"""
+        for node in host.get('nodes', []):
+            if node['protectionSource'].get('vmWareProtectionSource', {}).get('type', None) == 'kResourcePool':
+                return node['protectionSource']['id']
+        return None
+
+    def resourcePool(self, resourcePoolId):
+        """resource pool entity by id"""
+        with self._lock:
+            if self._resourcePools is None:
+                resourcePools = self._get('/resourcePools?vCenterId=%s' % self.id)
+                self._resourcePools = _entityIndex([r['resourcePool'] for r in resourcePools] if isinstance(resourcePools, list) else [], [('displayName',)])
+        return _lookup(self._resourcePools, resourcePoolId)
+
+    def _list(self, listType, resourcePoolId):
+        """indexed datastores, networks or folders of a resource pool"""
+        with self._lock:
+            key = (listType, resourcePoolId)
+            if key not in self._lists:
+                if listType == 'datastores':
+                    entities = self._get('/datastores?resourcePoolId=%s&vCenterId=%s' % (resourcePoolId, self.id), cache=False)
+                    self._lists[key] = _entityIndex(entities if isinstance(entities, list) else [], [('vmwareEntity', 'name'), ('displayName',)])
+                elif listType == 'networks':
+                    entities = self._get('/networkEntities?resourcePoolId=%s&vCenterId=%s' % (resourcePoolId, self.id))
+                    self._lists[key] = _entityIndex(entities if isinstance(entities, list) else [], [('displayName',)])
+                else:
+                    entities = self._get('/vmwareFolders?resourcePoolId=%s&vCenterId=%s' % (resourcePoolId, self.id))
+                    self._lists[key] = _entityIndex(entities.get('vmFolders', []) if isinstance(entities, dict) else [], [('displayName',)])
+            return self._lists[key]
+
+    def datastores(self, resourcePoolId):
+        """datastore entities available to a resource pool"""
+        return list(self._list('datastores', resourcePoolId)['ids'].values())
+
+    def datastore(self, resourcePoolId, nameOrId):
+        """datastore entity by name or id (None if not found)"""
+        return _lookup(self._list('datastores', resourcePoolId), nameOrId)
+
+    def network(self, resourcePoolId, nameOrId):
+        """network entity by name or id (None if not found)"""
+        return _lookup(self._list('networks', resourcePoolId), nameOrId)
+
+    def folder(self, resourcePoolId, nameOrId):
+        """VM folder entity by name or id (None if not found)"""
+        return _lookup(self._list('folders', resourcePoolId), nameOrId)
+
+
+def vcenterCatalog(vcenterName, cacheTTL=None, context=None):
+    """catalog of a vCenter (loaded once per process unless cacheTTL is 0, returns None if the vCenter is not found)"""
+    if context is None:
+        context = pyhesity.COHESITY_API
+    key = (context['APIROOT'], str(context['HEADER'].get('accessClusterId', '')), vcenterName.lower())
+    with _catalogLock:
+        if key not in _catalogs or cacheTTL == 0:
+            catalog = VCenterCatalog(vcenterName, cacheTTL=cacheTTL, context=context)
+            if catalog.found() is False:
+                return None
+            _catalogs[key] = catalog
+        return _catalogs[key]
@@ -3,6 +3,8 @@
 
 # import pyhesity wrapper module
 from pyhesity import *
+from statstool import *
+import numpy as np
 
 # command line arguments
 import argparse
@@ -40,21 +42,23 @@ else:
     exit(1)
 
 vips = vlan['ips']
-nodes = []
+apiRoot = context['APIROOT']
+nodeIds = []
 
 for v in vips:
     context['APIROOT'] = 'https://%s/irisservices/api/v1' % v
     setContext(context)
     nodeinfo = api('get', 'node/status')
-    nodeid = nodeinfo['id']
-    cpustats = api('get', 'statistics/timeSeriesStats?endTimeMsecs=%s&entityId=%s&metricName=kCpuUsagePct&metricUnitType=9&range=day&rollupFunction=average&rollupIntervalSecs=360&schemaName=kSentryNodeStats&startTimeMsecs=%s' % (nowMsecs, nodeid, hourAgoMsecs))
-    cpustat = cpustats['dataPointVec'][-1]['data']['doubleValue']
-    nodes.append({'nodeId': nodeid, 'vip': v, 'cpustat': cpustat})
-
-x = 0
-for node in sorted(nodes, key=lambda nodeinfo: nodeinfo['cpustat']):
-    print(node['vip'])
-    x += 1
-    if x == nodecount:
-        exit(0)
+    nodeIds.append(nodeinfo['id'])
+
+context['APIROOT'] = apiRoot
+setContext(context)
+
+# get cpu stats for all nodes concurrently
+stats = timeSeries([(nodeId, 'kSentryNodeStats', 'kCpuUsagePct') for nodeId in nodeIds], hourAgoMsecs, nowMsecs, rollupIntervalSecs=360, rollupFunction='average')
+cpustats = stats.last('kCpuUsagePct')[[stats.entityIndex[nodeId] for nodeId in nodeIds]]
+
+# least busy first (nodes without stats last)
+for i in np.argsort(cpustats, kind='stable')[:nodecount]:
+    print(vips[i])
 exit(0)
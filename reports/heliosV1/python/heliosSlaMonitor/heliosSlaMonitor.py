@@ -48,88 +48,105 @@ missesRecorded = False
 message = '<html><body style="font-family: Helvetica, Arial, sans-serif; font-size: 12px; background-color: #f1f3f6; color: #444444;">'
 message += '<div style="background-color: #fff; width:fit-content; padding: 2px 6px 8px 6px; font-weight: 300; box-shadow: 1px 2px 4px #cccccc; border-radius: 4px;">'
 message += '<p style="font-weight: bold;">Helios SLA Miss Report (%s)</p>' % now.date()
-for hcluster in heliosClusters():
-    heliosCluster(hcluster['name'])
 
-    cluster = api('get', 'cluster')
-    if cluster:
-        printedClusterName = False
-        # for each active job
-        jobs = api('get', 'protectionJobs')
-        if jobs:
-            for job in jobs:
-                if 'isDeleted' not in job and ('isActive' not in job or job['isActive'] is not False) and ('isPaused' not in job or job['isPaused'] is not True):
-                    jobId = job['id']
-                    jobName = job['name']
-                    sla = job['incrementalProtectionSlaTimeMins']
-                    slaUsecs = sla * 60000000
-                    runs = api('get', 'protectionRuns?jobId=%s&numRuns=2' % jobId)
-                    for run in runs:
-                        # get backup run time
-                        startTimeUsecs = run['backupRun']['stats']['startTimeUsecs']
-                        status = run['backupRun']['status']
-                        if status in finishedStates:
-                            endTimeUsecs = run['backupRun']['stats']['endTimeUsecs']
-                            runTimeUsecs = endTimeUsecs - startTimeUsecs
-                        else:
-                            runTimeUsecs = nowUsecs - startTimeUsecs
-                        runTimeMinutes = int(round(runTimeUsecs / 60000000))
-                        runTimeHours = runTimeMinutes / 60
-                        # get replication time
-                        replHours = 0
-                        if 'copyRun' in run:
-                            remoteRuns = [copyRun for copyRun in run['copyRun'] if copyRun['target']['type'] == 'kRemote']
-                            for remoteRun in remoteRuns:
-                                if 'stats' in remoteRun:
-                                    if 'startTimeUsecs' in remoteRun['stats']:
-                                        replStartTimeUsecs = remoteRun['stats']['startTimeUsecs']
-                                        if 'endTimeUsecs' in remoteRun['stats']:
-                                            replEndTimeUsecs = remoteRun['stats']['endTimeUsecs']
-                                            replUsecs = replEndTimeUsecs - replStartTimeUsecs
-                                        else:
-                                            replUsecs = nowUsecs - replStartTimeUsecs
-                                        replHours = int(round(replUsecs / 60000000)) / 60
-                                        if replHours > maxreplicationhrs:
-                                            break
 
-                        if runTimeUsecs > slaUsecs or runTimeHours > maxbackuphrs or replHours > maxreplicationhrs:
-                            if printedClusterName is False:
-                                print(cluster['name'])
-                                message += '<hr style="border: 1px solid #eee;"/><span style="font-weight: bold;">%s</span><br/>' % cluster['name'].upper()
-                                printedClusterName = True
-                            # replort sla miss
-                            if status in finishedStates:
-                                verb = 'ran'
-                            else:
-                                verb = 'has been running'
-                            if (watch == 'all' or watch == 'backup') and (runTimeUsecs > slaUsecs or runTimeHours > maxbackuphrs):
-                                messageline = '<span style="margin-left: 20px; font-weight: normal; color: #000;">%s:</span> <span style="font-weight: 300;">Backup %s for %s minutes (SLA: %s minutes)</span><br/>' % (jobName.upper(), verb, runTimeMinutes, sla)
-                                message += messageline
-                                print('    %s : (Missed Backup SLA) %s for %s minutes (SLA: %s minutes)' % (jobName.upper(), verb, runTimeMinutes, sla))
-                                missesRecorded = True
-                                # identify long running objects
-                                if 'sourceBackupStatus' in run['backupRun']:
-                                    for source in run['backupRun']['sourceBackupStatus']:
-                                        if 'endTimeUsecs' in source['stats']:
-                                            timeTakenUsecs = source['stats']['endTimeUsecs'] - startTimeUsecs
-                                        elif 'timeTakenUsecs' in source['stats']:
-                                            timeTakenUsecs = source['stats']['timeTakenUsecs']
-                                        else:
-                                            timeTakenUsecs = 0
-                                        if timeTakenUsecs > slaUsecs:
-                                            timeTakenMin = int(round(timeTakenUsecs / 60000000))
-                                            print('            %s %s for %s minutes' % (source['source']['name'].upper(), verb, timeTakenMin))
-                                            messageline = '<span style="margin-left: 60px;"><span style="color: #000; font-weight: normal;">%s</span> <span style="font-weight: 300;">%s for %s minutes</span></span><br/>' % (source['source']['name'].upper(), verb, timeTakenMin)
-                                            message += messageline
-                            # report long running replication
-                            if (watch == 'all' or watch == 'replication') and replHours >= maxreplicationhrs:
-                                print('    %s : (Missed Replication SLA) replication time: %s hours' % (jobName, replHours))
-                                messageline = '<span style="margin-left: 20px; font-weight: normal; color: #000;">%s:</span> <span style="font-weight: 300;">Replication time: %s hours</span><br/>' % (jobName, replHours)
-                                message += messageline
-                                missesRecorded = True
-                            break
+def slaMisses(clusterName, context):
+    """collect SLA misses for one cluster (runs concurrently for all clusters)"""
+    lines = []
+    html = ''
+    missed = False
+    cluster = api('get', 'cluster', context=context)
+    if not cluster:
+        return None
+    printedClusterName = False
+    # for each active job
+    jobs = api('get', 'protectionJobs', context=context)
+    if jobs:
+        activeJobs = [job for job in jobs if 'isDeleted' not in job and ('isActive' not in job or job['isActive'] is not False) and ('isPaused' not in job or job['isPaused'] is not True)]
+        # all clusters share the helios session, so 5 clusters x 2 calls stay within its connection pool
+        jobRuns = apimany([('get', 'protectionRuns?jobId=%s&numRuns=2' % job['id']) for job in activeJobs], workers=2, context=context)
+        for job, runs in zip(activeJobs, jobRuns):
+            if not isinstance(runs, list):
+                continue
+            jobName = job['name']
+            sla = job['incrementalProtectionSlaTimeMins']
+            slaUsecs = sla * 60000000
+            for run in runs:
+                # get backup run time
+                startTimeUsecs = run['backupRun']['stats']['startTimeUsecs']
+                status = run['backupRun']['status']
+                if status in finishedStates:
+                    endTimeUsecs = run['backupRun']['stats']['endTimeUsecs']
+                    runTimeUsecs = endTimeUsecs - startTimeUsecs
+                else:
+                    runTimeUsecs = nowUsecs - startTimeUsecs
+                runTimeMinutes = int(round(runTimeUsecs / 60000000))
+                runTimeHours = runTimeMinutes / 60
+                # get replication time
+                replHours = 0
+                if 'copyRun' in run:
+                    remoteRuns = [copyRun for copyRun in run['copyRun'] if copyRun['target']['type'] == 'kRemote']
+                    for remoteRun in remoteRuns:
+                        if 'stats' in remoteRun:
+                            if 'startTimeUsecs' in remoteRun['stats']:
+                                replStartTimeUsecs = remoteRun['stats']['startTimeUsecs']
+                                if 'endTimeUsecs' in remoteRun['stats']:
+                                    replEndTimeUsecs = remoteRun['stats']['endTimeUsecs']
+                                    replUsecs = replEndTimeUsecs - replStartTimeUsecs
+                                else:
+                                    replUsecs = nowUsecs - replStartTimeUsecs
+                                replHours = int(round(replUsecs / 60000000)) / 60
+                                if replHours > maxreplicationhrs:
+                                    break
+
+                if runTimeUsecs > slaUsecs or runTimeHours > maxbackuphrs or replHours > maxreplicationhrs:
+                    if printedClusterName is False:
+                        lines.append(cluster['name'])
+                        html += '<hr style="border: 1px solid #eee;"/><span style="font-weight: bold;">%s</span><br/>' % cluster['name'].upper()
+                        printedClusterName = True
+                    # replort sla miss
+                    if status in finishedStates:
+                        verb = 'ran'
+                    else:
+                        verb = 'has been running'
+                    if (watch == 'all' or watch == 'backup') and (runTimeUsecs > slaUsecs or runTimeHours > maxbackuphrs):
+                        messageline = '<span style="margin-left: 20px; font-weight: normal; color: #000;">%s:</span> <span style="font-weight: 300;">Backup %s for %s minutes (SLA: %s minutes)</span><br/>' % (jobName.upper(), verb, runTimeMinutes, sla)
+                        html += messageline
+                        lines.append('    %s : (Missed Backup SLA) %s for %s minutes (SLA: %s minutes)' % (jobName.upper(), verb, runTimeMinutes, sla))
+                        missed = True
+                        # identify long running objects
+                        if 'sourceBackupStatus' in run['backupRun']:
+                            for source in run['backupRun']['sourceBackupStatus']:
+                                if 'endTimeUsecs' in source['stats']:
+                                    timeTakenUsecs = source['stats']['endTimeUsecs'] - startTimeUsecs
+                                elif 'timeTakenUsecs' in source['stats']:
+                                    timeTakenUsecs = source['stats']['timeTakenUsecs']
+                                else:
+                                    timeTakenUsecs = 0
+                                if timeTakenUsecs > slaUsecs:
+                                    timeTakenMin = int(round(timeTakenUsecs / 60000000))
+                                    lines.append('            %s %s for %s minutes' % (source['source']['name'].upper(), verb, timeTakenMin))
+                                    messageline = '<span style="margin-left: 60px;"><span style="color: #000; font-weight: normal;">%s</span> <span style="font-weight: 300;">%s for %s minutes</span></span><br/>' % (source['source']['name'].upper(), verb, timeTakenMin)
+                                    html += messageline
+                    # report long running replication
+                    if (watch == 'all' or watch == 'replication') and replHours >= maxreplicationhrs:
+                        lines.append('    %s : (Missed Replication SLA) replication time: %s hours' % (jobName, replHours))
+                        messageline = '<span style="margin-left: 20px; font-weight: normal; color: #000;">%s:</span> <span style="font-weight: 300;">Replication time: %s hours</span><br/>' % (jobName, replHours)
+                        html += messageline
+                        missed = True
+                    break
+    return {'lines': lines, 'html': html, 'missed': missed}
+
+
+for (clusterName, result) in clusterMap(slaMisses, heliosContexts(), workers=5):
+    if result is None or 'error' in result:
+        print('%-15s: (trouble accessing cluster)' % clusterName)
     else:
-        print('%-15s: (trouble accessing cluster)' % hcluster['name'])
+        for line in result['lines']:
+            print(line)
+        message += result['html']
+        if result['missed'] is True:
+            missesRecorded = True
 
 if missesRecorded is False:
     print('No SLA misses recorded')
@@ -79,20 +79,6 @@ else:
 start = usecsToDate(uStart, '%Y-%m-%d')
 end = usecsToDate(uEnd, '%Y-%m-%d')
 
-# build 7 day time ranges
-ranges = []
-gotAllRanges = False
-thisUend = uEnd
-thisUstart = uStart
-while gotAllRanges is False:
-    if (thisUend - uStart) > 604800000000:
-        thisUstart = thisUend - 604800000000
-        ranges.append({'start': thisUstart, 'end': thisUend})
-        thisUend = thisUstart - 1
-    else:
-        ranges.append({'start': uStart, 'end': thisUend})
-        gotAllRanges = True
-
 csvHeadings = ','.join(headings)
 htmlHeadings = ''.join(['<th>%s</th>' % h for h in headings])
 
@@ -256,81 +242,49 @@ sortAttribute = 'runStartTimeUsecs'
 
 print('\nRetrieving report data...')
 
-for range in ranges:
-    startfrom = 0
-    moreRecords = True
-    while moreRecords is True:
-        reportParams = {
-            "filters": [
-                {
-                    "attribute": "date",
-                    "filterType": "TimeRange",
-                    "timeRangeFilterParams": {
-                        "lowerBound": range['start'],
-                        "upperBound": range['end']
-                    }
-                }
-            ],
-            "sort": [
-                {
-                    "attribute": sortAttribute,
-                }
-            ],
-            "timezone": "America/New_York",
-            "limit": {
-                "size": pagesize,
-                "from": startfrom
-            }
-        }
-
-        preview = api('post', 'components/%s/preview' % reportNumber, reportParams, reportingv2=True)
-
-        for i in sorted(preview['component']['data'], key=lambda x: x['runStartTimeUsecs'], reverse=True):
-            clusterName = i['systemName'].upper()
-            jobName = i['groupName']
-            environment = i['environment'][1:]
-            policy = i['policyName']
-            status = i['status'][1:]
-            startTime = usecsToDate(i['runStartTimeUsecs'], '%Y-%m-%d %H:%M')
-            endTime = usecsToDate(i['endTimeUsecs'], '%Y-%m-%d %H:%M')
-            durationSecs = round(i['durationUsecs'] / 1000000, 0)
-            timeSpan = timedelta(seconds=durationSecs)
-            timedays = timeSpan.days
-            timehours = timeSpan.seconds // 3600
-            timeminutes = (timeSpan.seconds // 60) % 60
-            timesecs = (timeSpan.seconds) % 60
-            duration = "%ss" % timesecs
-            if timeminutes > 0:
-                duration = "%sm %s" % (timeminutes, duration)
-            if timehours > 0:
-                duration = "%sh %s" % (timehours, duration)
-            if timedays > 0:
-                duration = "%sd %s" % (timedays, duration)
-            activityType = i['activityType']
-            slaStatus = i['slaStatus']
-            dataRead = round(float(i['dataRead']) / multiplier, 1)
-            dataWritten = round(float(i['dataWritten']) / multiplier, 1)
-            csv.write('"%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s"\n' % (clusterName, status, startTime, duration, durationSecs, endTime, jobName, environment, policy, activityType, slaStatus, dataRead, dataWritten))
-            html += '''<tr style="border: 1px solid #FFFFFF background-color: #FFFFFF">
-                <td class="nowrap">%s</td>
-                <td>%s</td>
-                <td class="nowrap">%s</td>
-                <td class="nowrap">%s</td>
-                <td>%s</td>
-                <td class="nowrap">%s</td>
-                <td>%s</td>
-                <td>%s</td>
-                <td>%s</td>
-                <td>%s</td>
-                <td>%s</td>
-                <td>%s</td>
-                <td>%s</td>
-                </tr>''' % (clusterName, status, startTime, duration, durationSecs, endTime, jobName, environment, policy, activityType, slaStatus, dataRead, dataWritten)
-
-        if preview['component']['data'] is None or len(preview['component']['data']) == 0:
-            moreRecords = False
-        else:
-            startfrom += pagesize
+failedRanges = []
+for page in reportPreview(reportNumber, uStart, uEnd, rangeDays=7, pageSize=pagesize, sortAttribute=sortAttribute, failedRanges=failedRanges, pages=True):
+    for i in sorted(page, key=lambda x: x['runStartTimeUsecs'], reverse=True):
+        clusterName = i['systemName'].upper()
+        jobName = i['groupName']
+        environment = i['environment'][1:]
+        policy = i['policyName']
+        status = i['status'][1:]
+        startTime = usecsToDate(i['runStartTimeUsecs'], '%Y-%m-%d %H:%M')
+        endTime = usecsToDate(i['endTimeUsecs'], '%Y-%m-%d %H:%M')
+        durationSecs = round(i['durationUsecs'] / 1000000, 0)
+        timeSpan = timedelta(seconds=durationSecs)
+        timedays = timeSpan.days
+        timehours = timeSpan.seconds // 3600
+        timeminutes = (timeSpan.seconds // 60) % 60
+        timesecs = (timeSpan.seconds) % 60
+        duration = "%ss" % timesecs
+        if timeminutes > 0:
+            duration = "%sm %s" % (timeminutes, duration)
+        if timehours > 0:
+            duration = "%sh %s" % (timehours, duration)
+        if timedays > 0:
+            duration = "%sd %s" % (timedays, duration)
+        activityType = i['activityType']
+        slaStatus = i['slaStatus']
+        dataRead = round(float(i['dataRead']) / multiplier, 1)
+        dataWritten = round(float(i['dataWritten']) / multiplier, 1)
+        csv.write('"%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s"\n' % (clusterName, status, startTime, duration, durationSecs, endTime, jobName, environment, policy, activityType, slaStatus, dataRead, dataWritten))
+        html += '''<tr style="border: 1px solid #FFFFFF background-color: #FFFFFF">
+            <td class="nowrap">%s</td>
+            <td>%s</td>
+            <td class="nowrap">%s</td>
+            <td class="nowrap">%s</td>
+            <td>%s</td>
+            <td class="nowrap">%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            <td>%s</td>
+            </tr>''' % (clusterName, status, startTime, duration, durationSecs, endTime, jobName, environment, policy, activityType, slaStatus, dataRead, dataWritten)
 
 html += '''</table>
 </div>
@@ -342,3 +296,6 @@ htmlFile.close()
 csv.close()
 
 print('\nOutput saved to %s\nAlso saved to %s\n' % (htmlFileName, csvFileName))
+if len(failedRanges) > 0:
+    print('Warning: some report data could not be retrieved, the report is incomplete')
+    exit(1)
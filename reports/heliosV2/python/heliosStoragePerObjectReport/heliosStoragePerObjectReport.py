@@ -67,20 +67,6 @@ else:
 start = usecsToDate(uStart, '%Y-%m-%d')
 end = usecsToDate(uEnd, '%Y-%m-%d')
 
-# build 180 day time ranges
-ranges = []
-gotAllRanges = False
-thisUend = uEnd
-thisUstart = uStart
-while gotAllRanges is False:
-    if (thisUend - uStart) > 15552000000000:
-        thisUstart = thisUend - 15552000000000
-        ranges.append({'start': thisUstart, 'end': thisUend})
-        thisUend = thisUstart - 1
-    else:
-        ranges.append({'start': uStart, 'end': thisUend})
-        gotAllRanges = True
-
 csvHeadings = ','.join(headings)
 htmlHeadings = ''.join(['<th>%s</th>' % h for h in headings])
 
@@ -244,74 +230,37 @@ sortAttribute = 'objectUuid'
 
 print('\nRetrieving report data...')
 
-for range in ranges:
-    startfrom = 0
-    moreRecords = True
-    while moreRecords is True:
-        reportParams = {
-            "filters": [
-                {
-                    "attribute": "date",
-                    "filterType": "TimeRange",
-                    "timeRangeFilterParams": {
-                        "lowerBound": range['start'],
-                        "upperBound": range['end']
-                    }
-                }
-            ],
-            "sort": [
-                {
-                    "attribute": sortAttribute,
-                }
-            ],
-            "timezone": "America/New_York",
-            "limit": {
-                "size": pagesize,
-                "from": startfrom
+failedRanges = []
+for i in reportPreview(reportNumber, uStart, uEnd, rangeDays=180, pageSize=pagesize, sortAttribute=sortAttribute, failedRanges=failedRanges):
+    clusterName = i['system'].upper()
+    sourceName = i['sourceName']
+    objectName = i['objectName']
+    if objectName is not None and objectName != '':
+        environment = i['environment'][1:]
+        uniqueKey = "%s:%s:%s:%s:%s:%s" % (clusterName, sourceName, objectName, environment, i['systemId'], i['objectUuid'])
+        uuid = i['objectUuid']
+        logicalSize = round(float(i['maxSourceLogicalSizeBytes']) / multiplier, 1)
+        dataRead = i['sumSourceDeltaSizeBytes']
+        dataWritten = i['sumDataWrittenSizeBytes']
+        changeRate = round(float(i['dailyChangeRate']) / multiplier, 1)
+        snapshots = i['snapshots']
+
+        if uniqueKey not in stats:
+            stats[uniqueKey] = {
+                'clusterName': clusterName,
+                'sourceName': sourceName,
+                'objectName': objectName,
+                'environment': environment,
+                'logicalSize': logicalSize,
+                'dataRead': dataRead,
+                'dataWritten': dataWritten,
+                'changeRate': changeRate,
+                'snapshots': snapshots
             }
-        }
-
-        preview = api('post', 'components/%s/preview' % reportNumber, reportParams, reportingv2=True)
-
-        clusters = list(set([c['system'] for c in preview['component']['data']]))
-
-        for cluster in clusters:
-            data = [d for d in preview['component']['data'] if d['system'] == cluster]
-            for i in data:
-                clusterName = i['system'].upper()
-                sourceName = i['sourceName']
-                objectName = i['objectName']
-                if objectName is not None and objectName != '':
-                    environment = i['environment'][1:]
-                    uniqueKey = "%s:%s:%s:%s:%s:%s" % (clusterName, sourceName, objectName, environment, i['systemId'], i['objectUuid'])
-                    uuid = i['objectUuid']
-                    logicalSize = round(float(i['maxSourceLogicalSizeBytes']) / multiplier, 1)
-                    dataRead = i['sumSourceDeltaSizeBytes']
-                    dataWritten = i['sumDataWrittenSizeBytes']
-                    changeRate = round(float(i['dailyChangeRate']) / multiplier, 1)
-                    snapshots = i['snapshots']
-
-                    if uniqueKey not in stats:
-                        stats[uniqueKey] = {
-                            'clusterName': clusterName,
-                            'sourceName': sourceName,
-                            'objectName': objectName,
-                            'environment': environment,
-                            'logicalSize': logicalSize,
-                            'dataRead': dataRead,
-                            'dataWritten': dataWritten,
-                            'changeRate': changeRate,
-                            'snapshots': snapshots
-                        }
-                    else:
-                        stats[uniqueKey]['dataRead'] += dataRead
-                        stats[uniqueKey]['dataWritten'] += dataWritten
-                        stats[uniqueKey]['snapshots'] += snapshots
-
-        if preview['component']['data'] is None or len(preview['component']['data']) == 0:
-            moreRecords = False
         else:
-            startfrom += pagesize
+            stats[uniqueKey]['dataRead'] += dataRead
+            stats[uniqueKey]['dataWritten'] += dataWritten
+            stats[uniqueKey]['snapshots'] += snapshots
 
 for uniqueKey in sorted(stats.keys()):
     clusterName = stats[uniqueKey]['clusterName']
@@ -348,3 +297,6 @@ htmlFile.close()
 csv.close()
 
 print('\nOutput saved to %s\nAlso saved to %s\n' % (htmlFileName, csvFileName))
+if len(failedRanges) > 0:
+    print('Warning: some report data could not be retrieved, the report is incomplete')
+    exit(1)
@@ -1,5 +1,7 @@
 import pandas as pd
+import numpy as np
 from pyhesity import *
+from statstool import *
 
 apiKey = 'xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx'
 
@@ -8,16 +10,26 @@ apiauth(vip='helios.cohesity.com', username='helios', domain='local', useApiKey=
 endMSecs = int(timeAgo(0, 'days') / 1000)
 startMSecs = int(timeAgo(31, 'days') / 1000)
 
-data = []
 
-for hcluster in heliosClusters():
-    heliosCluster(hcluster['name'])
-    vaults = api('get', 'vaults')
+def vaultUsage(clusterName, context):
+    vaults = api('get', 'vaults', context=context)
+    if not isinstance(vaults, list) or len(vaults) == 0:
+        return []
+    stats = timeSeries([(vault['id'], 'kIceboxVaultStats', 'kMorphedUsageBytes') for vault in vaults], startMSecs, endMSecs, rollupIntervalSecs=86400, context=context)
+    consumedGiB = np.round(stats.last('kMorphedUsageBytes') / (1024 * 1024 * 1024), 2)
+    rows = []
     for vault in vaults:
-        stats = api('get', 'statistics/timeSeriesStats?endTimeMsecs=%s&entityId=%s&metricName=kMorphedUsageBytes&metricUnitType=0&range=day&rollupFunction=latest&rollupIntervalSecs=86400&schemaName=kIceboxVaultStats&startTimeMsecs=%s' % (endMSecs, vault['id'], startMSecs))
-        if stats is not None and 'dataPointVec' in stats and len(stats['dataPointVec']) > 0:
-            consumedBytes = stats['dataPointVec'][-1]['data']['int64Value']
-            data.append([hcluster['name'], vault['name'], vault['externalTargetType'][1:], round(float(consumedBytes) / (1024 * 1024 * 1024), 2)])
+        vaultGiB = consumedGiB[stats.entityIndex[vault['id']]]
+        if not np.isnan(vaultGiB):
+            rows.append([clusterName, vault['name'], vault['externalTargetType'][1:], float(vaultGiB)])
+    return rows
+
+
+data = []
+
+for (clusterName, rows) in clusterMap(vaultUsage, heliosContexts()):
+    if isinstance(rows, list):
+        data += rows
 
 df = pd.DataFrame(data, columns=['ClusterName', 'TargetName', 'TargetType', 'ConsumedGiB'])
 print(df)
@@ -62,36 +62,28 @@ else:
 
 finishedStates = ['kCanceled', 'kSuccess', 'kFailure', 'kWarning', 'kCanceling', '3', '4', '5', '6']
 
-endUsecs = nowUsecs
-
-while(1):
-    runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=%s&endTimeUsecs=%s&includeTenants=true&includeObjectDetails=true' % (job['id'], numruns, endUsecs), v=2)
-    if len(runs['runs']) > 0:
-        endUsecs = runs['runs'][-1]['localBackupInfo']['startTimeUsecs'] - 1
-    else:
-        break
-    for run in runs['runs']:
-        try:
-            runtype = run['localBackupInfo']['runType'][1:]
-            if runtype == 'Regular':
-                runType = 'Incremental'
-            startTimeUsecs = run['localBackupInfo']['startTimeUsecs']
-            if 'endTimeUsecs' in run['localBackupInfo']:
-                endTimeUsecs = run['localBackupInfo']['endTimeUsecs']
-            else:
-                endTimeUsecs = nowUsecs
-            durationSecs = round((endTimeUsecs - startTimeUsecs) / 1000000, 0)
-            runStartTime = usecsToDate(run['localBackupInfo']['startTimeUsecs'])
-            if run['localBackupInfo']['startTimeUsecs'] < daysBackUsecs:
-                break
-            bytesread = round(run['localBackupInfo']['localSnapshotStats']['bytesRead'] / multiplier, 2)
-            byteswritten = round(run['localBackupInfo']['localSnapshotStats']['bytesWritten'] / multiplier, 2)
-            status = run['localBackupInfo']['status']
-            numsuccess = len([o for o in run['objects'] if o['localSnapshotInfo']['snapshotInfo']['status'] in ['kSuccessful', 'kWarning']])
-            numfailed = len([o for o in run['objects'] if o['localSnapshotInfo']['snapshotInfo']['status'] == 'kFailed'])
-            print("    %s  %s" % (runStartTime, status))
-            f.write('"%s","%s","%s","%s","%s","%s","%s","%s"\n' % (runStartTime, runtype, durationSecs, status, bytesread, byteswritten, numsuccess, numfailed))
-        except Exception as e:
-            pass
+for run in getRuns(job['id'], numRuns=numruns, endTimeUsecs=nowUsecs, startTimeUsecs=daysBackUsecs, query='&includeTenants=true&includeObjectDetails=true', v=2):
+    try:
+        runtype = run['localBackupInfo']['runType'][1:]
+        if runtype == 'Regular':
+            runType = 'Incremental'
+        startTimeUsecs = run['localBackupInfo']['startTimeUsecs']
+        if 'endTimeUsecs' in run['localBackupInfo']:
+            endTimeUsecs = run['localBackupInfo']['endTimeUsecs']
+        else:
+            endTimeUsecs = nowUsecs
+        durationSecs = round((endTimeUsecs - startTimeUsecs) / 1000000, 0)
+        runStartTime = usecsToDate(run['localBackupInfo']['startTimeUsecs'])
+        if run['localBackupInfo']['startTimeUsecs'] < daysBackUsecs:
+            break
+        bytesread = round(run['localBackupInfo']['localSnapshotStats']['bytesRead'] / multiplier, 2)
+        byteswritten = round(run['localBackupInfo']['localSnapshotStats']['bytesWritten'] / multiplier, 2)
+        status = run['localBackupInfo']['status']
+        numsuccess = len([o for o in run['objects'] if o['localSnapshotInfo']['snapshotInfo']['status'] in ['kSuccessful', 'kWarning']])
+        numfailed = len([o for o in run['objects'] if o['localSnapshotInfo']['snapshotInfo']['status'] == 'kFailed'])
+        print("    %s  %s" % (runStartTime, status))
+        f.write('"%s","%s","%s","%s","%s","%s","%s","%s"\n' % (runStartTime, runtype, durationSecs, status, bytesread, byteswritten, numsuccess, numfailed))
+    except Exception as e:
+        pass
 f.close()
 print('\nOutput saved to %s\n' % outfile)
@@ -71,14 +71,8 @@ if len(notfoundjobs) > 0:
 for job in sorted(jobs, key=lambda job: job['name'].lower()):
     if len(jobnames) == 0 or job['name'].lower() in [j.lower() for j in jobnames]:
         print('%s' % job['name'])
-        endUsecs = nowUsecs
-        while(1):
-            runs = api('get', 'protectionRuns?jobId=%s&numRuns=%s&endTimeUsecs=%s&excludeTasks=true' % (job['id'], numruns, endUsecs))
-            if len(runs) > 0:
-                endUsecs = runs[-1]['backupRun']['stats']['startTimeUsecs'] - 1
-            else:
-                break
-            for run in [r for r in runs if r['backupRun']['snapshotsDeleted'] is False]:
+        for run in getRuns(job['id'], numRuns=numruns, endTimeUsecs=nowUsecs, query='&excludeTasks=true'):
+            if run['backupRun']['snapshotsDeleted'] is False:
                 if ('holdForLegalPurpose' in run['copyRun'][0] and run['copyRun'][0]['holdForLegalPurpose'] is True) or 'legalHoldings' in run['copyRun'][0]:
                     runStartTime = usecsToDate(run['backupRun']['stats']['startTimeUsecs'])
                     print("    %s" % runStartTime)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Fleet Storage Growth Forecast for Python"""
+
+# import pyhesity wrapper module
+from pyhesity import *
+from statstool import *
+from datetime import datetime
+import numpy as np
+import codecs
+
+# command line arguments
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument('-v', '--vip', type=str, required=True, action='append')   # clusters (or helios) to connect to
+parser.add_argument('-c', '--clustername', type=str, action='append')          # helios clusters to report on (default is all)
+parser.add_argument('-u', '--username', type=str, default='helios')
+parser.add_argument('-d', '--domain', type=str, default='local')
+parser.add_argument('-i', '--useApiKey', action='store_true')
+parser.add_argument('-pwd', '--password', type=str)
+parser.add_argument('-of', '--outfolder', type=str, default='.')
+parser.add_argument('-x', '--days', type=int, default=365)                     # days of history to collect
+parser.add_argument('-w', '--window', type=int, default=30)                    # days in rolling growth window
+parser.add_argument('-f', '--fitdays', type=int, default=90)                   # days used to project days to full
+parser.add_argument('-r', '--robust', action='store_true')                     # use robust regression
+parser.add_argument('-z', '--threshold', type=float, default=4.0)              # anomaly threshold
+
+args = parser.parse_args()
+
+vips = args.vip
+clusternames = args.clustername
+username = args.username
+domain = args.domain
+password = args.password
+useApiKey = args.useApiKey
+folder = args.outfolder
+days = args.days
+window = args.window
+fitdays = args.fitdays
+robust = args.robust
+threshold = args.threshold
+
+GiB = (1024 * 1024 * 1024)
+
+# authenticate to each cluster or helios (one api context per cluster)
+contexts = []
+for vip in vips:
+    apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey)
+    if apiconnected():
+        if vip == 'helios.cohesity.com':
+            contexts += heliosContexts(clusternames)
+        else:
+            contexts.append((vip, getContext()))
+    else:
+        print('%s - unable to connect' % vip)
+
+if len(contexts) == 0:
+    exit(1)
+
+now = datetime.now()
+datestring = now.strftime("%Y-%m-%d")
+endTimeMsecs = int(dateToUsecs(now.strftime("%Y-%m-%d %H:%M:%S")) / 1000)
+startTimeMsecs = endTimeMsecs - (days * 86400000)
+
+
+def clusterStats(name, context):
+    cluster = api('get', 'cluster', context=context)
+    if not cluster or 'id' not in cluster:
+        return None
+    stats = timeSeries([(cluster['id'], 'kBridgeClusterStats', metricName) for metricName in ['kMorphedUsageBytes', 'kCapacityBytes']], startTimeMsecs, endTimeMsecs, rollupIntervalSecs=86400, rollupFunction='average', context=context)
+    if stats is None:
+        return None
+    return (cluster['name'], stats.metric('kMorphedUsageBytes')[0], stats.metric('kCapacityBytes')[0], stats.timestamps)
+
+
+print('Collecting report data for %s clusters...' % len(contexts))
+clusters = []
+for (name, result) in clusterMap(clusterStats, contexts):
+    if isinstance(result, tuple):
+        clusters.append(result)
+    else:
+        print('%s - unable to get stats' % name)
+
+if len(clusters) == 0:
+    exit(1)
+
+# clusters x days arrays
+clusterNames = [c[0] for c in clusters]
+consumed = np.vstack([c[1] for c in clusters]) / GiB
+capacity = np.vstack([c[2] for c in clusters]) / GiB
+timestamps = clusters[0][3]
+
+trend = capacityTrend(consumed, capacity, window=window, fitDays=fitdays, robust=robust, threshold=threshold)
+anomalyCount = trend['anomalies'].sum(axis=1)
+lastAnomaly = np.where(anomalyCount > 0, trend['anomalies'].shape[1] - 1 - trend['anomalies'][:, ::-1].argmax(axis=1), -1)
+growth = trend['growth'][:, -1]
+
+csvfileName = '%s/storageGrowthForecast-%s.csv' % (folder, datestring)
+csv = codecs.open(csvfileName, 'w', 'utf-8')
+csv.write("Cluster,Consumed (GiB),Capacity (GiB),PCT Full,Growth %s Days (GiB/Day),Trend (GiB/Day),Days To Full,Projected Full Date,Anomalies,Last Anomaly\n" % window)
+
+print('\n{0:<25}{1:>14}{2:>14}{3:>8}{4:>14}{5:>14}'.format('Cluster', 'Consumed GiB', 'Capacity GiB', 'Full %', 'GiB/Day', 'Days to Full'))
+print('{0:<25}{1:>14}{2:>14}{3:>8}{4:>14}{5:>14}'.format('-------', '------------', '------------', '------', '-------', '------------'))
+
+for i in np.argsort(trend['daysToFull'], kind='stable'):
+    daysToFull = trend['daysToFull'][i]
+    if np.isfinite(daysToFull):
+        fullDate = usecsToDate((endTimeMsecs + int(daysToFull * 86400000)) * 1000)[0:10]
+        daysToFull = int(daysToFull)
+    else:
+        fullDate = ''
+        daysToFull = ''
+    if lastAnomaly[i] >= 0:
+        anomalyDate = usecsToDate(int(timestamps[lastAnomaly[i]]) * 1000)[0:10]
+    else:
+        anomalyDate = ''
+    print('{0:<25}{1:>14.0f}{2:>14.0f}{3:>8.0f}{4:>14.1f}{5:>14}'.format(clusterNames[i], trend['consumed'][i], trend['capacity'][i], trend['pctFull'][i], trend['slope'][i], daysToFull))
+    csv.write('%s,%.0f,%.0f,%.0f,%.1f,%.1f,%s,%s,%s,%s\n' % (clusterNames[i], trend['consumed'][i], trend['capacity'][i], trend['pctFull'][i], growth[i], trend['slope'][i], daysToFull, fullDate, anomalyCount[i], anomalyDate))
+
+csv.close()
+print('\nOutput written to %s' % csvfileName)
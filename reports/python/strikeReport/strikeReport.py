@@ -5,6 +5,7 @@
 from pyhesity import *
 from datetime import datetime
 import codecs
+from bisect import bisect_right
 
 # command line arguments
 import argparse
@@ -27,14 +28,21 @@ folder = args.outfolder
 days = args.days
 useApiKey = args.useApiKey
 
+# authenticate to each cluster (one api context per cluster)
+contexts = []
 for vip in vips:
-
-    # authenticate
     apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey)
+    if apiconnected() is True:
+        contexts.append((vip, getContext()))
+    else:
+        print('%s - unable to connect' % vip)
+
 
+def strikeReport(vip, context):
+    """build the strike report for one cluster (runs concurrently for all clusters)"""
     print('Collecting report data for %s...' % vip)
 
-    cluster = api('get', 'cluster')
+    cluster = api('get', 'cluster', context=context)
 
     title = 'Backup Strike Report (%s)' % cluster['name']
     now = datetime.now()
@@ -166,49 +174,62 @@ for vip in vips:
     objectStatus = {}
     totalObjects = 0
 
-    print('getting runs...')
-    allruns = api('get', 'protectionRuns?excludeTasks=true&startTimeUsecs=%s&numRuns=999999' % timeAgo(31, 'days'))
-    print('getting jobs...')
-    jobs = api('get', 'protectionJobs?allUnderHierarchy=true&isActive=true&includeLastRunAndStats=true')
+    allruns = api('get', 'protectionRuns?excludeTasks=true&startTimeUsecs=%s&numRuns=999999' % timeAgo(31, 'days'), context=context)
+    jobs = api('get', 'protectionJobs?allUnderHierarchy=true&isActive=true&includeLastRunAndStats=true', context=context)
 
+    # index run start times per job (sorted) for runs-since-last-snapshot queries
+    runStarts = {}
+    for run in allruns or []:
+        runStarts.setdefault(run['jobId'], []).append(run['backupRun']['stats']['startTimeUsecs'])
+    for jobId in runStarts:
+        runStarts[jobId].sort()
+
+    # find failed objects and look up their latest snapshots concurrently
+    failedSources = []
     for job in sorted(jobs, key=lambda job: job['name'].lower()):
-        print("  %s" % job['name'])
         if 'lastRun' in job:
-            startTimeUsecs = job['lastRun']['backupRun']['stats']['startTimeUsecs']
             for source in job['lastRun']['backupRun']['sourceBackupStatus']:
                 totalObjects += 1
-                sourcename = source['source']['name']
                 if source['status'] not in ['kSuccess', 'kWarning']:
-                    sourceType = source['source']['environment']
-                    if sourceType == 'kPuppeteer':
-                        sourceType == 'kView'
-                    search = api('get', '/searchvms?vmName=%s&entityTypes=%s&allUnderHierarchy=true&jobIds=%s' % (sourcename, sourceType, job['id']))
-                    if 'vms' in search:
-                        latestSnapshotUsecs = search['vms'][0]['vmDocument']['versions'][0]['instanceId']['jobStartTimeUsecs']
-                        errorRuns = [run for run in allruns if run['jobId'] == job['id'] and run['backupRun']['stats']['startTimeUsecs'] > latestSnapshotUsecs]
-                    else:
-                        errorRuns = [run for run in allruns if run['jobId'] == job['id'] and run['backupRun']['stats']['startTimeUsecs'] > (timeAgo(31, 'days'))]
-                        latestSnapshotUsecs = 0
-                    if errorRuns:
-                        numErrors = len(errorRuns)
-                        if source['status'] != 'kFailure':
-                            numErrors -= 1
-                    else:
-                        numErrors = '-'
-                    thisStatus = {'objectName': sourcename,
-                                  'status': source['status'],
-                                  'jobName': job['name'],
-                                  'jobId': job['id'],
-                                  'jobType': source['source']['environment'],
-                                  'startTimeUsecs': startTimeUsecs,
-                                  'latestSnapshotUsecs': latestSnapshotUsecs,
-                                  'numErrors': numErrors}
-                    if 'error' in source:
-                        thisStatus['message'] = source['error']
-                    else:
-                        thisStatus['message'] = ''
-                    if numErrors != 0 and (sourcename not in objectStatus or startTimeUsecs > objectStatus[sourcename]['startTimeUsecs']):
-                        objectStatus[sourcename] = thisStatus
+                    failedSources.append((job, source))
+    searches = []
+    for (job, source) in failedSources:
+        sourceType = source['source']['environment']
+        if sourceType == 'kPuppeteer':
+            sourceType == 'kView'
+        searches.append(('get', '/searchvms?vmName=%s&entityTypes=%s&allUnderHierarchy=true&jobIds=%s' % (source['source']['name'], sourceType, job['id'])))
+    searchResults = apimany(searches, context=context)
+
+    for ((job, source), search) in zip(failedSources, searchResults):
+        startTimeUsecs = job['lastRun']['backupRun']['stats']['startTimeUsecs']
+        sourcename = source['source']['name']
+        jobRunStarts = runStarts.get(job['id'], [])
+        if search and 'vms' in search:
+            latestSnapshotUsecs = search['vms'][0]['vmDocument']['versions'][0]['instanceId']['jobStartTimeUsecs']
+            numErrorRuns = len(jobRunStarts) - bisect_right(jobRunStarts, latestSnapshotUsecs)
+        else:
+            numErrorRuns = len(jobRunStarts) - bisect_right(jobRunStarts, timeAgo(31, 'days'))
+            latestSnapshotUsecs = 0
+        if numErrorRuns > 0:
+            numErrors = numErrorRuns
+            if source['status'] != 'kFailure':
+                numErrors -= 1
+        else:
+            numErrors = '-'
+        thisStatus = {'objectName': sourcename,
+                      'status': source['status'],
+                      'jobName': job['name'],
+                      'jobId': job['id'],
+                      'jobType': source['source']['environment'],
+                      'startTimeUsecs': startTimeUsecs,
+                      'latestSnapshotUsecs': latestSnapshotUsecs,
+                      'numErrors': numErrors}
+        if 'error' in source:
+            thisStatus['message'] = source['error']
+        else:
+            thisStatus['message'] = ''
+        if numErrors != 0 and (sourcename not in objectStatus or startTimeUsecs > objectStatus[sourcename]['startTimeUsecs']):
+            objectStatus[sourcename] = thisStatus
 
     for entity in objectStatus:
         if objectStatus[entity]['latestSnapshotUsecs'] == 0:
@@ -245,3 +266,8 @@ for vip in vips:
     f.write(html)
     f.close()
     csv.close()
+
+
+for (vip, result) in clusterMap(strikeReport, contexts):
+    if result is not None and 'error' in result:
+        print('%s - %s' % (vip, result['error']))
@@ -3,8 +3,10 @@
 
 # import pyhesity wrapper module
 from pyhesity import *
+from statstool import *
 from datetime import datetime
 import codecs
+import numpy as np
 
 # command line arguments
 import argparse
@@ -36,26 +38,28 @@ views = api('get', 'views')
 
 if views['count'] > 0:
 
+    # get view consumer stats in batches
+    consumers = consumerStats('kViews', [view['viewId'] for view in views['views']])
+
+    # get folder and file counts for all views concurrently
+    entityIds = {}
+    for view in views['views']:
+        consumer = consumers.get(view['viewId'], None)
+        if consumer is not None and len(consumer.get('groupList', None) or []) > 0 and 'entityId' in consumer['groupList'][0]:
+            entityIds[view['viewId']] = consumer['groupList'][0]['entityId']
+    stats = timeSeries([(entityId, 'BookKeeperStats', metricName) for entityId in entityIds.values() for metricName in ['NumDirectories', 'NumFiles']], startMsecs, endMsecs, rollupIntervalSecs=21600)
+    numDirectories = np.nan_to_num(stats.first('NumDirectories')).astype(np.int64)
+    numFiles = np.nan_to_num(stats.first('NumFiles')).astype(np.int64)
+
     for view in sorted(views['views'], key=lambda v: v['name'].lower()):
-        consumer = api('get', 'stats/consumers?consumerType=kViews&consumerIdList=%s' % view['viewId'])
-        if consumer is not None and 'statsList' in consumer and consumer['statsList'] is not None and len(consumer['statsList']) > 0 and 'groupList' in consumer['statsList'][0] and consumer['statsList'][0] is not None and len(consumer['statsList'][0]['groupList']) > 0 and 'entityId' in consumer['statsList'][0]['groupList'][0]:
-            entityId = consumer['statsList'][0]['groupList'][0]['entityId']
-            folderStats = api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=BookKeeperStats&metricName=NumDirectories&rollupIntervalSecs=21600&rollupFunction=latest&entityIdList=%s&endTimeMsecs=%s' % (startMsecs, entityId, endMsecs))
-            if folderStats is not None and 'dataPointVec' in folderStats and len(folderStats['dataPointVec']) > 0:
-                numDirectories = folderStats['dataPointVec'][0]['data']['int64Value']
-            else:
-                numDirectories = 0
-            fileStats = api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=BookKeeperStats&metricName=NumFiles&rollupIntervalSecs=21600&rollupFunction=latest&entityIdList=%s&endTimeMsecs=%s' % (startMsecs, entityId, endMsecs))
-            if fileStats is not None and 'dataPointVec' in fileStats and len(fileStats['dataPointVec']) > 0:
-                numFiles = fileStats['dataPointVec'][0]['data']['int64Value']
-            else:
-                numFiles = 0
+        if view['viewId'] in entityIds:
+            i = stats.entityIndex[entityIds[view['viewId']]]
+            (viewDirectories, viewFiles) = (numDirectories[i], numFiles[i])
         else:
-            numFiles = 0
-            numDirectories = 0
+            (viewDirectories, viewFiles) = (0, 0)
 
-        print('%-25s  %s/%s' % (view['name'], numDirectories, numFiles))
-        csv.write('%s,%s,%s\n' % (view['name'], numDirectories, numFiles))
+        print('%-25s  %s/%s' % (view['name'], viewDirectories, viewFiles))
+        csv.write('%s,%s,%s\n' % (view['name'], viewDirectories, viewFiles))
 
 csv.close()
 print('Output saved to %s' % csvfileName)